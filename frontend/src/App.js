@@ -2,6 +2,20 @@ import React, { useState } from 'react';
 import './App.css';
 import AudioRecorder from './components/AudioRecorder';
 import ConversationDisplay from './components/ConversationDisplay';
+import LiveTranscriber from './components/LiveTranscriber';
+
+const API_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:5000';
+
+// One conversation per page load, so the server can track how the user's feelings evolve
+const SESSION_ID = window.crypto.randomUUID();
+
+// Pipeline stage name (from the server's SSE stream) -> conversation entry field
+const STAGE_FIELDS = {
+  transcript: 'transcript',
+  sentiment: 'sentiment',
+  response: 'response',
+  audio_url: 'audioUrl'
+};
 
 function App() {
   const [conversation, setConversation] = useState([]);
@@ -9,23 +23,75 @@ function App() {
 
   const handleNewAudio = async (audioBlob) => {
     setIsProcessing(true);
-    
-    // TODO: Send to backend and get response
-    // For now, simulate the process
-    
-    setTimeout(() => {
-      const newEntry = {
-        id: Date.now(),
-        userAudio: audioBlob,
-        transcript: "I'm feeling anxious about my upcoming presentation",
-        sentiment: { sentiment: "negative", compound: -0.6 },
-        response: "I understand that presentations can be really stressful. It's completely normal to feel anxious about something important like this. Would you like to talk more about what specifically is worrying you?",
-        timestamp: new Date().toLocaleTimeString()
+
+    const id = Date.now();
+    const updateEntry = (fields) => {
+      setConversation(prev => prev.map(entry => (entry.id === id ? { ...entry, ...fields } : entry)));
+    };
+
+    setConversation(prev => [...prev, {
+      id,
+      userAudio: audioBlob,
+      transcript: null,
+      sentiment: null,
+      response: null,
+      audioUrl: null,
+      timestamp: new Date().toLocaleTimeString()
+    }]);
+
+    try {
+      // Start the analysis as a background job so each stage can be shown as soon as it is ready;
+      // stream_audio=1 returns the reply's audio URL while it is still being synthesized
+      const formData = new FormData();
+      formData.append('audio', audioBlob, 'recording.wav');
+      const res = await fetch(`${API_URL}/analyze?async=1&stream_audio=1`, {
+        method: 'POST',
+        body: formData,
+        headers: { 'X-Session-Id': SESSION_ID }
+      });
+      if (!res.ok) {
+        throw new Error(`Server responded with ${res.status}`);
+      }
+      const job = await res.json();
+
+      const events = new EventSource(`${API_URL}${job.events_url}`);
+      const finish = () => {
+        events.close();
+        setIsProcessing(false);
       };
-      
-      setConversation(prev => [...prev, newEntry]);
+
+      // Transcript arrives first, the synthesized audio URL last
+      events.addEventListener('stage', (event) => {
+        const { stage, result } = JSON.parse(event.data);
+        const field = STAGE_FIELDS[stage];
+        updateEntry({ [field]: field === 'audioUrl' ? `${API_URL}${result}` : result });
+      });
+      events.addEventListener('done', finish);
+      events.addEventListener('failed', (event) => {
+        updateEntry({ error: JSON.parse(event.data).error });
+        finish();
+      });
+      events.onerror = () => {
+        updateEntry({ error: 'Lost connection to the server' });
+        finish();
+      };
+    } catch (err) {
+      updateEntry({ error: err.message });
       setIsProcessing(false);
-    }, 2000);
+    }
+  };
+
+  // A finished live session joins the conversation like an uploaded recording
+  const handleLiveFinal = (message) => {
+    setConversation(prev => [...prev, {
+      id: Date.now(),
+      userAudio: null,
+      transcript: message.transcript,
+      sentiment: message.sentiment,
+      response: message.response,
+      audioUrl: null,
+      timestamp: new Date().toLocaleTimeString()
+    }]);
   };
 
   return (
@@ -37,6 +103,7 @@ function App() {
       
       <main className="App-main">
         <AudioRecorder onAudioRecorded={handleNewAudio} isProcessing={isProcessing} />
+        <LiveTranscriber apiUrl={API_URL} onFinal={handleLiveFinal} />
         
         {isProcessing && (
           <div className="processing-message">
@@ -0,0 +1,95 @@
+import React, { useState, useRef } from 'react';
+import { Mic, Square } from 'lucide-react';
+
+const SAMPLE_RATE = 16000;
+
+// Float samples from the microphone -> 16-bit little-endian PCM for the /stream socket
+const toPcm16 = (samples) => {
+  const pcm = new Int16Array(samples.length);
+  for (let i = 0; i < samples.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[i]));
+    pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+  }
+  return pcm.buffer;
+};
+
+const LiveTranscriber = ({ apiUrl, onFinal }) => {
+  const [isStreaming, setIsStreaming] = useState(false);
+  const [partial, setPartial] = useState(null);
+  const [alert, setAlert] = useState(false);
+  const resources = useRef(null);
+
+  const start = async () => {
+    const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+    const context = new AudioContext({ sampleRate: SAMPLE_RATE });
+    const source = context.createMediaStreamSource(stream);
+    const processor = context.createScriptProcessor(4096, 1, 1);
+    const socket = new WebSocket(`${apiUrl.replace(/^http/, 'ws')}/stream`);
+
+    socket.onopen = () => {
+      socket.send(JSON.stringify({ sample_rate: context.sampleRate }));
+      processor.onaudioprocess = (event) => {
+        if (socket.readyState === WebSocket.OPEN) {
+          socket.send(toPcm16(event.inputBuffer.getChannelData(0)));
+        }
+      };
+      source.connect(processor);
+      processor.connect(context.destination);
+    };
+
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      setPartial(message);
+      if (message.alert) {
+        setAlert(true);
+      }
+      if (message.type === 'final') {
+        socket.close();
+        onFinal(message);
+      }
+    };
+
+    resources.current = { stream, context, processor, socket };
+    setPartial(null);
+    setAlert(false);
+    setIsStreaming(true);
+  };
+
+  const stop = () => {
+    const { stream, context, processor, socket } = resources.current;
+    processor.disconnect();
+    stream.getTracks().forEach(track => track.stop());
+    context.close();
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ event: 'end' }));
+    }
+    setIsStreaming(false);
+  };
+
+  return (
+    <div className="live-transcriber">
+      <h2>Or talk live</h2>
+      <button onClick={isStreaming ? stop : start}>
+        {isStreaming ? <Square /> : <Mic />}
+        {isStreaming ? ' Stop' : ' Start live session'}
+      </button>
+
+      {alert && (
+        <div className="crisis-alert">
+          <p>It sounds like you're going through something really hard. You don't have to face it alone.</p>
+        </div>
+      )}
+
+      {partial && (
+        <div className="live-partial">
+          <p className="live-transcript">{partial.transcript || '…'}</p>
+          <p className="live-sentiment">
+            Feeling: {partial.primary_emotion} ({partial.sentiment.sentiment})
+          </p>
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default LiveTranscriber;
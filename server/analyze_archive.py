@@ -0,0 +1,67 @@
+"""
+Emotion, crisis and topic analysis of a transcript archive, outside Flask.
+
+Run from server/:
+
+    python analyze_archive.py transcripts.jsonl results.jsonl
+    python analyze_archive.py calls.csv.gz results.csv --text-field text --workers 8
+    python analyze_archive.py transcripts.jsonl results.parquet     # needs pyarrow
+
+Input is JSONL (one object per line, or a bare JSON string) or CSV, gzipped
+or not. Output is one row per input record, in input order: JSONL, CSV, or
+a directory of Parquet part files. Records without a usable text get a row
+with only 'id' and 'error' set.
+
+The run saves a checkpoint (<output>.checkpoint) every --checkpoint-every
+records and when interrupted. Running the same command again continues
+after the last checkpoint; --restart starts over. Throughput is reported
+on stderr every --progress-seconds, and the final statistics are printed
+as JSON on stdout.
+"""
+import argparse
+import json
+import os
+import sys
+from utils.archive import INPUT_FORMATS, OUTPUT_FORMATS, run_archive
+
+
+def _report_progress(stats):
+    print(f"{stats['records']} records ({stats['errors']} errors), "
+          f"{stats['records_per_second']} records/s over {stats['elapsed_seconds']:.0f}s",
+          file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='JSONL or CSV file (optionally .gz)')
+    parser.add_argument('output', help='.jsonl or .csv file, or a .parquet directory')
+    parser.add_argument('--input-format', choices=INPUT_FORMATS, help='default: from the extension')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, help='default: from the extension')
+    parser.add_argument('--text-field', default='transcript', help='field or column holding the transcript')
+    parser.add_argument('--id-field', default='id', help='field or column copied to the output (default: record number)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes (1: no pool)')
+    parser.add_argument('--chunk-size', type=int, default=512, help='records per worker task')
+    parser.add_argument('--checkpoint-every', type=int, default=10000, help='records between checkpoints')
+    parser.add_argument('--progress-seconds', type=float, default=5.0)
+    parser.add_argument('--restart', action='store_true', help='ignore any checkpoint and overwrite the output')
+    args = parser.parse_args(argv)
+
+    try:
+        stats = run_archive(
+            args.input, args.output, input_format=args.input_format, output_format=args.output_format,
+            text_field=args.text_field, id_field=args.id_field, workers=args.workers,
+            chunk_size=args.chunk_size, checkpoint_every=args.checkpoint_every, restart=args.restart,
+            progress=_report_progress, progress_seconds=args.progress_seconds
+        )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume", file=sys.stderr)
+        return 130
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,48 @@
-from flask import Flask, send_from_directory
+from flask import Flask, Request, Response, send_from_directory, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from routes.analyze import analyze_bp
+from routes.analyze import analyze_bp, result_cache
+from routes.jobs import jobs_bp
+from routes.metrics import metrics_bp
+from routes.sessions import sessions_bp
+from routes.stream import stream_bp
+from routes.tracing import tracing_bp
+from utils.analyzers import warm_up_async, readiness
+from tts.worker import get_tts_service
+from tts.progressive import open_stream
+from tts.speak import AUDIO_FILENAME
+from tts.store import AudioStore
+from utils.results import EmotionAnalysis
+from utils.tracing import configure_logging
+import config
 import os
+import tempfile
 
-app = Flask(__name__, static_folder='static')
+class SpooledUploadRequest(Request):
+    """
+    Keep uploads up to UPLOAD_SPOOL_MAX_BYTES in memory so speech recognition
+    can read them without touching disk
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=config.UPLOAD_SPOOL_MAX_BYTES, mode='rb+')
+
+class AnalysisJSONProvider(DefaultJSONProvider):
+    """
+    Let jsonify encode EmotionAnalysis results through their dict view
+    """
+    @staticmethod
+    def default(o):
+        if isinstance(o, EmotionAnalysis):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+# Server logs and trace spans are written to stdout as JSON lines
+configure_logging(config.LOG_LEVEL)
+
+# static/ is served by serve_static below, not Flask's built-in static route
+app = Flask(__name__, static_folder=None)
+app.request_class = SpooledUploadRequest
+app.json = AnalysisJSONProvider(app)
 CORS(app)  # Allow cross-origin requests
 
 # Create static directory if it doesn't exist
@@ -11,11 +50,75 @@ os.makedirs('static', exist_ok=True)
 
 # Register API routes
 app.register_blueprint(analyze_bp)
+app.register_blueprint(jobs_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(sessions_bp)
+app.register_blueprint(stream_bp)
+app.register_blueprint(tracing_bp)
+
+# Keeps the synthesized reply audio in static/ within its size and age caps
+audio_store = AudioStore('static', max_bytes=config.TTS_STORE_MAX_BYTES, max_age_seconds=config.TTS_STORE_MAX_AGE_SECONDS)
+
+# Whether this process has started its background threads
+_services_started = False
+
+def start_background_services():
+    """
+    Start this process's TTS worker and the audio store and result cache
+    sweepers. Threads do not survive a fork, so a pre-forking server calls
+    this in each worker.
+    """
+    global _services_started
+    # Initialize the speech engine before the first reply
+    get_tts_service()
+    audio_store.start(config.TTS_STORE_SWEEP_SECONDS)
+    result_cache.start(config.ANALYZE_CACHE_SWEEP_SECONDS)
+    _services_started = True
+
+def start_services():
+    """
+    Start-up of a process that serves requests on its own (python app.py):
+    load the sentiment analyzers before the first request needs them and
+    start the background services. Not run at import, so the spawned batch
+    and TTS processes, which re-import this module as __mp_main__, start
+    nothing; gunicorn.conf.py does the pre-forking equivalent in its hooks.
+    """
+    warm_up_async()
+    start_background_services()
+
+# Readiness probe: 200 once every analyzer is loaded and the background services
+# of this process are running, 503 while warming up
+@app.route('/ready')
+def ready():
+    state = readiness()
+    state['services_started'] = _services_started
+    state['pid'] = os.getpid()
+    state['ready'] = state['ready'] and _services_started
+    return jsonify(state), 200 if state['ready'] else 503
 
 # Serve static files (for TTS audio output)
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    return send_from_directory('static', filename)
+    if not os.path.exists(os.path.join('static', filename)):
+        # Reply audio still rendering: stream each sentence as it is synthesized
+        chunks = open_stream(filename)
+        if chunks is not None:
+            return Response(chunks, mimetype='audio/wav', headers={'Cache-Control': 'no-store'})
+
+    match = AUDIO_FILENAME.fullmatch(filename)
+    if match is None:
+        return send_from_directory('static', filename)
+
+    # Reply audio is content-addressed, so its speech key is a strong ETag and the
+    # file can be cached for good; Range requests are answered with 206 by send_file
+    audio_store.touch(filename)
+    response = send_from_directory('static', filename, etag=match.group(1),
+                                   max_age=config.TTS_AUDIO_MAX_AGE_SECONDS)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 if __name__ == "__main__":
+    # Development server; use gunicorn.conf.py in production
+    start_services()
     app.run(debug=True)
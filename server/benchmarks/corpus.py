@@ -0,0 +1,123 @@
+import random
+
+# Benchmark and golden-output inputs for EnhancedEmotionAnalyzer. Everything
+# here is fixed or seeded, so a corpus is the same text on every run; changing
+# it invalidates benchmarks/golden.json and benchmarks/baseline.json.
+
+SENTENCES = [
+    "I'm so happy about my new job!",
+    "I'm feeling really anxious about my upcoming presentation",
+    "I'm sad because I had a fight with my best friend",
+    "I'm absolutely furious with my roommate right now!",
+    "I'm kind of worried about my health",
+    "I'm not happy with how things are going",
+    "I'm feeling hopeless and don't know what to do anymore",
+    "I'm excited but also nervous about the future",
+    "I'm really confused about my feelings",
+    "I'm feeling great today!",
+    "I can't take it anymore. No one cares, I just want to give up and end it all.",
+    "Honestly the meeting went fine, I think? Not sure what they expected...",
+    "My doctor says the new medication should help with the pain",
+    "We finally paid off the debt and I feel so secure about money now",
+    "Nobody understands how lonely this semester has been",
+    "I love my partner but lately every conversation turns into an argument",
+]
+
+PARAGRAPHS = [
+    "Work has been a lot lately. My boss moved the deadline up again and the whole team is under "
+    "pressure. I stayed late three nights this week and I'm really tired. I keep telling myself it's "
+    "temporary, but honestly I'm worried it never ends. The project matters to me, I just wish "
+    "someone would notice how overwhelmed everyone is.",
+
+    "Today was actually wonderful! My sister came to visit and we spent the whole afternoon at the "
+    "park with the kids. I can't remember the last time I laughed that much. I'm excited for the "
+    "holidays now and looking forward to seeing the rest of the family. It feels good to feel good.",
+
+    "I don't really know how to say this. For a while now nothing matters much. I get up, I go to "
+    "class, I come home, and I'm alone. My friends stopped asking how I'm doing and I don't blame "
+    "them. Sometimes I think everyone would be better off without me around. I'm not sure why I'm "
+    "even telling you this...",
+
+    "The exam results came back and I did better than I expected. I was so nervous the night before "
+    "that I barely slept, but the studying paid off. I'm still a little anxious about the final, but "
+    "I feel more confident than I did a month ago. Maybe I can actually do this.",
+
+    "My dad is in the hospital again. The doctors keep running tests and nobody will tell us "
+    "anything clear. Mom is scared, I'm scared, and my brother just gets angry at everyone. I hate "
+    "waiting like this. Why is it always so slow? Why can't anyone just give us an answer?",
+
+    "Money is tight this month. The rent went up, the car needs repairs and the bills keep piling "
+    "up. I made a budget but it's not working. I'm not panicking yet, but I'm definitely stressed "
+    "and I don't know who to talk to about it without feeling ashamed.",
+]
+
+# Multi-paragraph transcripts, as a long session recording would produce
+TRANSCRIPTS = [
+    "\n\n".join(PARAGRAPHS[i] for i in order)
+    for order in ((0, 5, 3), (2, 4, 1, 0), (1, 3, 5, 2, 4, 0))
+]
+
+# Vocabulary for synthetic text: lexicon words of every category, multi-word
+# phrases and plain filler, so matcher windows, modifiers and negation all fire
+_SYNTHETIC_WORDS = [
+    'happy', 'sad', 'angry', 'scared', 'anxious', 'worried', 'excited', 'confused', 'love', 'trust',
+    'hopeless', 'alone', 'worthless', 'never', 'always', 'terrible',
+    'work', 'boss', 'deadline', 'family', 'friend', 'doctor', 'pain', 'exam', 'money', 'bills', 'party',
+    'stress', 'overwhelmed', 'pressure', 'hurt',
+    'very', 'really', 'extremely', 'kind of', 'a little', 'somewhat',
+    'not', 'no', 'never',
+    'give up', 'no one cares', 'looking forward', 'end it all',
+    'the', 'and', 'i', 'was', 'today', 'about', 'my', 'it', 'just', 'feel', 'think', 'because', 'then',
+    'we', 'went', 'home', 'said', 'again', 'maybe', 'still', 'after', 'before', 'time', 'week',
+]
+_PUNCTUATION = ['.', '.', '.', ',', ',', '!', '?', '...']
+
+
+def synthetic_text(words, seed=0):
+    """
+    Seeded pseudo-transcript of roughly the given number of words
+    """
+    rng = random.Random(seed)
+    parts = []
+    count = 0
+    while count < words:
+        phrase = rng.choice(_SYNTHETIC_WORDS)
+        if rng.random() < 0.02:
+            phrase = phrase.upper()
+        parts.append(phrase)
+        count += len(phrase.split())
+        if rng.random() < 0.12:
+            parts[-1] += rng.choice(_PUNCTUATION)
+    return ' '.join(parts)
+
+
+# Synthetic corpus sizes, in words per text
+SYNTHETIC_SIZES = (10, 100, 1000, 5000)
+
+
+def corpora():
+    """
+    Named benchmark corpora, smallest texts first
+    """
+    named = {
+        'sentence': SENTENCES,
+        'paragraph': PARAGRAPHS,
+        'transcript': TRANSCRIPTS,
+    }
+    for size in SYNTHETIC_SIZES:
+        # Fewer texts for the long sizes, so every corpus takes a similar time
+        named[f'synthetic_{size}'] = [synthetic_text(size, seed) for seed in range(max(1, 400 // size))]
+    return named
+
+
+def golden_corpus():
+    """
+    (name, text) pairs whose analyze_emotion output is pinned in golden.json
+    """
+    pairs = []
+    for name, texts in corpora().items():
+        if name == 'synthetic_5000':
+            continue
+        pairs.extend((f"{name}/{index}", text) for index, text in enumerate(texts))
+    pairs.extend([('edge/empty', ''), ('edge/blank', '   '), ('edge/caps', 'WHY WHY WHY?! I HATE THIS')])
+    return pairs
@@ -0,0 +1,74 @@
+"""
+analyze_corpus against a loop of analyze_emotion over the same texts.
+
+Run from server/:
+
+    python -m benchmarks.corpus_scoring                 # 11,000 texts from the benchmark corpora
+    python -m benchmarks.corpus_scoring --stub-vader    # lexicon work only
+
+Both paths run VADER once per text, and on short texts VADER is most of
+the time, so --stub-vader swaps it for a constant to compare the lexicon
+matching, scoring and result building that the corpus path vectorizes.
+The results of both paths are checked to be identical before timing.
+"""
+import argparse
+import sys
+import time
+from benchmarks.corpus import corpora
+
+NEUTRAL = {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0}
+
+
+def workload(size):
+    """
+    size texts cycled from every corpus except the longest synthetic one
+    """
+    texts = [text for name, corpus in corpora().items() if name != 'synthetic_5000' for text in corpus]
+    return [texts[i % len(texts)] for i in range(size)]
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(analyzer, texts, repeat=3, block_size=1024):
+    """
+    Best-of-repeat seconds for both paths and the speedup of analyze_corpus
+    """
+    if analyzer.analyze_corpus(texts, block_size) != [analyzer.analyze_emotion(text) for text in texts]:
+        raise AssertionError("analyze_corpus and analyze_emotion disagree")
+    scalar = best_time(lambda: [analyzer.analyze_emotion(text) for text in texts], repeat)
+    corpus = best_time(lambda: analyzer.analyze_corpus(texts, block_size), repeat)
+    return {
+        'texts': len(texts),
+        'analyze_emotion_seconds': round(scalar, 3),
+        'analyze_corpus_seconds': round(corpus, 3),
+        'speedup': round(scalar / corpus, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=11000)
+    parser.add_argument('--repeat', type=int, default=3, help='timing samples (best is kept)')
+    parser.add_argument('--block-size', type=int, default=1024)
+    parser.add_argument('--stub-vader', action='store_true', help='time without VADER')
+    args = parser.parse_args(argv)
+
+    from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+    analyzer = EnhancedEmotionAnalyzer()
+    if args.stub_vader:
+        analyzer.vader.polarity_scores = lambda text: dict(NEUTRAL)
+    report = run(analyzer, workload(args.texts), args.repeat, args.block_size)
+    print(f"{report['texts']} texts: analyze_emotion {report['analyze_emotion_seconds']:.2f}s, "
+          f"analyze_corpus {report['analyze_corpus_seconds']:.2f}s ({report['speedup']:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
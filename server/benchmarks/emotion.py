@@ -0,0 +1,259 @@
+"""
+Microbenchmarks for EnhancedEmotionAnalyzer.
+
+Run from server/:
+
+    python -m benchmarks.emotion                    # time, compare with baseline.json, check golden.json
+    python -m benchmarks.emotion --update-baseline  # accept the current timings
+    python -m benchmarks.emotion --update-golden    # accept the current scores (after a deliberate change)
+
+Times are also stored divided by a fixed pure-Python calibration loop, and
+those normalized times are what is compared, so a baseline recorded on one
+machine remains roughly usable on another.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from benchmarks.corpus import corpora
+from benchmarks.golden import GOLDEN_PATH, check_golden, write_golden
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Allowed slowdown / extra peak allocation over the baseline before it counts as a regression
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.10
+# Peak allocations this close to the baseline are noise, whatever the ratio
+MEMORY_SLACK_KIB = 4.0
+
+
+def stages(analyzer):
+    """
+    Timed functions by stage name. The private stages are given a precomputed
+    scan, so they time only their own work; 'scan' is the shared tokenize+match.
+    """
+    return {
+        'analyze_emotion': lambda text, scan: analyzer.analyze_emotion(text),
+        'vader': lambda text, scan: analyzer.vader.polarity_scores(text),
+        'scan': lambda text, scan: analyzer._scan(text),
+        '_detect_emotions': lambda text, scan: analyzer._detect_emotions(text, scan),
+        '_detect_crisis': lambda text, scan: analyzer._detect_crisis(text, scan),
+        '_analyze_context': lambda text, scan: analyzer._analyze_context(text, scan),
+        '_analyze_linguistic_patterns': lambda text, scan: analyzer._analyze_linguistic_patterns(text, scan),
+    }
+
+
+def calibrate(repeat=5):
+    """
+    Seconds for a fixed workload of dict lookups, string splits and small
+    allocations (the same mix the analyzer does); the unit of normalized times
+    """
+    words = ('the quick brown fox jumps over the lazy dog ' * 20).split()
+    index = {word: i for i, word in enumerate(set(words))}
+
+    def workload():
+        total = 0
+        for _ in range(200):
+            for word in ' '.join(words).split():
+                total += index.get(word, 0)
+            total += len([word for word in words if len(word) > 3])
+        return total
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        workload()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def time_stage(fn, pairs, repeat, min_time):
+    """
+    Best-of-repeat seconds per text. Each sample loops over the corpus enough
+    times to last at least min_time, like timeit's autorange.
+    """
+    def sample(number):
+        started = time.perf_counter()
+        for _ in range(number):
+            for text, scan in pairs:
+                fn(text, scan)
+        return time.perf_counter() - started
+
+    number = 1
+    while True:
+        elapsed = sample(number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, sample(number))
+    return best / (number * len(pairs))
+
+
+def measure_memory(analyzer, texts):
+    """
+    Peak traced allocation of one analyze_emotion call (the worst text) and the
+    memory still held after the whole corpus, in KiB
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        for text in texts:
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            analyzer.analyze_emotion(text)
+            _, text_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, text_peak - start)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak_kib': round(peak / 1024, 2), 'retained_kib': round((after - before) / 1024, 2)}
+
+
+def run(analyzer, names=None, repeat=5, min_time=0.05):
+    """
+    Benchmark report: calibration plus per-corpus stage timings and memory
+    """
+    timed = stages(analyzer)
+    report = {'calibration_seconds': None, 'corpora': {}}
+    calibrations = []
+    for name, texts in corpora().items():
+        if names and name not in names:
+            continue
+        # Re-calibrated per corpus so CPU frequency drift during a long run
+        # affects both sides of the ratio alike
+        calibration = calibrate()
+        calibrations.append(calibration)
+        pairs = [(text, analyzer._scan(text)) for text in texts]
+        words = sum(len(scan.doc.words) for _, scan in pairs)
+        results = {}
+        for stage, fn in timed.items():
+            seconds = time_stage(fn, pairs, repeat, min_time)
+            results[stage] = {
+                'per_text_us': round(seconds * 1e6, 3),
+                'normalized': round(seconds / calibration, 6)
+            }
+        # Warm the analyzer's lazy state outside the traced region
+        analyzer.analyze_emotion(texts[0])
+        report['corpora'][name] = {
+            'texts': len(texts),
+            'calibration_seconds': calibration,
+            'words_per_text': round(words / len(texts), 1),
+            'stages': results,
+            'memory': measure_memory(analyzer, texts)
+        }
+    if calibrations:
+        report['calibration_seconds'] = min(calibrations)
+    return report
+
+
+def compare(baseline, report, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """
+    Regressions of report against baseline: normalized stage times more than
+    time_tolerance slower, and peak allocations more than memory_tolerance larger
+    """
+    regressions = []
+    for name, current in report['corpora'].items():
+        previous = baseline.get('corpora', {}).get(name)
+        if previous is None:
+            continue
+        for stage, result in current['stages'].items():
+            old = previous['stages'].get(stage)
+            if old and old['normalized'] > 0:
+                ratio = result['normalized'] / old['normalized']
+                if ratio > 1 + time_tolerance:
+                    regressions.append({'corpus': name, 'metric': f"time:{stage}", 'baseline': old['normalized'],
+                                        'current': result['normalized'], 'ratio': round(ratio, 3)})
+        old_peak = previous['memory']['peak_kib']
+        new_peak = current['memory']['peak_kib']
+        if new_peak > old_peak * (1 + memory_tolerance) and new_peak - old_peak > MEMORY_SLACK_KIB:
+            regressions.append({'corpus': name, 'metric': 'memory:peak_kib', 'baseline': old_peak,
+                                'current': new_peak, 'ratio': round(new_peak / old_peak, 3) if old_peak else None})
+    return regressions
+
+
+def format_report(report, baseline=None):
+    lines = [f"calibration: {report['calibration_seconds'] * 1e3:.2f} ms"]
+    for name, current in report['corpora'].items():
+        previous = (baseline or {}).get('corpora', {}).get(name)
+        lines.append(f"\n{name}: {current['texts']} texts, {current['words_per_text']} words each, "
+                     f"peak {current['memory']['peak_kib']} KiB")
+        for stage, result in current['stages'].items():
+            line = f"  {stage:30s} {result['per_text_us']:12.1f} us/text"
+            old = previous and previous['stages'].get(stage)
+            if old and old['normalized'] > 0:
+                line += f"  {result['normalized'] / old['normalized']:6.2f}x baseline"
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', action='append', help='only this corpus (repeatable)')
+    parser.add_argument('--repeat', type=int, default=5, help='timing samples per stage (best is kept)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per timing sample')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--golden', default=GOLDEN_PATH)
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument('--report', help='also write the JSON report to this path')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--update-golden', action='store_true')
+    args = parser.parse_args(argv)
+
+    from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+    analyzer = EnhancedEmotionAnalyzer()
+    failed = False
+
+    if args.update_golden:
+        write_golden(analyzer.analyze_emotion, args.golden)
+        print(f"Wrote {args.golden}")
+    else:
+        failures = check_golden(analyzer.analyze_emotion, args.golden)
+        for name, differences in failures.items():
+            print(f"golden mismatch {name}: " + '; '.join(differences[:5]))
+        failed = bool(failures)
+
+    report = run(analyzer, args.corpus, args.repeat, args.min_time)
+    baseline = _load_json(args.baseline)
+    print(format_report(report, baseline))
+    if args.report:
+        _write_json(args.report, report)
+
+    if args.update_baseline:
+        if baseline and args.corpus:
+            # Keep the corpora that were not re-run
+            baseline['corpora'].update(report['corpora'])
+            baseline['calibration_seconds'] = report['calibration_seconds']
+            report = baseline
+        _write_json(args.baseline, report)
+        print(f"\nWrote {args.baseline}")
+    elif baseline is not None:
+        regressions = compare(baseline, report, args.time_tolerance, args.memory_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['corpus']} {regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']} ({regression['ratio']}x)")
+        failed = failed or bool(regressions)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
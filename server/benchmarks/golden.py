@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+from benchmarks.corpus import golden_corpus
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'golden.json')
+
+# Scores may differ by float rounding when an optimization reorders arithmetic
+FLOAT_TOLERANCE = 1e-9
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _encode(result):
+    """
+    JSON text of one result: EmotionAnalysis through its own to_json, so the
+    golden check also covers the fast encoding path
+    """
+    to_json = getattr(result, 'to_json', None)
+    return to_json() if to_json is not None else json.dumps(result)
+
+
+def golden_outputs(analyze):
+    """
+    Run analyze (text -> analysis) over the golden corpus, keyed by entry name
+    """
+    return {
+        name: {'sha256': text_digest(text), 'result': json.loads(_encode(analyze(text)))}
+        for name, text in golden_corpus()
+    }
+
+
+def write_golden(analyze, path=GOLDEN_PATH):
+    outputs = golden_outputs(analyze)
+    with open(path, 'w') as f:
+        json.dump(outputs, f, indent=1, sort_keys=True)
+        f.write('\n')
+    return outputs
+
+
+def load_golden(path=GOLDEN_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def diff_outputs(expected, actual, path=''):
+    """
+    Paths at which two analysis results differ; empty when they match
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in expected or key not in actual:
+                differences.append(f"{child}: {expected.get(key, '<missing>')!r} != {actual.get(key, '<missing>')!r}")
+            else:
+                differences.extend(diff_outputs(expected[key], actual[key], child))
+        return differences
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        if len(expected) != len(actual):
+            return [f"{path}: {list(expected)!r} != {list(actual)!r}"]
+        differences = []
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            differences.extend(diff_outputs(left, right, f"{path}[{index}]"))
+        return differences
+    if isinstance(expected, float) or isinstance(actual, float):
+        if isinstance(expected, (int, float)) and isinstance(actual, (int, float)) \
+                and not isinstance(expected, bool) and not isinstance(actual, bool) \
+                and abs(expected - actual) <= FLOAT_TOLERANCE:
+            return []
+    elif expected == actual:
+        return []
+    return [f"{path}: {expected!r} != {actual!r}"]
+
+
+def check_golden(analyze, path=GOLDEN_PATH):
+    """
+    Compare analyze against the pinned outputs; returns {entry name: [differences]}
+    for every entry that changed
+    """
+    golden = load_golden(path)
+    current = dict(golden_corpus())
+    failures = {}
+    for name in sorted(set(golden) | set(current)):
+        if name not in current:
+            failures[name] = ['entry no longer in the golden corpus']
+        elif name not in golden:
+            failures[name] = ['entry missing from golden.json']
+        elif golden[name]['sha256'] != text_digest(current[name]):
+            failures[name] = ['corpus text changed; regenerate golden.json']
+        else:
+            # Round trip through JSON so tuples and lists compare alike
+            actual = json.loads(_encode(analyze(current[name])))
+            differences = diff_outputs(golden[name]['result'], actual)
+            if differences:
+                failures[name] = differences
+    return failures
@@ -0,0 +1,409 @@
+"""
+Offline end-to-end load test of POST /analyze.
+
+Run from server/:
+
+    python -m benchmarks.load                                  # in-process, stand-in STT and TTS
+    python -m benchmarks.load --mode http --concurrency 1,4,16 --report load.json
+    python -m benchmarks.load --mode http --url http://127.0.0.1:5000   # an already running server
+
+The stand-ins are the 'simulated' STT backend and TTS service (see
+STT_SIM_* and TTS_SIM_* in config.py), so nothing touches the network. With
+--url the server must have been started with STT_BACKEND=simulated and
+TTS_BACKEND=simulated for the run to stay offline.
+
+Each concurrency level sends --requests uploads from that many closed-loop
+clients, drawn from a mix of clip lengths. Per-stage latency comes from the
+Server-Timing header of each response. The JSON report holds p50/p95/p99
+latency per stage, throughput and error rates per level, and the
+saturation point: the first level after which adding clients no longer
+raises throughput by SATURATION_GAIN.
+
+Requests the crisis pre-screen sends to the priority lane are reported
+separately (by_lane). To see that lane hold its latency while routine
+traffic saturates the TTS workers, make a share of the recordings crisis
+statements and every reply a fresh render:
+
+    python -m benchmarks.load --stt-crisis-rate 0.2 --no-audio-reuse --tts-workers 1 --concurrency 2,8,16
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import wave
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Throughput must grow by this factor from one level to the next, or the first is saturated
+SATURATION_GAIN = 1.1
+
+STAGES = ('stt', 'sentiment', 'response', 'tts')
+
+LANES = ('normal', 'priority')
+
+
+def make_clip(seconds, seed, rate=16000):
+    """
+    Speech-like 16-bit mono WAV: tone bursts of varying pitch separated by pauses
+    """
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(seconds * rate), dtype=np.float32)
+    position = int(rng.uniform(0.05, 0.3) * rate)
+    while position < len(samples):
+        length = int(rng.uniform(0.3, 1.2) * rate)
+        t = np.arange(min(length, len(samples) - position)) / rate
+        burst = 0.4 * np.sin(2 * np.pi * rng.uniform(120, 300) * t) * np.hanning(len(t))
+        samples[position:position + len(t)] = burst
+        position += length + int(rng.uniform(0.35, 0.7) * rate)
+    samples += rng.normal(0, 0.002, len(samples)).astype(np.float32)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+
+def parse_mix(text):
+    """
+    '3:5,10:3,30:1' -> [(3.0, 5.0), (10.0, 3.0), (30.0, 1.0)]: clip seconds and relative weight
+    """
+    mix = []
+    for part in text.split(','):
+        seconds, _, weight = part.partition(':')
+        mix.append((float(seconds), float(weight or 1)))
+    return mix
+
+
+def build_workload(mix, requests, seed=0, variants=8):
+    """
+    Clip lengths for each request in send order, plus a few distinct clips per length
+    """
+    rng = np.random.default_rng(seed)
+    lengths = [seconds for seconds, _ in mix]
+    weights = np.array([weight for _, weight in mix])
+    order = rng.choice(len(lengths), size=requests, p=weights / weights.sum())
+    clips = {seconds: [make_clip(seconds, seed * 1000 + i + int(seconds * 100)) for i in range(variants)]
+             for seconds in lengths}
+    return [lengths[i] for i in order], clips
+
+
+def parse_server_timing(value):
+    """
+    'stt;dur=812.4, tts;dur=95.0' -> {'stt': 812.4, 'tts': 95.0} (milliseconds)
+    """
+    timings = {}
+    for metric in (value or '').split(','):
+        name, *params = [part.strip() for part in metric.split(';')]
+        for param in params:
+            key, _, number = param.partition('=')
+            if name and key == 'dur':
+                timings[name] = float(number)
+    return timings
+
+
+def percentile(values, q):
+    """
+    Linear-interpolated percentile (q in 0-100) of a sorted list
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return None
+    return {
+        'p50': round(percentile(values, 50), 1),
+        'p95': round(percentile(values, 95), 1),
+        'p99': round(percentile(values, 99), 1),
+        'mean': round(sum(values) / len(values), 1),
+        'max': round(values[-1], 1),
+    }
+
+
+class InProcessSender:
+    """
+    Posts through Flask's test client (one per thread): no sockets, just the app
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def post(self, audio):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post('/analyze', data={'audio': (io.BytesIO(audio), 'clip.wav')},
+                               headers={'X-Cache-Bypass': '1'})
+        return response.status_code, response.headers.get('Server-Timing'), response.get_json(silent=True)
+
+
+class HTTPSender:
+    """
+    Posts multipart uploads to a server over HTTP
+    """
+
+    def __init__(self, url, timeout=120):
+        self.url = url.rstrip('/') + '/analyze'
+        self.timeout = timeout
+
+    def post(self, audio):
+        boundary = uuid.uuid4().hex
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="audio"; filename="clip.wav"\r\n'
+                f'Content-Type: audio/wav\r\n\r\n').encode() + audio + f'\r\n--{boundary}--\r\n'.encode()
+        request = urllib.request.Request(self.url, data=body, method='POST', headers={
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+            'X-Cache-Bypass': '1',
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.headers.get('Server-Timing'), json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None, None
+        except OSError:
+            return 0, None, None
+
+
+def run_level(sender, concurrency, lengths, clips, fallbacks):
+    """
+    Send every clip in lengths from concurrency closed-loop clients; returns the level's report
+    """
+    transcription_failed, error_audio_url = fallbacks
+    samples = []
+    samples_lock = threading.Lock()
+    next_index = iter(range(len(lengths)))
+    index_lock = threading.Lock()
+
+    def client():
+        while True:
+            with index_lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            seconds = lengths[index]
+            variants = clips[seconds]
+            started = time.perf_counter()
+            status, timing, result = sender.post(variants[index % len(variants)])
+            elapsed_ms = 1000 * (time.perf_counter() - started)
+            stages = parse_server_timing(timing)
+            # Only the priority lane reports its handoff wait
+            sample = {'seconds': seconds, 'status': status, 'total': elapsed_ms, 'stages': stages,
+                      'lane': 'priority' if 'priority_queue' in stages else 'normal', 'result': result}
+            with samples_lock:
+                samples.append(sample)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, name=f'load-client-{i}') for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    ok = [sample for sample in samples if sample['status'] == 200 and sample['result']]
+    errors = {
+        'http': len(samples) - len(ok),
+        'stt': sum(1 for sample in ok if sample['result'].get('transcript') == transcription_failed),
+        'tts': sum(1 for sample in ok if sample['result'].get('audio_url') == error_audio_url),
+    }
+    failed = errors['http'] + sum(1 for sample in ok if sample['result'].get('transcript') == transcription_failed
+                                  or sample['result'].get('audio_url') == error_audio_url)
+    latency = {'total': summarize([sample['total'] for sample in ok])}
+    for stage in STAGES:
+        latency[stage] = summarize([sample['stages'][stage] for sample in ok if stage in sample['stages']])
+    by_clip = {}
+    for seconds in sorted(set(lengths)):
+        totals = [sample['total'] for sample in ok if sample['seconds'] == seconds]
+        by_clip[f"{seconds:g}"] = {'requests': len(totals), 'total': summarize(totals)}
+    by_lane = {}
+    for lane in LANES:
+        totals = [sample['total'] for sample in ok if sample['lane'] == lane]
+        by_lane[lane] = {'requests': len(totals), 'total': summarize(totals)}
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(ok) / wall, 3) if wall else None,
+        'errors': errors,
+        'error_rate': round(failed / len(samples), 4) if samples else 0.0,
+        'latency_ms': latency,
+        'by_clip_seconds': by_clip,
+        'by_lane': by_lane,
+    }
+
+
+def find_saturation(levels):
+    """
+    The first level whose successor does not raise throughput by SATURATION_GAIN
+    (None when throughput was still climbing at the last level)
+    """
+    for level, following in zip(levels, levels[1:]):
+        if (following['throughput_rps'] or 0) < SATURATION_GAIN * (level['throughput_rps'] or 0):
+            return {'concurrency': level['concurrency'], 'throughput_rps': level['throughput_rps'],
+                    'p95_ms': (level['latency_ms']['total'] or {}).get('p95')}
+    return None
+
+
+def run_load(sender, concurrency_levels, mix, requests, fallbacks, warmup=2, seed=0):
+    """
+    Run every concurrency level against sender; returns the machine-readable report
+    """
+    lengths, clips = build_workload(mix, requests, seed)
+    if warmup:
+        run_level(sender, 1, lengths[:warmup], clips, fallbacks)
+    levels = [run_level(sender, concurrency, lengths, clips, fallbacks) for concurrency in concurrency_levels]
+    return {
+        'mix': [{'seconds': seconds, 'weight': weight} for seconds, weight in mix],
+        'requests_per_level': requests,
+        'levels': levels,
+        'saturation': find_saturation(levels),
+    }
+
+
+def format_report(report):
+    lines = [f"{'clients':>7} {'rps':>8} {'errors':>7} " + ' '.join(f"{name + ' p50/p95/p99 ms':>26}"
+                                                                    for name in ('total',) + STAGES)]
+    for level in report['levels']:
+        cells = []
+        for name in ('total',) + STAGES:
+            stats = level['latency_ms'][name]
+            cells.append(f"{stats['p50']:8.0f}/{stats['p95']:7.0f}/{stats['p99']:7.0f}" if stats else f"{'-':>24}")
+        lines.append(f"{level['concurrency']:>7} {level['throughput_rps']:>8.2f} {level['error_rate']:>7.1%} "
+                     + ' '.join(f"{cell:>26}" for cell in cells))
+        if level['by_lane']['priority']['requests']:
+            lines.append(' ' * 25 + '  '.join(
+                f"{lane} {stats['requests']} req p50/p99 {stats['total']['p50']:.0f}/{stats['total']['p99']:.0f} ms"
+                for lane, stats in level['by_lane'].items() if stats['total']))
+    saturation = report['saturation']
+    if saturation:
+        lines.append(f"saturated at {saturation['concurrency']} clients, {saturation['throughput_rps']} req/s")
+    else:
+        lines.append("not saturated: throughput was still rising at the highest level")
+    return '\n'.join(lines)
+
+
+# Stand-in settings applied for in-process and local-server runs, by flag
+_STAND_IN_FLAGS = {
+    'stt_latency': 'STT_SIM_LATENCY_SECONDS',
+    'stt_per_audio_second': 'STT_SIM_SECONDS_PER_AUDIO_SECOND',
+    'stt_jitter': 'STT_SIM_JITTER',
+    'stt_error_rate': 'STT_SIM_ERROR_RATE',
+    'tts_latency': 'TTS_SIM_LATENCY_SECONDS',
+    'tts_per_char': 'TTS_SIM_SECONDS_PER_CHAR',
+    'tts_error_rate': 'TTS_SIM_ERROR_RATE',
+    'stt_crisis_rate': 'STT_SIM_CRISIS_RATE',
+    'tts_workers': 'TTS_PROCESSES',
+    'tts_priority_workers': 'TTS_PRIORITY_PROCESSES',
+    'priority_lane_workers': 'PRIORITY_LANE_WORKERS',
+}
+_WHOLE_NUMBER_SETTINGS = ('TTS_PROCESSES', 'TTS_PRIORITY_PROCESSES', 'PRIORITY_LANE_WORKERS')
+
+
+def unique_speech_keys(speech_key):
+    """
+    Wrap tts.speak.speech_key so every call returns a new key: no reply then
+    finds its audio already rendered (or rendering), and every one is
+    synthesized afresh
+    """
+    calls = itertools.count()
+    return lambda text: speech_key(f"{text}\n{next(calls)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess',
+                        help='Flask test client, or real HTTP to a local (or --url) server')
+    parser.add_argument('--url', help='load an already running server instead of starting one')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='comma-separated client counts')
+    parser.add_argument('--requests', type=int, default=40, help='requests per concurrency level')
+    parser.add_argument('--mix', default='3:5,10:3,30:1', help='clip seconds:weight pairs')
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', help='write the JSON report here instead of stdout')
+    for flag, setting in _STAND_IN_FLAGS.items():
+        parser.add_argument('--' + flag.replace('_', '-'), type=float, help=f"sets {setting}")
+    parser.add_argument('--no-audio-reuse', action='store_true',
+                        help='render every reply afresh, so TTS capacity is what saturates (not with --url)')
+    args = parser.parse_args(argv)
+
+    if args.report:
+        args.report = os.path.abspath(args.report)
+    if args.url:
+        if args.no_audio_reuse:
+            parser.error('--no-audio-reuse needs the app in this process, not --url')
+        args.mode = 'http'
+    else:
+        # Configure the stand-ins before config.py is imported, and keep the
+        # synthesized audio and logs of the run out of the source tree
+        os.environ['STT_BACKEND'] = 'simulated'
+        os.environ['TTS_BACKEND'] = 'simulated'
+        os.environ.setdefault('LOG_LEVEL', 'WARNING')
+        for flag, setting in _STAND_IN_FLAGS.items():
+            value = getattr(args, flag)
+            if value is not None:
+                os.environ[setting] = str(int(value) if setting in _WHOLE_NUMBER_SETTINGS else value)
+        if SERVER_DIR not in sys.path:
+            sys.path.insert(0, SERVER_DIR)
+        os.chdir(tempfile.mkdtemp(prefix='speech-load-'))
+
+    from utils.stt import TRANSCRIPTION_FAILED
+    from tts.speak import ERROR_AUDIO_URL
+
+    server = None
+    if args.url:
+        sender = HTTPSender(args.url)
+    else:
+        from app import app
+        if args.no_audio_reuse:
+            import tts.speak as speak
+            speak.speech_key = unique_speech_keys(speak.speech_key)
+        if args.mode == 'inprocess':
+            sender = InProcessSender(app)
+        else:
+            from werkzeug.serving import make_server
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, name='load-server', daemon=True).start()
+            sender = HTTPSender(f"http://127.0.0.1:{server.port}")
+
+    try:
+        report = run_load(sender, [int(level) for level in args.concurrency.split(',')], parse_mix(args.mix),
+                          args.requests, (TRANSCRIPTION_FAILED, ERROR_AUDIO_URL), args.warmup, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+    report['mode'] = args.mode
+    if not args.url:
+        import config
+        report['stand_ins'] = {setting: getattr(config, setting) for setting in _STAND_IN_FLAGS.values()}
+        report['stand_ins']['audio_reuse'] = not args.no_audio_reuse
+
+    print(format_report(report), file=sys.stderr)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=1)
+            f.write('\n')
+    else:
+        print(json.dumps(report, indent=1))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Memory and encoding cost of analysis results: the original nested dicts
+against the EmotionAnalysis slot objects.
+
+Run from server/:
+
+    python -m benchmarks.results
+
+Both layouts are measured on the same analyses. Each result is rebuilt from
+its pickle under tracemalloc, so "bytes/result" is what one retained result
+costs on its own. Encoding is timed per result for json.dumps of the dict
+(how jsonify encoded results before), for building the dict view plus
+json.dumps (the compatibility path) and for to_json() (the fast path).
+"""
+import argparse
+import json
+import pickle
+import sys
+import time
+import tracemalloc
+from benchmarks.corpus import corpora
+
+COMPACT = (',', ':')
+
+
+def retained_bytes(pickles):
+    """
+    Traced bytes per object still held after unpickling each of pickles
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = [pickle.loads(data) for data in pickles]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The list holding them is not part of any result
+    held = after - before - sys.getsizeof(objects)
+    return held / len(objects)
+
+
+def time_per_item(fn, items, repeat=5, min_time=0.05):
+    """
+    Best-of-repeat seconds per item, looping enough to last min_time per sample
+    """
+    def sample(number):
+        started = time.perf_counter()
+        for _ in range(number):
+            for item in items:
+                fn(item)
+        return time.perf_counter() - started
+
+    number = 1
+    while True:
+        elapsed = sample(number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, sample(number))
+    return best / (number * len(items))
+
+
+def measure(results, repeat=5, min_time=0.05):
+    """
+    Per-result memory, pickle size and encoding time of both layouts
+    """
+    dicts = [json.loads(json.dumps(result.to_dict())) for result in results]
+    slot_pickles = [pickle.dumps(result) for result in results]
+    dict_pickles = [pickle.dumps(d) for d in dicts]
+    return {
+        'dict': {
+            'bytes_per_result': round(retained_bytes(dict_pickles)),
+            'pickle_bytes': round(sum(map(len, dict_pickles)) / len(dicts)),
+            'encode_us': round(time_per_item(lambda d: json.dumps(d, separators=COMPACT), dicts,
+                                             repeat, min_time) * 1e6, 2)
+        },
+        'slots': {
+            'bytes_per_result': round(retained_bytes(slot_pickles)),
+            'pickle_bytes': round(sum(map(len, slot_pickles)) / len(results)),
+            'encode_us': round(time_per_item(lambda r: r.to_json(), results, repeat, min_time) * 1e6, 2),
+            # _build_dict, not the cached to_dict(), so every call pays for the dict as a first access does
+            'to_dict_encode_us': round(time_per_item(lambda r: json.dumps(r._build_dict(), separators=COMPACT),
+                                                     results, repeat, min_time) * 1e6, 2)
+        }
+    }
+
+
+def run(analyzer, names=None, repeat=5, min_time=0.05):
+    report = {}
+    for name, texts in corpora().items():
+        if names and name not in names:
+            continue
+        report[name] = measure([analyzer.analyze_emotion(text) for text in texts], repeat, min_time)
+    return report
+
+
+def format_report(report):
+    lines = [f"{'corpus':16s} {'layout':6s} {'bytes/result':>12s} {'pickle':>8s} {'encode us':>10s}"]
+    for name, layouts in report.items():
+        for layout, result in layouts.items():
+            lines.append(f"{name:16s} {layout:6s} {result['bytes_per_result']:12d} "
+                         f"{result['pickle_bytes']:8d} {result['encode_us']:10.2f}")
+        lines.append(f"{'':16s} {'':6s} {'':12s} {'':8s} {layouts['slots']['to_dict_encode_us']:10.2f}"
+                     "  (slots via to_dict)")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', action='append', help='only this corpus (repeatable)')
+    parser.add_argument('--repeat', type=int, default=5, help='timing samples (best is kept)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per timing sample')
+    args = parser.parse_args(argv)
+
+    from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+    print(format_report(run(EnhancedEmotionAnalyzer(), args.corpus, args.repeat, args.min_time)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
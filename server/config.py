@@ -0,0 +1,118 @@
+import os
+
+# Runtime settings, overridable through environment variables
+
+# Production server (gunicorn -c gunicorn.conf.py app:app): worker processes, and
+# request threads per worker (requests mostly wait on the recognizer and TTS).
+# One worker by default: async jobs, streamed reply audio and sessions live in the
+# worker that created them, so their follow-up requests must reach the same process
+WEB_BIND = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+WEB_WORKERS = int(os.environ.get('WEB_WORKERS', 1))
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 8))
+WEB_TIMEOUT_SECONDS = int(os.environ.get('WEB_TIMEOUT_SECONDS', 120))
+WEB_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get('WEB_GRACEFUL_TIMEOUT_SECONDS', 30))
+WEB_MAX_REQUESTS = int(os.environ.get('WEB_MAX_REQUESTS', 0))  # recycle a worker after this many (0 = never)
+# Load the app in the parent and fork the workers from it, sharing the analyzers copy-on-write
+WEB_PRELOAD = os.environ.get('WEB_PRELOAD', '1') == '1'
+# Set by gunicorn.conf.py: app.py is being imported by a pre-forking server
+PREFORK = os.environ.get('SPEECH_PREFORK') == '1'
+
+# Batch analysis (POST /analyze/batch); under gunicorn the cores are split between workers
+_BATCH_CPUS = os.cpu_count() or 1
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', max(1, _BATCH_CPUS // WEB_WORKERS) if PREFORK else _BATCH_CPUS))
+BATCH_MAX_TEXTS = int(os.environ.get('BATCH_MAX_TEXTS', 10000))
+
+# /analyze result cache, keyed by a hash of the uploaded audio
+ANALYZE_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYZE_CACHE_MAX_ENTRIES', 256))
+ANALYZE_CACHE_TTL_SECONDS = float(os.environ.get('ANALYZE_CACHE_TTL_SECONDS', 3600))
+ANALYZE_CACHE_DIR = os.environ.get('ANALYZE_CACHE_DIR') or None  # unset = memory only
+# The disk tier is swept every ANALYZE_CACHE_SWEEP_SECONDS: expired entries go, then the
+# oldest while it exceeds ANALYZE_CACHE_DISK_MAX_BYTES (0 = no size cap)
+ANALYZE_CACHE_DISK_MAX_BYTES = int(os.environ.get('ANALYZE_CACHE_DISK_MAX_BYTES', 256 * 1024 * 1024))
+ANALYZE_CACHE_SWEEP_SECONDS = float(os.environ.get('ANALYZE_CACHE_SWEEP_SECONDS', 300))
+
+# Text-to-speech voice settings (part of the synthesized audio cache key)
+TTS_RATE = int(os.environ.get('TTS_RATE', 150))
+TTS_VOLUME = float(os.environ.get('TTS_VOLUME', 0.9))
+TTS_VOICE_HINT = os.environ.get('TTS_VOICE_HINT', 'female')  # first voice whose name contains this
+TTS_PROCESSES = int(os.environ.get('TTS_PROCESSES', 0))  # 0 = one in-process engine thread
+TTS_TIMEOUT_SECONDS = float(os.environ.get('TTS_TIMEOUT_SECONDS', 60))
+# Renders reserved for the priority lane: extra TTS processes (or simulated workers)
+# used only by crisis-flagged requests; the single engine thread orders them first instead
+TTS_PRIORITY_PROCESSES = int(os.environ.get('TTS_PRIORITY_PROCESSES', 1))
+# 'pyttsx3', or 'simulated' for load tests: sleeps base + per-character latency, writes silence, fails at a rate
+TTS_BACKEND = os.environ.get('TTS_BACKEND', 'pyttsx3')
+TTS_SIM_LATENCY_SECONDS = float(os.environ.get('TTS_SIM_LATENCY_SECONDS', 0.1))
+TTS_SIM_SECONDS_PER_CHAR = float(os.environ.get('TTS_SIM_SECONDS_PER_CHAR', 0.002))
+TTS_SIM_ERROR_RATE = float(os.environ.get('TTS_SIM_ERROR_RATE', 0.0))
+
+# Uploads up to this size stay in memory; larger ones spill to a temporary file
+UPLOAD_SPOOL_MAX_BYTES = int(os.environ.get('UPLOAD_SPOOL_MAX_BYTES', 8 * 1024 * 1024))
+
+# Background jobs for /analyze?async=1
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+JOB_RETENTION_SECONDS = float(os.environ.get('JOB_RETENTION_SECONDS', 600))
+JOB_MAX_RETAINED = int(os.environ.get('JOB_MAX_RETAINED', 1000))
+# Queued plus running jobs; further submissions get 503 with Retry-After
+JOB_MAX_ACTIVE = int(os.environ.get('JOB_MAX_ACTIVE', 64))
+JOB_RETRY_AFTER_SECONDS = int(os.environ.get('JOB_RETRY_AFTER_SECONDS', 5))
+
+# Crisis priority lane: transcripts the pre-screen flags as needing immediate attention
+# run sentiment, response and TTS on reserved threads, ahead of routine traffic
+PRIORITY_LANE = os.environ.get('PRIORITY_LANE', '1') == '1'
+PRIORITY_LANE_WORKERS = int(os.environ.get('PRIORITY_LANE_WORKERS', 4))
+
+# Long recordings are split at pauses and the chunks transcribed in parallel
+STT_MAX_CHUNK_SECONDS = float(os.environ.get('STT_MAX_CHUNK_SECONDS', 15))
+STT_MIN_SILENCE_SECONDS = float(os.environ.get('STT_MIN_SILENCE_SECONDS', 0.3))
+STT_CHUNK_WORKERS = int(os.environ.get('STT_CHUNK_WORKERS', 4))
+STT_CHUNK_RETRIES = int(os.environ.get('STT_CHUNK_RETRIES', 2))
+
+# Speech-to-text backend: 'google' (network), 'sphinx' (offline, needs pocketsphinx), 'stub' or 'simulated'
+STT_BACKEND = os.environ.get('STT_BACKEND', 'google')
+STT_LANGUAGE = os.environ.get('STT_LANGUAGE', 'en-US')
+# Stub backend: JSON file mapping SHA-256 of the audio frames to transcripts
+STT_STUB_TRANSCRIPTS = os.environ.get('STT_STUB_TRANSCRIPTS') or None
+STT_STUB_DEFAULT = os.environ.get('STT_STUB_DEFAULT', "I'm feeling a little anxious about tomorrow")
+# Simulated backend (load tests): latency of base + per second of audio, +/- jitter, and an error rate
+STT_SIM_LATENCY_SECONDS = float(os.environ.get('STT_SIM_LATENCY_SECONDS', 0.25))
+STT_SIM_SECONDS_PER_AUDIO_SECOND = float(os.environ.get('STT_SIM_SECONDS_PER_AUDIO_SECOND', 0.05))
+STT_SIM_JITTER = float(os.environ.get('STT_SIM_JITTER', 0.2))
+STT_SIM_ERROR_RATE = float(os.environ.get('STT_SIM_ERROR_RATE', 0.0))
+# Fraction of recordings (chosen by audio hash) transcribed as a crisis statement
+STT_SIM_CRISIS_RATE = float(os.environ.get('STT_SIM_CRISIS_RATE', 0.0))
+
+# WebSocket streaming (/stream): audio is recognized in rolling windows cut at pauses
+STREAM_WINDOW_SECONDS = float(os.environ.get('STREAM_WINDOW_SECONDS', 3))
+# A window with no pause is recognized anyway once it reaches this length
+STREAM_MAX_WINDOW_SECONDS = float(os.environ.get('STREAM_MAX_WINDOW_SECONDS', 8))
+
+# Conversation sessions (X-Session-Id on /analyze): bounded history and rolling trends
+SESSION_MAX_SESSIONS = int(os.environ.get('SESSION_MAX_SESSIONS', 1000))
+SESSION_MAX_TURNS = int(os.environ.get('SESSION_MAX_TURNS', 20))
+SESSION_IDLE_SECONDS = float(os.environ.get('SESSION_IDLE_SECONDS', 1800))
+SESSION_EWMA_ALPHA = float(os.environ.get('SESSION_EWMA_ALPHA', 0.3))
+
+# Synthesized reply audio in static/: evicted by age and total size (0 disables a cap)
+TTS_STORE_MAX_BYTES = int(os.environ.get('TTS_STORE_MAX_BYTES', 512 * 1024 * 1024))
+TTS_STORE_MAX_AGE_SECONDS = float(os.environ.get('TTS_STORE_MAX_AGE_SECONDS', 7 * 24 * 3600))
+TTS_STORE_SWEEP_SECONDS = float(os.environ.get('TTS_STORE_SWEEP_SECONDS', 60))
+# Browser/CDN cache lifetime of content-addressed reply audio
+TTS_AUDIO_MAX_AGE_SECONDS = int(os.environ.get('TTS_AUDIO_MAX_AGE_SECONDS', 365 * 24 * 3600))
+
+# Uploads are downmixed, resampled to 16 kHz, trimmed and normalized before recognition
+STT_PREPROCESS = os.environ.get('STT_PREPROCESS', '1') == '1'
+# Decoder for formats sr.AudioFile cannot read (MP3, M4A, WebM, Ogg)
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+FFMPEG_TIMEOUT_SECONDS = float(os.environ.get('FFMPEG_TIMEOUT_SECONDS', 30))
+
+# Structured JSON logging (one line per event and per trace span)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+# Per-request cProfile: requested with the X-Profile header or sampled at PROFILE_SAMPLE_RATE
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.0))
+# X-Profile is ignored unless enabled; set PROFILE_TOKEN too on anything reachable by clients
+PROFILE_ALLOW_HEADER = os.environ.get('PROFILE_ALLOW_HEADER', '0') == '1'
+# When set, X-Profile must carry this token (and so must profile downloads)
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN') or None
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 100))
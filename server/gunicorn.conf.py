@@ -0,0 +1,69 @@
+"""
+Production server settings:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the parent (preload_app). That loads the
+lexicons, VADER and the NLTK resources before the workers are forked, so the
+workers share those pages copy-on-write instead of each loading its own copy.
+Every worker then starts its own TTS engine and audio store sweeper, since
+threads do not survive a fork.
+
+Threads per worker (WEB_THREADS) serve requests that mostly wait on the
+recognizer and TTS; gthread workers also carry the /stream WebSockets and
+/jobs event streams. Each stage's own pools are sized per worker:
+STT_CHUNK_WORKERS, JOB_WORKERS, TTS_PROCESSES and BATCH_WORKERS (which
+defaults to the host's cores divided by WEB_WORKERS).
+
+WEB_WORKERS defaults to 1. Async jobs (/jobs/<id> and its event
+stream), reply audio that is still streaming and conversation sessions are
+held in the memory of the worker that created them, and gunicorn hands each
+follow-up request to whichever worker accepts it, so with more workers those
+requests can get a 404 or a partial history. Raise it only for clients that
+use the synchronous endpoints.
+
+kill -HUP <master> replaces the workers gracefully. Because the app is
+preloaded, new code is only picked up by a fresh master: start one with
+kill -USR2, then stop the old master with kill -TERM.
+"""
+import gc
+import os
+
+# Tell app.py it is imported by the parent of pre-forked workers
+os.environ['SPEECH_PREFORK'] = '1'
+
+import config  # noqa: E402
+
+bind = config.WEB_BIND
+workers = config.WEB_WORKERS
+worker_class = 'gthread'
+threads = config.WEB_THREADS
+timeout = config.WEB_TIMEOUT_SECONDS
+graceful_timeout = config.WEB_GRACEFUL_TIMEOUT_SECONDS
+max_requests = config.WEB_MAX_REQUESTS
+max_requests_jitter = config.WEB_MAX_REQUESTS // 10
+preload_app = config.WEB_PRELOAD
+
+# Application logs are JSON lines on stdout (utils.tracing); gunicorn's own go to stderr
+errorlog = '-'
+loglevel = config.LOG_LEVEL.lower()
+
+
+def when_ready(server):
+    if preload_app:
+        # Load the analyzers in the parent so the workers share them; no
+        # threads are started before the fork
+        from utils.analyzers import preload
+        preload()
+    # Move everything loaded so far out of the garbage collector's reach, so
+    # collections in the workers never write to (and so copy) those pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import start_background_services
+    if not preload_app:
+        from utils.analyzers import warm_up_async
+        warm_up_async()
+    start_background_services()
@@ -1,11 +1,121 @@
-from flask import Blueprint, request, jsonify
-from utils.stt import transcribe_audio
-from utils.sentiment import analyze_sentiment
-from utils.response import generate_response
-from tts.speak import synthesize_speech
+from flask import Blueprint, Response, request, jsonify, url_for
+from utils.pipeline import STAGES, finish_pipeline, run_pipeline, screen_audio, is_fallback_result
+from utils.batch import analyze_batch
+from utils.cache import ResultCache, content_key
+from utils.jobs import Handoff, JobManager, JobQueueFull
+from utils.metrics import UPLOAD_BYTES
+from utils.sessions import SessionStore
+from utils.stt import preprocess_stats
+from utils.stt_backends import backend_stats
+from tts.progressive import open_stream
+import config
+import os
 
 analyze_bp = Blueprint('analyze', __name__)
 
+# Results of earlier uploads, so client retries skip the whole pipeline
+result_cache = ResultCache(
+    max_entries=config.ANALYZE_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.ANALYZE_CACHE_TTL_SECONDS,
+    disk_dir=config.ANALYZE_CACHE_DIR,
+    disk_max_bytes=config.ANALYZE_CACHE_DISK_MAX_BYTES
+)
+
+# Background executor for /analyze?async=1
+job_manager = JobManager(
+    workers=config.JOB_WORKERS,
+    retention_seconds=config.JOB_RETENTION_SECONDS,
+    max_jobs=config.JOB_MAX_RETAINED,
+    max_active=config.JOB_MAX_ACTIVE
+)
+
+# Conversation history of clients that send a session id
+session_store = SessionStore(
+    max_sessions=config.SESSION_MAX_SESSIONS,
+    max_turns=config.SESSION_MAX_TURNS,
+    idle_seconds=config.SESSION_IDLE_SECONDS,
+    alpha=config.SESSION_EWMA_ALPHA
+)
+
+def _session_id():
+    """
+    Client session id from the X-Session-Id header or a session_id form field
+    """
+    return request.headers.get('X-Session-Id') or request.form.get('session_id') or None
+
+def _cache_bypassed():
+    """
+    Clients skip the cache lookup with X-Cache-Bypass: 1 or Cache-Control: no-cache
+    """
+    return (request.headers.get('X-Cache-Bypass') == '1'
+            or 'no-cache' in request.headers.get('Cache-Control', ''))
+
+def _audio_available(audio_url):
+    """
+    A cached result is only usable while its synthesized audio is on disk or still streaming
+    """
+    filename = os.path.basename(audio_url)
+    return os.path.exists(os.path.join('static', filename)) or open_stream(filename) is not None
+
+def _cached_result(cache_key):
+    cached = result_cache.get(cache_key)
+    if cached is not None and _audio_available(cached['audio_url']):
+        return cached
+    return None
+
+def _cache_result(cache_key, result, session_id):
+    """
+    Cache a result unless a stage fell back to its error value. Session
+    turns are never cached: their response depends on history.
+    """
+    if session_id is None and not is_fallback_result(result):
+        result_cache.set(cache_key, result)
+    return result
+
+def _run_and_cache(cache_key, audio, session_id=None, stream_audio=False):
+    result = run_pipeline(audio, sessions=session_store, session_id=session_id, stream_audio=stream_audio)
+    return _cache_result(cache_key, result, session_id)
+
+def _run_job(job, cache_key, audio_bytes, session_id, stream_audio):
+    # STT and the pre-screen hold a job thread; the rest is handed to its lane,
+    # so flagged jobs skip the routine ones still synthesizing their replies
+    result, lane = screen_audio(audio_bytes, on_stage=job.stage_done)
+    return Handoff(lane, _finish_job, job, cache_key, result, session_id, stream_audio)
+
+def _finish_job(job, cache_key, result, session_id, stream_audio):
+    result = finish_pipeline(result, job.stage_done, sessions=session_store, session_id=session_id,
+                             stream_audio=stream_audio)
+    return _cache_result(cache_key, result, session_id)
+
+def _start_job(cache_key, audio_bytes, cached, session_id=None, stream_audio=False):
+    """
+    Queue the pipeline (or replay a cached result) as a background job; 503
+    with Retry-After while the job queue is full
+    """
+    try:
+        if cached is not None:
+            def replay(job):
+                for stage in STAGES:
+                    job.stage_done(stage, cached[stage])
+                return cached
+            job = job_manager.submit(STAGES, replay)
+        else:
+            job = job_manager.submit(STAGES, _run_job, cache_key, audio_bytes, session_id, stream_audio)
+    except JobQueueFull:
+        response = jsonify({"error": "Too many analyze jobs in progress, retry later"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(config.JOB_RETRY_AFTER_SECONDS)
+        return response
+
+    response = jsonify({
+        "job_id": job.id,
+        "status_url": url_for('jobs.job_status', job_id=job.id),
+        "events_url": url_for('jobs.job_events', job_id=job.id)
+    })
+    response.status_code = 202
+    response.headers['Location'] = url_for('jobs.job_status', job_id=job.id)
+    return response
+
 @analyze_bp.route("/analyze", methods=["POST"])
 def analyze():
     if 'audio' not in request.files:
@@ -13,21 +123,78 @@ def analyze():
 
     audio_file = request.files['audio']
     
-    # STT
-    transcript = transcribe_audio(audio_file)
+    # Content address of the upload
+    audio_bytes = audio_file.read()
+    UPLOAD_BYTES.observe(len(audio_bytes))
+    cache_key = content_key(audio_bytes)
+    
+    session_id = _session_id()
+    # Clients that can play chunked audio get the reply's URL before synthesis finishes
+    stream_audio = request.args.get('stream_audio') == '1'
+    bypass = session_id is not None or _cache_bypassed()
+    cached = None if bypass else _cached_result(cache_key)
     
-    # Sentiment
-    sentiment = analyze_sentiment(transcript)
+    # Async mode: answer at once and run the pipeline in the background
+    if request.args.get('async') == '1':
+        return _start_job(cache_key, audio_bytes, cached, session_id, stream_audio)
     
-    # Generate response
-    reply = generate_response(sentiment, transcript)
+    if cached is not None:
+        response = jsonify(cached)
+        response.headers['X-Cache'] = 'HIT'
+        return response
     
-    # TTS
-    audio_path = synthesize_speech(reply)
+    # STT -> sentiment -> response -> TTS (fallback results are not cached,
+    # so a retry gets a real second attempt)
+    result = _run_and_cache(cache_key, audio_bytes, session_id=session_id, stream_audio=stream_audio)
+
+    response = jsonify(result)
+    response.headers['X-Cache'] = 'BYPASS' if bypass else 'MISS'
+    return response
+
+@analyze_bp.route("/analyze/cache", methods=["GET"])
+def analyze_cache_stats():
+    """
+    Hit/miss counters of the /analyze result cache
+    """
+    return jsonify(result_cache.stats())
+
+
+@analyze_bp.route("/analyze/batch", methods=["POST"])
+def analyze_batch_route():
+    """
+    Score a JSON list of transcripts (or {"transcripts": [...], "enhanced": true})
+    """
+    payload = request.get_json(silent=True)
+    enhanced = request.args.get('enhanced') == '1'
+    if isinstance(payload, dict):
+        enhanced = payload.get('enhanced', enhanced)
+        if not isinstance(enhanced, bool):
+            return jsonify({"error": "enhanced must be true or false"}), 400
+        payload = payload.get('transcripts')
+
+    if not isinstance(payload, list) or not all(isinstance(text, str) for text in payload):
+        return jsonify({"error": "Expected a JSON list of transcripts"}), 400
+    if len(payload) > config.BATCH_MAX_TEXTS:
+        return jsonify({"error": f"Batch too large (max {config.BATCH_MAX_TEXTS} transcripts)"}), 413
+
+    results = analyze_batch(payload, workers=config.BATCH_WORKERS, enhanced=enhanced)
+    if enhanced:
+        # EmotionAnalysis results encode themselves, without building dicts for jsonify
+        body = '{"count":%d,"results":[%s]}\n' % (len(results), ','.join(result.to_json() for result in results))
+        return Response(body, mimetype='application/json')
+
+    return jsonify({
+        "count": len(results),
+        "results": results
+    })
 
+@analyze_bp.route("/analyze/stt", methods=["GET"])
+def stt_backend_stats():
+    """
+    Latency and error counters of each speech-to-text backend, and the audio
+    duration preprocessing has trimmed before recognition
+    """
     return jsonify({
-        "transcript": transcript,
-        "sentiment": sentiment,
-        "response": reply,
-        "audio_url": audio_path
-    }) 
\ No newline at end of file
+        "backends": backend_stats(),
+        "preprocessing": preprocess_stats()
+    })
@@ -0,0 +1,46 @@
+import json
+from flask import Blueprint, Response, jsonify
+from routes.analyze import job_manager
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# Seconds between SSE keep-alive comments while a stage is still running
+KEEPALIVE_SECONDS = 15
+
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """
+    Poll a background /analyze job: status, per-stage progress and the result once done
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.snapshot())
+
+@jobs_bp.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Server-sent events for a job: one 'stage' event per finished stage (transcript
+    first, audio URL last), then 'done' with the full result or 'failed'
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    def stream():
+        index = 0
+        while True:
+            events = job.wait_for_events(index, KEEPALIVE_SECONDS)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                if event in ('done', 'failed'):
+                    return
+            index += len(events)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # don't let nginx buffer the stream
+    })
@@ -0,0 +1,43 @@
+import time
+from flask import Blueprint, Response, g, request
+from utils.metrics import (CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, server_timing,
+                           start_stage_timings, stop_stage_timings)
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Every metric of this process in Prometheus text format
+    """
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
+
+@metrics_bp.before_app_request
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+    g.metrics_in_flight = True
+    g.stage_timings, g.stage_timings_token = start_stage_timings()
+    REQUESTS_IN_FLIGHT.inc()
+
+@metrics_bp.after_app_request
+def _record_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        # Label by route pattern, not path, so /jobs/<job_id> stays one series
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_SECONDS.labels(endpoint=endpoint, method=request.method, status=response.status_code).observe(
+            time.perf_counter() - started
+        )
+    # Per-stage durations of pipeline requests, readable by browsers and load tests
+    timings = g.get('stage_timings')
+    if timings:
+        response.headers['Server-Timing'] = server_timing(timings)
+    return response
+
+@metrics_bp.teardown_app_request
+def _finish_request(error):
+    if g.pop('metrics_in_flight', False):
+        REQUESTS_IN_FLIGHT.dec()
+    token = g.pop('stage_timings_token', None)
+    if token is not None:
+        stop_stage_timings(token)
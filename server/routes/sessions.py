@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from routes.analyze import session_store
+
+sessions_bp = Blueprint('sessions', __name__)
+
+@sessions_bp.route("/sessions/<session_id>/summary", methods=["GET"])
+def session_summary(session_id):
+    """
+    Rolling emotion, sentiment, crisis and topic trends of a conversation, plus its recent turns
+    """
+    summary = session_store.summary(session_id)
+    if summary is None:
+        return jsonify({"error": "Unknown session"}), 404
+    return jsonify(summary)
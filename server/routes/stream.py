@@ -0,0 +1,84 @@
+import json
+from flask import Blueprint
+from flask_sock import Sock
+from utils.analyzers import get_emotion_analyzer
+from utils.response import generate_response
+from utils.streaming import StreamSession
+from utils.stt_backends import get_stt_backend
+
+stream_bp = Blueprint('stream', __name__)
+sock = Sock()
+
+# Sample rates a client may declare, in Hz
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+
+def _sample_rate(value):
+    """
+    The declared sample rate as an int, or None if it is not a whole number in range
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        rate = int(value)
+    except (TypeError, ValueError):
+        return None
+    if rate != value and str(rate) != value:
+        return None
+    return rate if MIN_SAMPLE_RATE <= rate <= MAX_SAMPLE_RATE else None
+
+@sock.route('/stream', bp=stream_bp)
+def stream(ws):
+    """
+    Live analysis over a WebSocket.
+
+    The client may first send a JSON text message {"sample_rate": 16000}, then
+    streams binary frames of 16-bit little-endian mono PCM and ends with
+    {"event": "end"}. Every recognized window is answered with a 'partial'
+    message holding the transcript so far and its sentiment, emotion, crisis
+    and context analysis; the last message is 'final' and adds the response.
+    """
+    session = None
+    sample_rate = 16000
+
+    def send(message):
+        ws.send(json.dumps(message))
+
+    while True:
+        message = ws.receive()
+        if message is None:
+            break
+
+        if isinstance(message, str):
+            try:
+                control = json.loads(message)
+            except ValueError:
+                control = None
+            if not isinstance(control, dict):
+                send({'type': 'error', 'error': 'Control messages must be JSON objects'})
+                continue
+            if control.get('event') == 'end':
+                break
+            if session is None and 'sample_rate' in control:
+                rate = _sample_rate(control['sample_rate'])
+                if rate is None:
+                    send({'type': 'error',
+                          'error': f'sample_rate must be an integer from {MIN_SAMPLE_RATE} to {MAX_SAMPLE_RATE}'})
+                else:
+                    sample_rate = rate
+            continue
+
+        if session is None:
+            session = StreamSession(get_stt_backend().recognize, get_emotion_analyzer(), sample_rate=sample_rate)
+        for update in session.feed(message):
+            send(update)
+
+    if session is None:
+        send({'type': 'final', 'transcript': '', 'response': None})
+        return
+
+    for update in session.finish():
+        send(update)
+    final = {'type': 'final', 'transcript': session.analysis.transcript, **session.analysis.snapshot()}
+    final['response'] = generate_response(final['sentiment'], final['transcript']) if final['transcript'] else None
+    send(final)
@@ -0,0 +1,72 @@
+import os
+import re
+from flask import Blueprint, Response, g, jsonify, request, send_from_directory
+from utils.profiling import PROFILE_FILENAME, RequestProfiler
+from utils.tracing import Span, end_trace, log_error, new_request_id, start_trace
+import config
+
+tracing_bp = Blueprint('tracing', __name__)
+
+# Caller-supplied request ids are kept when they are short and log-safe
+REQUEST_ID = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+profiler = RequestProfiler(config.PROFILE_DIR, sample_rate=config.PROFILE_SAMPLE_RATE,
+                           allow_header=config.PROFILE_ALLOW_HEADER, token=config.PROFILE_TOKEN,
+                           max_files=config.PROFILE_MAX_FILES)
+
+@tracing_bp.before_app_request
+def _start_request():
+    supplied = request.headers.get('X-Request-Id', '')
+    request_id = supplied if REQUEST_ID.fullmatch(supplied) else new_request_id()
+    g.trace_token = start_trace(request_id)
+    g.request_id = request_id
+    g.request_span = Span('request', method=request.method, path=request.path).__enter__()
+
+    if profiler.wanted(request.headers.get('X-Profile')):
+        g.profiler = profiler.start()
+
+@tracing_bp.after_app_request
+def _finish_request(response):
+    response.headers['X-Request-Id'] = g.request_id
+    active = g.pop('profiler', None)
+    if active is not None:
+        try:
+            # Named after the request id unless the client's id does not fit a profile filename
+            request_id = g.request_id if PROFILE_FILENAME.fullmatch(f"{g.request_id}.prof") else new_request_id()
+            filename = profiler.finish(active, request_id)
+            response.headers['X-Profile-Url'] = f"/profiles/{filename}"
+            g.request_span.attributes['profile'] = filename
+        except OSError as e:
+            log_error("Error saving profile", error=str(e))
+    g.request_span.attributes['status'] = response.status_code
+    return response
+
+@tracing_bp.teardown_app_request
+def _end_request(error):
+    # A request that failed before after_request still releases the profiler
+    active = g.pop('profiler', None)
+    if active is not None:
+        active.disable()
+        profiler.release()
+    request_span = g.pop('request_span', None)
+    if request_span is not None:
+        request_span.__exit__(type(error) if error else None, error, None)
+    token = g.pop('trace_token', None)
+    if token is not None:
+        end_trace(token)
+
+@tracing_bp.route("/profiles/<name>", methods=["GET"])
+def download_profile(name):
+    """
+    A stored request profile: the raw .prof (for snakeviz or pstats), or with
+    ?format=text the top functions by cumulative time
+    """
+    if profiler.token is not None and request.headers.get('X-Profile') != profiler.token:
+        return jsonify({"error": "Profile token required"}), 403
+    if not PROFILE_FILENAME.fullmatch(name) or not os.path.exists(os.path.join(profiler.directory, name)):
+        return jsonify({"error": "Unknown profile"}), 404
+    if request.args.get('format') == 'text':
+        limit = request.args.get('limit', 40, type=int)
+        return Response(profiler.summary(name, limit), mimetype='text/plain')
+    return send_from_directory(os.path.abspath(profiler.directory), name, as_attachment=True,
+                               mimetype='application/octet-stream')
@@ -0,0 +1,75 @@
+import threading
+import time
+import pytest
+import app as app_module
+import utils.analyzers as analyzers
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Install a fresh registry of fake analyzers; returns the build log"""
+    built = []
+
+    def factory(name, delay=0.0, error=None):
+        def build():
+            built.append(name)
+            time.sleep(delay)
+            if error:
+                raise RuntimeError(error)
+            return object()
+        return build
+
+    def install(**factories):
+        monkeypatch.setattr(analyzers, '_FACTORIES', factories)
+        monkeypatch.setattr(analyzers, '_instances', {})
+        monkeypatch.setattr(analyzers, '_locks', {name: threading.Lock() for name in factories})
+        monkeypatch.setattr(analyzers, '_status', {
+            name: {'state': 'cold', 'load_seconds': None, 'error': None} for name in factories
+        })
+
+    install.factory = factory
+    install.built = built
+    return install
+
+
+def test_concurrent_first_calls_build_once(registry):
+    registry(slow=registry.factory('slow', delay=0.05))
+    barrier = threading.Barrier(8)
+    results = []
+
+    def lookup():
+        barrier.wait()
+        results.append(analyzers.get_analyzer('slow'))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry.built == ['slow']
+    assert len(results) == 8 and all(result is results[0] for result in results)
+    assert analyzers.readiness()['analyzers']['slow']['state'] == 'ready'
+
+
+def test_failed_warm_up_leaves_analyzer_not_ready(registry):
+    registry(good=registry.factory('good'), broken=registry.factory('broken', error='no lexicon'))
+    assert analyzers.warm_up() is False
+    state = analyzers.readiness()
+    assert state['analyzers']['good']['state'] == 'ready'
+    assert state['analyzers']['broken'] == {'state': 'failed', 'load_seconds': None, 'error': 'no lexicon'}
+    with pytest.raises(RuntimeError):
+        analyzers.get_analyzer('broken')
+
+
+def test_ready_endpoint_reflects_warm_up(registry, monkeypatch):
+    registry(vader=registry.factory('vader'), emotion=registry.factory('emotion'))
+    monkeypatch.setattr(app_module, '_services_started', True)
+    client = app_module.app.test_client()
+
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['analyzers']['emotion']['state'] == 'cold'
+
+    analyzers.warm_up()
+    response = client.get('/ready')
+    assert response.status_code == 200 and response.get_json()['ready']
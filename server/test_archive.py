@@ -0,0 +1,147 @@
+import csv
+import gzip
+import json
+import pytest
+import analyze_archive
+from utils import archive
+from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+
+TEXTS = [
+    "I'm so happy about my new job!",
+    "I'm feeling really anxious about my upcoming presentation",
+    "I can't take it anymore, I want to end it all",
+    "My boss and the deadline make me so stressed",
+    "",
+    "Talking helped, I feel a bit better and hopeful",
+    "I'm not happy with how things are going...",
+]
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return EnhancedEmotionAnalyzer()
+
+
+def write_jsonl(path, count=len(TEXTS)):
+    with open(path, 'w') as f:
+        for i in range(count):
+            f.write(json.dumps({'id': f"call-{i}", 'transcript': TEXTS[i % len(TEXTS)]}) + '\n')
+    return str(path)
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_jsonl_rows_match_the_analyzer(tmp_path, analyzer):
+    source = tmp_path / 'in.jsonl'
+    write_jsonl(source)
+    with open(source, 'a') as f:
+        f.write('\n"a bare transcript"\n{"id": "no-text"}\nnot json\n')
+    stats = archive.run_archive(str(source), str(tmp_path / 'out.jsonl'), chunk_size=3)
+
+    rows = read_jsonl(tmp_path / 'out.jsonl')
+    assert stats['records'] == len(rows) == len(TEXTS) + 3 and stats['errors'] == 2
+    for i, text in enumerate(TEXTS):
+        expected = dict(zip(archive.COLUMNS, archive.analysis_row(f"call-{i}", analyzer.analyze_emotion(text))))
+        assert rows[i] == json.loads(json.dumps(expected))
+    assert rows[2]['needs_immediate_attention'] and rows[2]['crisis_indicators']
+    assert rows[3]['primary_topic'] == 'work'
+    # Ids default to the record number; bad records keep their place
+    assert rows[-3]['id'] == 7 and rows[-3]['error'] is None
+    assert (rows[-2]['id'], rows[-2]['error'], rows[-2]['compound']) == ('no-text', "missing text field 'transcript'", None)
+    assert (rows[-1]['id'], rows[-1]['error']) == (9, 'invalid JSON')
+    assert not (tmp_path / 'out.jsonl.checkpoint').exists()
+
+
+def test_gzipped_csv_to_csv(tmp_path):
+    source = tmp_path / 'calls.csv.gz'
+    with gzip.open(source, 'wt', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['call', 'text'])
+        for i, text in enumerate(TEXTS):
+            writer.writerow([f"c{i}", text])
+    archive.run_archive(str(source), str(tmp_path / 'out.csv'), text_field='text', id_field='call')
+
+    with open(tmp_path / 'out.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['id'] for row in rows] == [f"c{i}" for i in range(len(TEXTS))]
+    assert json.loads(rows[0]['topics']) == {'work': 1}
+    assert rows[4]['primary_emotion'] == 'neutral'
+
+    with pytest.raises(ValueError, match="no 'transcript' column"):
+        archive.run_archive(str(source), str(tmp_path / 'other.csv'))
+
+
+def test_interrupted_run_resumes_where_it_stopped(tmp_path):
+    source = write_jsonl(tmp_path / 'in.jsonl', count=40)
+    archive.run_archive(source, str(tmp_path / 'expected.jsonl'))
+
+    output = str(tmp_path / 'out.jsonl')
+
+    def interrupt(stats):
+        if stats['records'] >= 20:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        archive.run_archive(source, output, chunk_size=5, checkpoint_every=10, progress=interrupt, progress_seconds=0)
+    checkpoint = archive.load_checkpoint(output)
+    assert checkpoint['records'] == 20 and len(read_jsonl(output)) == 20
+
+    # Rows written after the last checkpoint (here, a torn line) are dropped on resume
+    with open(output, 'a') as f:
+        f.write('{"id":"call-20","err')
+    stats = archive.run_archive(source, output, chunk_size=5, checkpoint_every=10)
+    assert stats['resumed_from'] == 20 and stats['records'] == 40
+    assert read_jsonl(output) == read_jsonl(tmp_path / 'expected.jsonl')
+    assert archive.load_checkpoint(output) is None
+
+
+def test_refuses_to_overwrite_or_mix_runs(tmp_path):
+    source = write_jsonl(tmp_path / 'in.jsonl')
+    output = str(tmp_path / 'out.jsonl')
+    archive.run_archive(source, output)
+    with pytest.raises(ValueError, match='no checkpoint'):
+        archive.run_archive(source, output)
+    assert archive.run_archive(source, output, restart=True)['records'] == len(TEXTS)
+
+    archive.save_checkpoint(output, dict(archive.load_checkpoint(output) or {}, version=1, input='elsewhere'))
+    with pytest.raises(ValueError, match='input differs'):
+        archive.run_archive(source, output)
+    with pytest.raises(ValueError, match='Cannot tell the format'):
+        archive.run_archive(source, str(tmp_path / 'out.txt'))
+
+
+def test_worker_pool_keeps_order_and_bounds_read_ahead():
+    pulled = []
+
+    def chunks():
+        for i in range(0, 40, 4):
+            pulled.append(i)
+            yield [(i + j, TEXTS[(i + j) % len(TEXTS)], None) for j in range(4)]
+
+    results = archive.analyze_in_order(chunks(), workers=2)
+    first = next(results)
+    # Two chunks per worker are in flight; nothing more has been read
+    assert len(pulled) == 4
+    ids = [row[0] for row in first] + [row[0] for rows in results for row in rows]
+    assert ids == list(range(40))
+
+
+def test_cli(tmp_path, capsys):
+    source = write_jsonl(tmp_path / 'in.jsonl')
+    assert analyze_archive.main([source, str(tmp_path / 'out.jsonl'), '--workers', '1']) == 0
+    stats = json.loads(capsys.readouterr().out)
+    assert stats['records'] == len(TEXTS) and stats['records_per_second'] > 0
+    assert analyze_archive.main([source, str(tmp_path / 'out.jsonl'), '--workers', '1']) == 2
+
+
+def test_parquet_parts(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    source = write_jsonl(tmp_path / 'in.jsonl', count=25)
+    output = str(tmp_path / 'out.parquet')
+    archive.run_archive(source, output, checkpoint_every=10)
+    table = pq.read_table(output)
+    assert table.num_rows == 25 and table.column_names == list(archive.COLUMNS)
+    assert table.column('id').to_pylist()[:2] == ['call-0', 'call-1']
@@ -0,0 +1,34 @@
+from app import app
+from utils.batch import analyze_batch
+from utils.sentiment import analyze_sentiment
+
+TEXTS = [
+    "I'm so happy about my new job!",
+    "I'm feeling really anxious about my upcoming presentation",
+    "I'm sad because I had a fight with my best friend",
+    "The meeting is at three",
+] * 5
+
+
+def test_analyze_batch_preserves_input_order():
+    expected = [analyze_sentiment(text) for text in TEXTS]
+    assert analyze_batch(TEXTS, workers=2, chunksize=3) == expected
+    assert analyze_batch(TEXTS, workers=1) == expected
+    assert analyze_batch([], workers=2) == []
+
+
+def test_batch_route():
+    client = app.test_client()
+    response = client.post('/analyze/batch', json=TEXTS[:4])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 4
+    assert body['results'] == [analyze_sentiment(text) for text in TEXTS[:4]]
+
+    assert client.post('/analyze/batch', json={'transcripts': 'not a list'}).status_code == 400
+    assert client.post('/analyze/batch', json=[1, 2]).status_code == 400
+    # enhanced must be a JSON boolean, so "false" does not switch it on
+    for flag in ['false', '0', 1, None]:
+        assert client.post('/analyze/batch', json={'transcripts': TEXTS[:1], 'enhanced': flag}).status_code == 400
+    body = client.post('/analyze/batch', json={'transcripts': TEXTS[:1], 'enhanced': False}).get_json()
+    assert body['results'] == [analyze_sentiment(TEXTS[0])]
@@ -0,0 +1,69 @@
+import json
+from benchmarks import emotion
+from benchmarks.corpus import corpora, golden_corpus, synthetic_text
+from benchmarks.golden import check_golden, diff_outputs, write_golden
+from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+
+
+def test_scores_match_golden_outputs():
+    analyzer = EnhancedEmotionAnalyzer()
+    assert check_golden(analyzer.analyze_emotion) == {}
+    # The vectorized corpus path must produce the same pinned scores
+    texts = [text for _, text in golden_corpus()]
+    by_text = dict(zip(texts, analyzer.analyze_corpus(texts)))
+    assert check_golden(by_text.__getitem__) == {}
+
+
+def test_golden_check_reports_changed_scores(tmp_path):
+    analyzer = EnhancedEmotionAnalyzer()
+    path = tmp_path / 'golden.json'
+    write_golden(analyzer.analyze_emotion, str(path))
+
+    def drifted(text):
+        result = analyzer.analyze_emotion(text)
+        result.confidence += 1e-6
+        return result
+
+    failures = check_golden(drifted, str(path))
+    assert len(failures) == len(golden_corpus())
+    assert all(differences[0].startswith('confidence.overall: ') for differences in failures.values())
+
+    golden = json.loads(path.read_text())
+    golden['sentence/0']['sha256'] = '0' * 64
+    path.write_text(json.dumps(golden))
+    assert check_golden(analyzer.analyze_emotion, str(path)) == {
+        'sentence/0': ['corpus text changed; regenerate golden.json']
+    }
+
+
+def test_diff_outputs_tolerates_float_rounding_only():
+    assert diff_outputs({'a': 0.1 + 0.2, 'b': [1, 'x']}, {'a': 0.3, 'b': [1, 'x']}) == []
+    assert diff_outputs({'a': 0, 'b': ['x']}, {'a': 0.0, 'b': ['x', 'y']}) == ["b: ['x'] != ['x', 'y']"]
+    assert diff_outputs({'level': 'low'}, {'level': 'none', 'extra': 1}) == [
+        "extra: '<missing>' != 1", "level: 'low' != 'none'"
+    ]
+
+
+def test_corpora_are_deterministic():
+    assert synthetic_text(200, seed=3) == synthetic_text(200, seed=3)
+    assert synthetic_text(200, seed=3) != synthetic_text(200, seed=4)
+    sizes = {name: len(texts[0].split()) for name, texts in corpora().items()}
+    assert sizes['sentence'] < sizes['paragraph'] < sizes['transcript']
+    assert sizes['synthetic_5000'] >= 5000
+
+
+def test_run_reports_every_stage_and_memory():
+    report = emotion.run(EnhancedEmotionAnalyzer(), names=['sentence'], repeat=1, min_time=0.001)
+    result = report['corpora']['sentence']
+    assert set(result['stages']) == set(emotion.stages(None))
+    assert all(stage['per_text_us'] > 0 for stage in result['stages'].values())
+    assert result['memory']['peak_kib'] > 0
+
+    # Compared with itself there is nothing to report...
+    assert emotion.compare(report, report) == []
+    # ...but a baseline that was twice as fast, or allocated far less, is a regression
+    faster = json.loads(json.dumps(report))
+    faster['corpora']['sentence']['stages']['scan']['normalized'] /= 2
+    faster['corpora']['sentence']['memory']['peak_kib'] = 1.0
+    metrics = [regression['metric'] for regression in emotion.compare(faster, report)]
+    assert metrics == ['time:scan', 'memory:peak_kib']
@@ -0,0 +1,82 @@
+import io
+import os
+import time
+import routes.analyze as analyze_route
+import utils.pipeline as pipeline
+from app import app
+from utils.cache import ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = ResultCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.set('a', {'v': 1})
+    cache.set('b', {'v': 2})
+    assert cache.get('a') == {'v': 1}
+    cache.set('c', {'v': 3})  # evicts 'b', the least recently used
+    assert cache.get('b') is None
+    clock.now += 11
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 2, 1)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    ResultCache(disk_dir=str(tmp_path)).set('key', {'transcript': 'hello'})
+    restarted = ResultCache(disk_dir=str(tmp_path))
+    assert restarted.get('key') == {'transcript': 'hello'}
+    assert restarted.stats()['disk_hits'] == 1
+
+
+def test_disk_sweep_drops_expired_then_oldest_entries(tmp_path):
+    cache = ResultCache(max_entries=1, ttl_seconds=3600, disk_dir=str(tmp_path))
+    now = time.time()
+    for age, key in [(7200, 'expired'), (30, 'old'), (20, 'middle'), (10, 'new')]:
+        cache.set(key, {'transcript': 'x' * 20})
+        os.utime(tmp_path / f"{key}.json", (now - age, now - age))
+    stale = tmp_path / 'crashed.json.1.2.tmp'
+    stale.write_text('{')
+    os.utime(stale, (now - 7200, now - 7200))
+
+    # Room for the two newest entries (stored_at makes sizes differ by a byte or so)
+    cache.disk_max_bytes = sum((tmp_path / f"{key}.json").stat().st_size for key in ('middle', 'new'))
+    assert cache.sweep_disk() == 2
+    assert sorted(os.listdir(tmp_path)) == ['middle.json', 'new.json']
+    assert cache.stats()['disk_evictions'] == 2
+    # Within the caps, nothing more goes
+    assert cache.sweep_disk() == 0
+    assert ResultCache(disk_dir=str(tmp_path)).get('middle') == {'transcript': 'x' * 20}
+
+
+def test_repeated_upload_skips_pipeline(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('static')
+    open(os.path.join('static', 'reply.wav'), 'wb').close()
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    monkeypatch.setattr(pipeline, 'transcribe_audio', lambda f: calls.append('stt') or 'hello there')
+    monkeypatch.setattr(pipeline, 'synthesize_speech', lambda text: calls.append('tts') or '/static/reply.wav')
+
+    client = app.test_client()
+
+    def upload(**headers):
+        data = {'audio': (io.BytesIO(b'RIFF fake audio'), 'clip.wav')}
+        return client.post('/analyze', data=data, headers=headers)
+
+    first = upload()
+    second = upload()
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+    assert calls == ['stt', 'tts']
+
+    assert upload(**{'X-Cache-Bypass': '1'}).headers['X-Cache'] == 'BYPASS'
+    assert calls == ['stt', 'tts', 'stt', 'tts']
@@ -0,0 +1,83 @@
+import io
+import json
+import threading
+import time
+import pytest
+import routes.analyze as analyze_route
+import utils.pipeline as pipeline
+from app import app
+from utils.cache import ResultCache
+from utils.jobs import JobManager, JobQueueFull
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_async_analyze_streams_stages_in_order(monkeypatch):
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    monkeypatch.setattr(pipeline, 'transcribe_audio', lambda audio: 'I feel great')
+    monkeypatch.setattr(pipeline, 'synthesize_speech', lambda text: '/static/reply.wav')
+
+    client = app.test_client()
+    response = client.post('/analyze?async=1', data={'audio': (io.BytesIO(b'RIFF clip'), 'clip.wav')})
+    assert response.status_code == 202
+    job = response.get_json()
+
+    events = parse_sse(client.get(job['events_url']).get_data(as_text=True))
+    stages = [data['stage'] for event, data in events if event == 'stage']
+    assert stages == ['transcript', 'sentiment', 'response', 'audio_url']
+    assert events[-1][0] == 'done'
+    assert events[-1][1]['transcript'] == 'I feel great'
+
+    status = client.get(job['status_url']).get_json()
+    assert status['status'] == 'done'
+    assert all(stage['status'] == 'done' for stage in status['stages'].values())
+    assert status['result']['audio_url'] == '/static/reply.wav'
+
+
+def test_failed_job_reports_error(monkeypatch):
+    def broken(audio):
+        raise RuntimeError('recognizer crashed')
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    monkeypatch.setattr(pipeline, 'transcribe_audio', broken)
+
+    client = app.test_client()
+    job = client.post('/analyze?async=1', data={'audio': (io.BytesIO(b'RIFF other'), 'clip.wav')}).get_json()
+    events = parse_sse(client.get(job['events_url']).get_data(as_text=True))
+    assert events[-1] == ('failed', {'error': 'recognizer crashed'})
+    assert client.get('/jobs/unknown').status_code == 404
+
+
+def test_full_job_queue_is_rejected_until_a_job_finishes():
+    release = threading.Event()
+    manager = JobManager(workers=1, retention_seconds=60, max_jobs=10, max_active=2)
+    running = manager.submit(['wait'], lambda job: release.wait(5))
+    queued = manager.submit(['wait'], lambda job: release.wait(5))
+    with pytest.raises(JobQueueFull):
+        manager.submit(['wait'], lambda job: True)
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while True:
+        try:
+            manager.submit(['wait'], lambda job: True)
+            break
+        except JobQueueFull:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    assert running.finished or queued.finished
+
+
+def test_async_analyze_returns_503_when_jobs_are_full(monkeypatch):
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    monkeypatch.setattr(analyze_route, 'job_manager',
+                        JobManager(workers=1, retention_seconds=60, max_jobs=10, max_active=0))
+
+    response = app.test_client().post('/analyze?async=1', data={'audio': (io.BytesIO(b'RIFF full'), 'clip.wav')})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(analyze_route.config.JOB_RETRY_AFTER_SECONDS)
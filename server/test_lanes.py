@@ -0,0 +1,101 @@
+import io
+import threading
+import time
+import routes.analyze as analyze_route
+import routes.jobs as jobs_route
+import utils.lanes as lanes
+import utils.pipeline as pipeline
+from app import app
+from test_metrics import sample
+from utils.cache import ResultCache
+from utils.jobs import JobManager
+
+CRISIS = "I can't take it anymore, I want to end it all"
+ROUTINE = "My boss keeps moving the deadline and I'm overwhelmed"
+
+
+def test_prescreen():
+    assert lanes.crisis_prescreen(CRISIS)
+    assert not lanes.crisis_prescreen(ROUTINE)
+    assert not lanes.crisis_prescreen('   ')
+    analyzer = lanes.get_emotion_analyzer()
+    for text in (CRISIS, ROUTINE):
+        assert analyzer.needs_immediate_attention(text) == analyzer.analyze_emotion(text).needs_immediate_attention
+
+
+def analyze(monkeypatch, transcript):
+    """Server-Timing header and the (lane, thread name) the TTS stage ran in"""
+    seen = []
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    monkeypatch.setattr(pipeline, 'transcribe_audio', lambda audio: transcript)
+    monkeypatch.setattr(pipeline, 'synthesize_speech', lambda text: seen.append(
+        (lanes.current_lane(), threading.current_thread().name)) or '/static/reply.wav')
+    response = app.test_client().post('/analyze', data={'audio': (io.BytesIO(b'RIFF lane clip'), 'clip.wav')})
+    assert response.status_code == 200 and response.get_json()['transcript'] == transcript
+    return response.headers['Server-Timing'], seen[0]
+
+
+def test_crisis_request_finishes_in_priority_lane(monkeypatch):
+    client = app.test_client()
+    before = client.get('/metrics').get_data(as_text=True)
+    timing, (lane, thread) = analyze(monkeypatch, CRISIS)
+    after = client.get('/metrics').get_data(as_text=True)
+
+    assert lane == lanes.PRIORITY and thread.startswith('priority-lane')
+    assert 'prescreen;dur=' in timing and 'priority_queue;dur=' in timing
+    for name in ('speech_lane_requests_total', 'speech_lane_duration_seconds_count'):
+        line = f'{name}{{lane="priority"}}'
+        assert sample(after, line) == sample(before, line) + 1
+    assert sample(after, 'speech_lane_queue_depth{lane="priority",queue="executor"}') == 0
+
+
+def test_routine_request_stays_in_normal_lane(monkeypatch):
+    timing, (lane, thread) = analyze(monkeypatch, ROUTINE)
+    assert lane == lanes.NORMAL and not thread.startswith('priority-lane')
+    assert 'prescreen;dur=' in timing and 'priority_queue' not in timing
+
+    # With the lane switched off, flagged requests are handled like any other
+    monkeypatch.setattr(lanes.config, 'PRIORITY_LANE', False)
+    timing, (lane, _) = analyze(monkeypatch, CRISIS)
+    assert lane == lanes.NORMAL and 'priority_queue' not in timing
+
+
+def test_flagged_async_job_skips_routine_jobs_still_synthesizing(monkeypatch):
+    # One job thread, and every routine reply stuck in TTS until released
+    release = threading.Event()
+    finished = []
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    manager = JobManager(workers=1, retention_seconds=60, max_jobs=10, max_active=10)
+    monkeypatch.setattr(analyze_route, 'job_manager', manager)
+    monkeypatch.setattr(jobs_route, 'job_manager', manager)
+    monkeypatch.setattr(pipeline, 'transcribe_audio', lambda audio: audio.decode().split(' ', 1)[1])
+
+    def synthesize(text):
+        if lanes.current_lane() == lanes.NORMAL:
+            release.wait(10)
+        finished.append(lanes.current_lane())
+        return '/static/reply.wav'
+    monkeypatch.setattr(pipeline, 'synthesize_speech', synthesize)
+
+    client = app.test_client()
+
+    def submit(index, transcript):
+        audio = f"{index} {transcript}".encode()
+        response = client.post('/analyze?async=1', data={'audio': (io.BytesIO(audio), 'clip.wav')})
+        return response.get_json()['status_url']
+
+    try:
+        routine = [submit(i, ROUTINE) for i in range(3)]
+        flagged = submit(3, CRISIS)
+        deadline = time.monotonic() + 10
+        while client.get(flagged).get_json()['status'] != 'done':
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert finished == [lanes.PRIORITY]
+        assert all(client.get(url).get_json()['status'] == 'running' for url in routine)
+    finally:
+        release.set()
+    deadline = time.monotonic() + 10
+    while any(client.get(url).get_json()['status'] != 'done' for url in routine):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
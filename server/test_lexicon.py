@@ -0,0 +1,34 @@
+from utils.lexicon import LexiconMatcher, group_matches
+
+
+def build_matcher():
+    matcher = LexiconMatcher()
+    matcher.add_many(['sad', 'down'], 'emotion', 'sadness')
+    matcher.add_many(['everyone would be better off', 'better off dead'], 'crisis')
+    matcher.add_many(["can't take it anymore"], 'crisis')
+    matcher.add_many(["can't take it"], 'hopeless')
+    return matcher
+
+
+def test_matches_whole_words_only():
+    matcher = build_matcher()
+    assert matcher.find("The crusade went downtown") == []
+    hits = matcher.find("I feel SAD today")
+    assert [(m.phrase, m.category, m.label, m.start, m.end) for m in hits] == [
+        ('sad', 'emotion', 'sadness', 7, 10)
+    ]
+
+
+def test_reports_overlapping_phrases():
+    matcher = build_matcher()
+    grouped = group_matches(matcher.find("Everyone would be better off dead, I can’t take it anymore"))
+    assert grouped['crisis'][None] == [
+        'everyone would be better off', 'better off dead', "can't take it anymore"
+    ]
+    assert grouped['hopeless'][None] == ["can't take it"]
+
+
+def test_group_matches_keeps_distinct_phrases():
+    matcher = build_matcher()
+    grouped = group_matches(matcher.find("sad, so sad and down"))
+    assert grouped == {'emotion': {'sadness': ['sad', 'down']}}
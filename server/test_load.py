@@ -0,0 +1,107 @@
+import io
+import wave
+import pytest
+import speech_recognition as sr
+import tts.speak as speak
+import tts.worker as worker
+import utils.stt_backends as stt_backends
+from app import app
+from benchmarks import load
+from tts.speak import ERROR_AUDIO_URL
+from utils.stt import TRANSCRIPTION_FAILED
+
+
+@pytest.fixture
+def stand_ins(monkeypatch, tmp_path):
+    monkeypatch.setattr(stt_backends.config, 'STT_BACKEND', 'simulated')
+    monkeypatch.setattr(stt_backends.config, 'STT_SIM_LATENCY_SECONDS', 0.01)
+    monkeypatch.setattr(stt_backends.config, 'STT_SIM_SECONDS_PER_AUDIO_SECOND', 0.0)
+    monkeypatch.setattr(stt_backends.config, 'STT_CHUNK_RETRIES', 0)
+    monkeypatch.setattr(stt_backends, '_instances', {})
+    monkeypatch.setattr(worker.config, 'TTS_BACKEND', 'simulated')
+    monkeypatch.setattr(worker.config, 'TTS_SIM_LATENCY_SECONDS', 0.01)
+    monkeypatch.setattr(worker, '_service', None)
+    monkeypatch.setattr(speak, 'STATIC_DIR', str(tmp_path))
+    yield monkeypatch
+    if worker._service is not None:
+        worker._service.shutdown()
+
+
+def test_simulated_backends(tmp_path):
+    audio = sr.AudioData(b'\x00\x01' * 16000 * 4, 16000, 2)
+    slept = []
+    backend = stt_backends.SimulatedBackend(latency=0.2, seconds_per_audio_second=0.1, jitter=0.0,
+                                            error_rate=0.0, sleep=slept.append)
+    transcript = backend.recognize(audio)
+    assert len(transcript.split()) == 10 and transcript == backend.recognize(audio)
+    assert slept == [pytest.approx(0.6)] * 2
+
+    failing = stt_backends.SimulatedBackend(latency=0.0, error_rate=1.0, sleep=slept.append)
+    with pytest.raises(sr.RequestError):
+        failing.recognize(audio)
+
+    service = worker.SimulatedTTSService(latency=0.0, seconds_per_char=0.0, error_rate=0.0)
+    try:
+        path = service.submit("fifteen chars!!", str(tmp_path / "reply.wav")).result(timeout=5)
+        with wave.open(path) as wav:
+            assert wav.getnframes() == 16000
+    finally:
+        service.shutdown()
+
+
+def test_helpers():
+    assert load.parse_mix('3:5,30') == [(3.0, 5.0), (30.0, 1.0)]
+    assert load.parse_server_timing('stt;dur=812.4, sentiment;desc="x";dur=1, total') == {'stt': 812.4, 'sentiment': 1.0}
+    assert load.percentile([1, 2, 3, 4], 50) == 2.5
+    assert load.percentile(list(range(101)), 99) == 99
+    with wave.open(io.BytesIO(load.make_clip(2.5, seed=1))) as wav:
+        assert (wav.getframerate(), wav.getnframes()) == (16000, 40000)
+
+    levels = [{'concurrency': c, 'throughput_rps': rps, 'latency_ms': {'total': {'p95': 100}}}
+              for c, rps in ((1, 2.0), (2, 3.9), (4, 4.1), (8, 4.0))]
+    assert load.find_saturation(levels)['concurrency'] == 2
+    assert load.find_saturation(levels[:2]) is None
+
+
+def test_in_process_load_report(stand_ins):
+    report = load.run_load(load.InProcessSender(app), [1, 3], [(1, 2), (4, 1)], requests=6,
+                           fallbacks=(TRANSCRIPTION_FAILED, ERROR_AUDIO_URL), warmup=1)
+
+    assert [level['concurrency'] for level in report['levels']] == [1, 3]
+    for level in report['levels']:
+        assert level['requests'] == 6 and level['error_rate'] == 0.0
+        assert level['throughput_rps'] > 0
+        for stage in ('total',) + load.STAGES:
+            stats = level['latency_ms'][stage]
+            assert stats['p50'] <= stats['p95'] <= stats['p99'] <= stats['max']
+        # The 10 ms recognizer dominates the stage timings
+        assert level['latency_ms']['stt']['p50'] >= 10
+        assert sum(clip['requests'] for clip in level['by_clip_seconds'].values()) == 6
+
+
+def test_error_rates_are_reported(stand_ins):
+    stand_ins.setattr(stt_backends.config, 'STT_SIM_ERROR_RATE', 1.0)
+    report = load.run_load(load.InProcessSender(app), [2], [(1, 1)], requests=4,
+                           fallbacks=(TRANSCRIPTION_FAILED, ERROR_AUDIO_URL), warmup=0)
+    level = report['levels'][0]
+    assert level['errors'] == {'http': 0, 'stt': 4, 'tts': 0}
+    assert level['error_rate'] == 1.0
+
+
+def test_priority_lane_holds_while_normal_lane_saturates(stand_ins):
+    # One routine and one reserved renderer, every reply rendered afresh
+    stand_ins.setattr(stt_backends.config, 'STT_SIM_CRISIS_RATE', 0.25)
+    stand_ins.setattr(worker.config, 'TTS_PROCESSES', 1)
+    stand_ins.setattr(worker.config, 'TTS_PRIORITY_PROCESSES', 1)
+    stand_ins.setattr(worker.config, 'TTS_SIM_LATENCY_SECONDS', 0.05)
+    stand_ins.setattr(worker.config, 'TTS_SIM_SECONDS_PER_CHAR', 0.0)
+    stand_ins.setattr(speak, 'speech_key', load.unique_speech_keys(speak.speech_key))
+    report = load.run_load(load.InProcessSender(app), [8], [(1, 1)], requests=32,
+                           fallbacks=(TRANSCRIPTION_FAILED, ERROR_AUDIO_URL), warmup=0)
+
+    lanes = report['levels'][0]['by_lane']
+    assert lanes['priority']['requests'] and lanes['normal']['requests'] > lanes['priority']['requests']
+    assert sum(lane['requests'] for lane in lanes.values()) == 32
+    # Routine requests queue for the single renderer; flagged ones do not
+    assert lanes['priority']['total']['p99'] < lanes['normal']['total']['p50']
+    assert 'normal' in load.format_report(report) and 'priority' in load.format_report(report)
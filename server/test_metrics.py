@@ -0,0 +1,84 @@
+import io
+import time
+import routes.analyze as analyze_route
+import utils.pipeline as pipeline
+from app import app
+from utils.cache import ResultCache
+from utils.metrics import Counter, Histogram, Registry, track_stage, STAGE_SECONDS
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with line_start"""
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def test_text_format():
+    registry = Registry()
+    errors = Counter('demo_errors_total', 'Demo errors', ['stage'], registry=registry)
+    latency = Histogram('demo_seconds', 'Demo latency', buckets=(0.1, 1.0), registry=registry)
+    errors.labels(stage='stt').inc()
+    errors.labels(stage='stt').inc(2)
+    errors.labels(stage='say "hi"').inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert registry.render().splitlines() == [
+        '# HELP demo_errors_total Demo errors',
+        '# TYPE demo_errors_total counter',
+        'demo_errors_total{stage="say \\"hi\\""} 1',
+        'demo_errors_total{stage="stt"} 3',
+        '# HELP demo_seconds Demo latency',
+        '# TYPE demo_seconds histogram',
+        'demo_seconds_bucket{le="0.1"} 1',
+        'demo_seconds_bucket{le="1.0"} 2',
+        'demo_seconds_bucket{le="+Inf"} 3',
+        'demo_seconds_sum 5.55',
+        'demo_seconds_count 3',
+    ]
+
+
+def test_analyze_is_instrumented(monkeypatch):
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    monkeypatch.setattr(pipeline, 'transcribe_audio', lambda audio: pipeline.TRANSCRIPTION_FAILED)
+    monkeypatch.setattr(pipeline, 'synthesize_speech', lambda text: '/static/reply.wav')
+    client = app.test_client()
+
+    before = client.get('/metrics').get_data(as_text=True)
+    response = client.post('/analyze', data={'audio': (io.BytesIO(b'RIFF metrics clip'), 'clip.wav')})
+    assert response.status_code == 200
+    metrics = client.get('/metrics')
+    assert metrics.content_type.startswith('text/plain; version=0.0.4')
+    after = metrics.get_data(as_text=True)
+
+    for stage in ('stt', 'sentiment', 'response', 'tts'):
+        line = f'speech_stage_duration_seconds_count{{stage="{stage}"}}'
+        assert sample(after, line) == sample(before, line) + 1
+    line = 'speech_stage_fallbacks_total{stage="stt"}'
+    assert sample(after, line) == sample(before, line) + 1
+    assert sample(after, 'speech_upload_bytes_count') == sample(before, 'speech_upload_bytes_count') + 1
+    line = 'http_request_duration_seconds_count{endpoint="/analyze",method="POST",status="200"}'
+    assert sample(after, line) == sample(before, line) + 1
+    # Only the /metrics request itself is in flight
+    assert sample(after, 'http_requests_in_flight') == 1
+
+
+def test_instrumentation_overhead_is_small():
+    # One request does four stage timings plus a handful of counter updates;
+    # that must stay far below a millisecond, since stages take tens of ms or more
+    rounds = 20000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        with track_stage('overhead-test'):
+            pass
+    per_stage = (time.perf_counter() - started) / rounds
+    assert per_stage < 50e-6
+
+    histogram = STAGE_SECONDS.labels(stage='overhead-test')
+    started = time.perf_counter()
+    for _ in range(rounds):
+        histogram.observe(0.01)
+    assert (time.perf_counter() - started) / rounds < 20e-6
@@ -0,0 +1,51 @@
+import pytest
+from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return EnhancedEmotionAnalyzer()
+
+
+def emotions(analyzer, text):
+    return analyzer._detect_emotions(text)
+
+
+def test_multi_word_modifiers(analyzer):
+    assert emotions(analyzer, "I'm kind of sad")['sadness'] == pytest.approx(0.7)
+    scores = emotions(analyzer, "just a little nervous")
+    assert scores['fear'] == scores['worry'] == pytest.approx(0.7)
+    # Intensifiers add half a point to every emotion of the following keyword
+    scores = emotions(analyzer, "really excited")
+    assert (scores['joy'], scores['anticipation'], scores['excitement']) == (1.5, 1.5, 1.5)
+    # The longest keyword after the modifier wins
+    assert emotions(analyzer, "very looking forward")['anticipation'] == 1.5
+    assert emotions(analyzer, "kind of")['sadness'] == 0
+
+
+def test_negation_applies_once_per_negated_keyword(analyzer):
+    scores = emotions(analyzer, "I am not happy")
+    assert (scores['joy'], scores['sadness']) == (0, 0.5)
+    scores = emotions(analyzer, "never sad, not afraid")
+    assert (scores['sadness'], scores['joy'], scores['fear'], scores['trust']) == (0, 0.5, 0, 0.5)
+    # Every negation occurrence counts, each against the keyword right after it
+    scores = emotions(analyzer, "not happy and not happy")
+    assert (scores['joy'], scores['sadness']) == (0, 1.0)
+    assert emotions(analyzer, "not today, happy")['joy'] == 1
+
+
+def test_keyword_index_matches_per_emotion_scan(analyzer):
+    for keyword in {keyword for keywords in analyzer.emotion_keywords.values() for keyword in keywords}:
+        expected = tuple(emotion for emotion, keywords in analyzer.emotion_keywords.items() if keyword in keywords)
+        assert analyzer.keyword_emotions[keyword] == expected
+        scan = analyzer._scan(f"very {keyword} today")
+        modifier = next(hit for hit in scan.hits if hit.category == 'intensifier')
+        assert analyzer._emotions_after(scan, modifier) == expected
+    scan = analyzer._scan("very")
+    assert analyzer._emotions_after(scan, scan.hits[0]) == ()
+
+
+def test_repeated_words_use_the_shared_tokens(analyzer):
+    # Contractions are one token, so "I'm ... I" is no longer a repeat as it was with word_tokenize
+    assert 'emphasis' not in analyzer._analyze_linguistic_patterns("I'm sure I know")
+    assert analyzer._analyze_linguistic_patterns("I know, I know")['emphasis'] == pytest.approx(0.2)
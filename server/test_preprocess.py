@@ -0,0 +1,95 @@
+import io
+import os
+import struct
+import wave
+import numpy as np
+import speech_recognition as sr
+import utils.stt as stt
+from utils.preprocess import pcm_to_float, resample, trim_silence
+
+
+def tone(seconds, rate, frequency=440.0, amplitude=0.5):
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def wav_bytes(samples, rate, channels=1):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    if channels > 1:
+        pcm = np.repeat(pcm, channels)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def dominant_frequency(samples, rate):
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.fft.rfftfreq(len(samples), 1 / rate)[spectrum.argmax()]
+
+
+def test_pcm_to_float_decodes_every_width_and_downmixes():
+    assert np.allclose(pcm_to_float(bytes([0, 128, 255]), 1), [-1.0, 0.0, 127 / 128])
+    assert np.allclose(pcm_to_float(struct.pack('<hh', -32768, 16384), 2), [-1.0, 0.5])
+    assert np.allclose(pcm_to_float(b'\x00\x00\x80' + b'\x00\x00\x40', 3), [-1.0, 0.5])
+    assert np.allclose(pcm_to_float(struct.pack('<ii', -2 ** 31, 2 ** 30), 4), [-1.0, 0.5])
+    # Left/right pairs are averaged
+    assert np.allclose(pcm_to_float(struct.pack('<hhhh', 16384, 0, -16384, -16384), 2, channels=2), [0.25, -0.5])
+
+
+def test_resample_keeps_speech_band_and_removes_aliases():
+    rate = 48000
+    resampled = resample(tone(1.0, rate, 440.0), rate, 16000)
+    assert len(resampled) == 16000
+    assert abs(dominant_frequency(resampled, 16000) - 440.0) <= 1.0
+
+    # A 12 kHz tone cannot be represented at 16 kHz and must not fold back as 4 kHz
+    aliased = resample(tone(1.0, rate, 12000.0), rate, 16000)
+    assert np.abs(aliased[100:-100]).max() < 0.05
+
+
+def test_trim_silence_keeps_speech_and_a_margin():
+    rate = 16000
+    silence = np.zeros(rate, dtype=np.float32)
+    samples = np.concatenate([silence, tone(1.0, rate), silence])
+    trimmed = trim_silence(samples, rate, pad_seconds=0.1)
+    assert 1.15 <= len(trimmed) / rate <= 1.3
+
+
+def test_preprocess_audio_reports_saved_duration():
+    rate = 44100
+    silence = np.zeros(rate, dtype=np.float32)
+    upload = wav_bytes(np.concatenate([silence, tone(1.0, rate, amplitude=0.2), silence]), rate, channels=2)
+
+    audio, stats = stt.preprocess_audio(io.BytesIO(upload))
+    assert isinstance(audio, sr.AudioData)
+    assert audio.sample_rate == 16000 and audio.sample_width == 2
+    assert stats['channels'] == 2 and stats['sample_rate'] == rate
+    assert stats['original_seconds'] == 3.0
+    assert 1.7 <= stats['saved_seconds'] <= 1.9
+    assert len(audio.frame_data) == int(round(stats['processed_seconds'] * 16000)) * 2
+    # Peak-normalized to 90% of full scale
+    peak = np.abs(np.frombuffer(audio.frame_data, dtype='<i2')).max()
+    assert abs(peak - 0.9 * 32767) <= 2
+
+    totals = stt.preprocess_stats()
+    assert totals['recordings'] >= 1 and totals['saved_seconds'] >= stats['saved_seconds']
+
+
+def test_ffmpeg_wav_with_placeholder_sizes_is_parsed():
+    pcm = struct.pack('<4h', 1, -1, 2, -2)
+    piped = (b'RIFF' + struct.pack('<I', 0xFFFFFFFF) + b'WAVE'
+             + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 2, 22050, 88200, 4, 16)
+             + b'LIST' + struct.pack('<I', 4) + b'INFO'
+             + b'data' + struct.pack('<I', 0xFFFFFFFF) + pcm)
+    assert stt._parse_wav_bytes(piped) == (pcm, 2, 2, 22050)
+
+
+def test_unsupported_format_without_ffmpeg_fails_cleanly(monkeypatch, tmp_path):
+    monkeypatch.setattr(stt.config, 'FFMPEG_BINARY', 'no-such-ffmpeg')
+    monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+    assert stt.transcribe_audio(b'ID3\x04 an mp3 upload') == stt.TRANSCRIPTION_FAILED
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,81 @@
+import json
+import pickle
+import pytest
+from app import app
+from benchmarks import results as results_benchmark
+from benchmarks.corpus import golden_corpus
+from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+from utils.results import EMOTIONS, EmotionAnalysis
+
+COMPACT = (',', ':')
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return EnhancedEmotionAnalyzer()
+
+
+@pytest.fixture(scope='module')
+def analyses(analyzer):
+    return [analyzer.analyze_emotion(text) for _, text in golden_corpus()] + [analyzer.analyze_emotion('  ')]
+
+
+def test_fast_encoding_matches_the_dict_view(analyses):
+    for analysis in analyses:
+        assert analysis.to_json() == json.dumps(analysis.to_dict(), separators=COMPACT)
+    # Flask's jsonify goes through the same dict view
+    with app.app_context():
+        assert json.loads(app.json.dumps(analyses[0])) == analyses[0].to_dict()
+
+
+def test_result_reads_like_the_original_dict(analyzer, analyses):
+    assert EMOTIONS == tuple(analyzer.emotion_keywords)
+    analysis = analyzer.analyze_emotion("I'm not happy, I'm really scared and so angry!!")
+    assert list(analysis) == ['basic_sentiment', 'emotions', 'crisis_level', 'context',
+                              'linguistic_patterns', 'overall_analysis', 'confidence']
+    assert list(analysis['emotions']) == list(EMOTIONS)
+    assert analysis['emotions']['fear'] == analysis.emotion('fear') == 1.5
+    assert analysis['emotions']['anger'] == 1 and isinstance(analysis['emotions']['anger'], int)
+    assert analysis['overall_analysis']['primary_emotion'] == analysis.primary_emotion
+    assert analysis == analysis.to_dict() and analysis != analyses[0]
+
+    empty = analyses[-1]
+    assert empty.is_empty and empty.emotion('joy') == 0 and dict(empty.emotion_items()) == {}
+    assert empty.to_dict() == analyzer._empty_analysis().to_dict()
+    assert list(empty['basic_sentiment']) == ['pos', 'neg', 'neu', 'compound']
+    assert empty['context']['emotional_context'] == {}
+
+
+def test_pickles_without_the_dict_view(analyses):
+    analysis = analyses[0]
+    analysis.to_dict()
+    copy = pickle.loads(pickle.dumps(analysis))
+    assert copy == analysis and copy._dict is None
+    assert copy.to_json() == analysis.to_json()
+
+
+def test_enhanced_batch_route_encodes_results_directly(analyzer):
+    texts = ["I'm so happy about my new job!", '', "My boss and the deadline make me so stressed"]
+    response = app.test_client().post('/analyze/batch', json={'transcripts': texts, 'enhanced': True})
+    assert response.status_code == 200 and response.mimetype == 'application/json'
+    body = response.get_json()
+    assert body['count'] == 3
+    assert body['results'] == [json.loads(analyzer.analyze_emotion(text).to_json()) for text in texts]
+
+
+def test_slot_results_are_smaller(analyses):
+    report = results_benchmark.measure(analyses[:10], repeat=1, min_time=0.001)
+    assert report['slots']['bytes_per_result'] < report['dict']['bytes_per_result'] / 2
+    assert report['slots']['pickle_bytes'] < report['dict']['pickle_bytes']
+    assert report['slots']['encode_us'] > 0 and report['dict']['encode_us'] > 0
+
+
+def test_from_stages_rebuilds_the_same_result(analyses):
+    # Blank-input results have no emotion scores to rebuild from
+    for analysis in (analysis for analysis in analyses if analysis.emotions is not None):
+        stages = analysis.to_dict()
+        rebuilt = EmotionAnalysis.from_stages(
+            stages['basic_sentiment'], stages['emotions'], stages['crisis_level'], stages['context'],
+            stages['linguistic_patterns'], stages['overall_analysis'], stages['confidence'])
+        assert rebuilt == analysis
+        assert rebuilt.to_json() == json.dumps(rebuilt.to_dict(), separators=COMPACT) == analysis.to_json()
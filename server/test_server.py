@@ -0,0 +1,111 @@
+import json
+import os
+import runpy
+import subprocess
+import sys
+import textwrap
+import config  # noqa: F401  (loaded, so the gunicorn settings tests can swap it out and restore it)
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Imports the app the way gunicorn does with preload_app, then forks a worker
+PREFORK_SCRIPT = textwrap.dedent("""
+    import json, os, sys, threading
+    sys.path.insert(0, sys.argv[1])
+    settings = __import__('runpy').run_path(os.path.join(sys.argv[1], 'gunicorn.conf.py'))
+    from app import app
+    from utils.analyzers import get_emotion_analyzer
+
+    settings['when_ready'](None)
+    report = {
+        'parent_threads': sorted(thread.name for thread in threading.enumerate()),
+        'parent_ready': app.test_client().get('/ready').status_code,
+        'analyzer_id': id(get_emotion_analyzer()),
+    }
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        settings['post_fork'](None, None)
+        response = app.test_client().get('/ready')
+        child = {
+            'ready': response.status_code,
+            'body': response.get_json(),
+            'threads': sorted(thread.name for thread in threading.enumerate()),
+            'analyzer_id': id(get_emotion_analyzer()),
+        }
+        os.write(write_fd, json.dumps(child).encode())
+        os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    report['child'] = json.loads(os.read(read_fd, 65536))
+    print(json.dumps(report))
+""")
+
+
+def test_prefork_parent_loads_analyzers_and_workers_start_services(tmp_path):
+    env = dict(os.environ, TTS_BACKEND='simulated', LOG_LEVEL='WARNING', WEB_WORKERS='2')
+    completed = subprocess.run([sys.executable, '-c', PREFORK_SCRIPT, SERVER_DIR], cwd=tmp_path, env=env,
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # The parent has loaded everything but started no threads that a fork would lose
+    assert report['parent_threads'] == ['MainThread']
+    assert report['parent_ready'] == 503
+
+    child = report['child']
+    assert child['ready'] == 200 and child['body']['services_started']
+    assert child['body']['analyzers']['emotion']['state'] == 'ready'
+    assert 'audio-store-sweeper' in child['threads']
+    # The worker uses the analyzer the parent loaded, not a copy it built itself
+    assert child['analyzer_id'] == report['analyzer_id']
+
+
+# Imports app.py the way a spawned batch or TTS process does
+SPAWNED_SCRIPT = textwrap.dedent("""
+    import json, os, runpy, sys, threading
+    sys.path.insert(0, sys.argv[1])
+    runpy.run_path(os.path.join(sys.argv[1], 'app.py'), run_name='__mp_main__')
+    from utils.analyzers import readiness
+    print(json.dumps({
+        'threads': sorted(thread.name for thread in threading.enumerate()),
+        'analyzers': readiness()['analyzers'],
+    }))
+""")
+
+
+def test_spawned_children_start_nothing_when_importing_app(tmp_path):
+    env = dict(os.environ, TTS_BACKEND='simulated', LOG_LEVEL='WARNING')
+    completed = subprocess.run([sys.executable, '-c', SPAWNED_SCRIPT, SERVER_DIR], cwd=tmp_path, env=env,
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert report['threads'] == ['MainThread']
+    assert all(status['state'] != 'ready' for status in report['analyzers'].values())
+
+
+def test_gunicorn_settings(monkeypatch):
+    monkeypatch.setenv('WEB_WORKERS', '3')
+    monkeypatch.setenv('WEB_THREADS', '16')
+    monkeypatch.setenv('WEB_MAX_REQUESTS', '1000')
+    monkeypatch.delenv('BATCH_WORKERS', raising=False)
+    monkeypatch.delenv('SPEECH_PREFORK', raising=False)
+    # A fresh config module, read with these settings; the original is restored afterwards
+    monkeypatch.delitem(sys.modules, 'config')
+
+    settings = runpy.run_path(os.path.join(SERVER_DIR, 'gunicorn.conf.py'))
+    assert os.environ['SPEECH_PREFORK'] == '1'
+    assert (settings['workers'], settings['threads'], settings['worker_class']) == (3, 16, 'gthread')
+    assert settings['preload_app'] is True
+    assert settings['max_requests_jitter'] == 100
+    # Batch processes are split between the workers
+    assert sys.modules['config'].BATCH_WORKERS == max(1, (os.cpu_count() or 1) // 3)
+
+
+def test_one_worker_by_default(monkeypatch):
+    # Jobs, streamed audio and sessions are per process, so their follow-up requests need the same worker
+    monkeypatch.delenv('WEB_WORKERS', raising=False)
+    monkeypatch.delenv('SPEECH_PREFORK', raising=False)
+    monkeypatch.delitem(sys.modules, 'config')
+    settings = runpy.run_path(os.path.join(SERVER_DIR, 'gunicorn.conf.py'))
+    assert settings['workers'] == 1
@@ -0,0 +1,109 @@
+import io
+import pytest
+import routes.analyze as analyze_route
+import routes.sessions as sessions_route
+import utils.pipeline as pipeline
+from app import app
+from utils.cache import ResultCache
+from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+from utils.sessions import SessionStore
+
+TURNS = [
+    "I'm so happy about my new job!",
+    "I'm feeling really anxious about my upcoming presentation",
+    "I can't take it anymore, I want to end it all",
+    "My boss and the deadline make me so stressed",
+    "Talking helped, I feel a bit better and hopeful",
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope='module')
+def analyses():
+    analyzer = EnhancedEmotionAnalyzer()
+    return [analyzer.analyze_emotion(text) for text in TURNS]
+
+
+def test_trends_match_a_full_recomputation(analyses):
+    store = SessionStore(max_turns=2, alpha=0.5)
+    for text, analysis in zip(TURNS, analyses):
+        store.record('s1', text, analysis, 'reply')
+    summary = store.summary('s1')
+
+    # Recompute the EWMAs from scratch over every turn
+    expected = 0.0
+    for i, analysis in enumerate(analyses):
+        compound = analysis['basic_sentiment']['compound']
+        expected = compound if i == 0 else 0.5 * compound + 0.5 * expected
+    assert summary['sentiment_trend'] == round(expected, 4)
+
+    joy = 0.0
+    for i, analysis in enumerate(analyses):
+        joy = analysis['emotions']['joy'] if i == 0 else 0.5 * analysis['emotions']['joy'] + 0.5 * joy
+    assert summary['emotion_trend']['joy'] == round(joy, 4)
+
+    assert summary['turns'] == len(TURNS)
+    assert summary['crisis']['max_level'] == max(a['crisis_level']['level'] for a in analyses)
+    assert summary['crisis']['turns_needing_attention'] == 1
+    assert sum(summary['topic_counts'].values()) == len(TURNS)
+    # Only the ring buffer of recent turns is retained
+    assert [turn['transcript'] for turn in summary['recent_turns']] == TURNS[-2:]
+
+
+def test_idle_sessions_are_evicted(analyses):
+    clock = FakeClock()
+    store = SessionStore(idle_seconds=60, clock=clock)
+    store.record('old', TURNS[0], analyses[0], 'reply')
+    clock.now += 30
+    store.record('new', TURNS[1], analyses[1], 'reply')
+    clock.now += 45
+
+    assert store.summary('old') is None
+    assert store.summary('new')['turns'] == 1
+    assert store.evictions == 1
+
+
+def test_session_count_is_capped(analyses):
+    store = SessionStore(max_sessions=2)
+    for session_id in ('a', 'b', 'c'):
+        store.record(session_id, TURNS[0], analyses[0], 'reply')
+    assert len(store) == 2
+    assert store.get('a') is None
+
+
+def test_analyze_with_session_tracks_history(monkeypatch):
+    store = SessionStore()
+    monkeypatch.setattr(analyze_route, 'session_store', store)
+    monkeypatch.setattr(sessions_route, 'session_store', store)
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    transcripts = iter(["I feel sad and lonely", "I'm feeling great today, so happy!"])
+    monkeypatch.setattr(pipeline, 'transcribe_audio', lambda audio: next(transcripts))
+    monkeypatch.setattr(pipeline, 'synthesize_speech', lambda text: '/static/reply.wav')
+    histories = []
+    respond = pipeline.generate_response
+    monkeypatch.setattr(pipeline, 'generate_response',
+                        lambda sentiment, transcript, history=None: histories.append(history) or respond(sentiment, transcript, history))
+
+    client = app.test_client()
+    for _ in range(2):
+        response = client.post('/analyze', data={'audio': (io.BytesIO(b'RIFF same clip'), 'clip.wav')},
+                               headers={'X-Session-Id': 'abc'})
+        assert response.status_code == 200
+        # Identical audio is not served from the cache inside a session
+        assert response.headers['X-Cache'] == 'BYPASS'
+
+    assert histories[0] is None
+    assert histories[1]['turns'] == 1
+    assert response.get_json()['response'].startswith("It sounds like things feel a little lighter")
+
+    summary = client.get('/sessions/abc/summary').get_json()
+    assert summary['turns'] == 2
+    assert [turn['transcript'] for turn in summary['recent_turns']] == ["I feel sad and lonely", "I'm feeling great today, so happy!"]
+    assert client.get('/sessions/unknown/summary').status_code == 404
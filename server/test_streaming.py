@@ -0,0 +1,158 @@
+import json
+import threading
+import numpy as np
+import pytest
+from werkzeug.serving import make_server
+import routes.stream as stream_route
+from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+from utils.streaming import IncrementalAnalysis, StreamSession, StreamingTranscriber
+from test_stt_chunking import RATE, StandInRecognizer, bursts
+
+# Transcripts split so phrases straddle the fragment joins
+STREAMS = [
+    ["Everyone would be better", "off dead and I feel", "worthless"],
+    ["I'm not", "happy and really", "anxious about my boss and the deadline"],
+    ["I can't take it", "anymore. No one cares", "", "I just want to give", "up"],
+    ["The doctor said", "the pain is nothing but I'm kind of", "worried"],
+]
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return EnhancedEmotionAnalyzer()
+
+
+@pytest.mark.parametrize('fragments', STREAMS)
+def test_incremental_analysis_matches_full_scan(analyzer, fragments):
+    incremental = IncrementalAnalysis(analyzer)
+    for fragment in fragments:
+        incremental.extend(fragment)
+
+    text = " ".join(fragment for fragment in fragments if fragment)
+    assert incremental.transcript == text
+    full = analyzer._scan(text)
+    assert incremental.hits == full.hits
+    assert incremental.matches == full.matches
+
+    snapshot = incremental.snapshot()
+    assert snapshot['emotions'] == analyzer._detect_emotions(text)
+    assert snapshot['crisis'] == analyzer._detect_crisis(text)
+    assert snapshot['context'] == analyzer._analyze_context(text)
+
+
+def test_incremental_analysis_only_scans_new_words(analyzer, monkeypatch):
+    incremental = IncrementalAnalysis(analyzer)
+    incremental.extend("I feel fine " * 50)
+
+    scanned = []
+    find = analyzer.matcher.find
+    monkeypatch.setattr(analyzer.matcher, 'find', lambda doc: scanned.append(len(doc.tokens)) or find(doc))
+    incremental.extend("but hopeless")
+    assert scanned == [analyzer.matcher.max_phrase_words - 1 + 2]
+
+
+def test_transcriber_waits_for_a_pause_before_recognizing():
+    recognizer = StandInRecognizer()
+    transcriber = StreamingTranscriber(recognizer, sample_rate=RATE, window_seconds=1.0,
+                                       max_window_seconds=10.0, min_silence_seconds=0.2, retries=0)
+    pcm = bursts(3, burst_seconds=1.0, pause_seconds=0.5).get_raw_data()
+
+    segments = []
+    step = RATE // 10 * 2  # 100 ms frames
+    for offset in range(0, len(pcm), step):
+        segments.extend(transcriber.feed(pcm[offset:offset + step]))
+    segments.extend(transcriber.flush())
+
+    # Each burst is recognized on its own, in order, with stream-relative times
+    assert [segment['text'] for segment in segments] == ['word1', 'word2', 'word3']
+    assert segments[0]['start'] == 0.0
+    for previous, segment in zip(segments, segments[1:]):
+        assert segment['start'] >= previous['end']
+
+
+def test_transcriber_forces_a_cut_without_pauses():
+    recognizer = StandInRecognizer()
+    transcriber = StreamingTranscriber(recognizer, sample_rate=RATE, window_seconds=1.0,
+                                       max_window_seconds=2.0, retries=0)
+    pcm = bursts(1, burst_seconds=5.0, pause_seconds=0.0).get_raw_data()
+    segments = []
+    for offset in range(0, len(pcm), RATE // 2):
+        segments.extend(transcriber.feed(pcm[offset:offset + RATE // 2]))
+    assert segments
+    assert all(segment['end'] - segment['start'] <= 2.0 for segment in segments)
+
+
+def test_session_alerts_on_crisis_before_the_stream_ends(analyzer):
+    words = iter(["I can't take it anymore", "I want to end it all", "please help"])
+    session = StreamSession(lambda audio: next(words), analyzer, sample_rate=RATE,
+                            window_seconds=1.0, min_silence_seconds=0.2, retries=0)
+    pcm = bursts(3, burst_seconds=1.0, pause_seconds=0.5).get_raw_data()
+
+    updates = []
+    for offset in range(0, len(pcm), RATE // 5):
+        updates.extend(session.feed(pcm[offset:offset + RATE // 5]))
+    # The alert goes out with the window that completed "end it all", mid-stream
+    alerts = [update for update in updates if update['alert']]
+    assert alerts and alerts[0]['transcript'] == "I can't take it anymore I want to end it all"
+    assert alerts[0]['crisis']['needs_immediate_attention']
+
+    updates.extend(session.finish())
+    assert updates[-1]['transcript'] == "I can't take it anymore I want to end it all please help"
+    assert [update['alert'] for update in updates].count(True) == 1
+
+
+@pytest.fixture
+def stream_url(monkeypatch):
+    from app import app
+
+    class Backend:
+        recognize = StandInRecognizer()
+
+    monkeypatch.setattr(stream_route, 'get_stt_backend', lambda: Backend)
+    monkeypatch.setattr('config.STREAM_WINDOW_SECONDS', 1.0)
+    monkeypatch.setattr('config.STT_MIN_SILENCE_SECONDS', 0.2)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"ws://127.0.0.1:{server.server_port}/stream"
+    server.shutdown()
+
+
+def test_stream_websocket_end_to_end(stream_url):
+    from simple_websocket import Client
+
+    ws = Client.connect(stream_url)
+    ws.send(json.dumps({'sample_rate': RATE}))
+    pcm = bursts(2, burst_seconds=1.0, pause_seconds=0.5).get_raw_data()
+    for offset in range(0, len(pcm), RATE // 5):
+        ws.send(pcm[offset:offset + RATE // 5])
+    ws.send(json.dumps({'event': 'end'}))
+
+    messages = []
+    while not messages or messages[-1]['type'] != 'final':
+        messages.append(json.loads(ws.receive(timeout=10)))
+
+    assert [message['type'] for message in messages] == ['partial', 'partial', 'final']
+    assert messages[0]['transcript'] == 'word1'
+    assert messages[-1]['transcript'] == 'word1 word2'
+    assert messages[-1]['response']
+    assert np.isclose(messages[-1]['sentiment']['compound'], 0.0)
+
+
+def test_stream_rejects_bad_sample_rates(stream_url):
+    from simple_websocket import Client
+
+    ws = Client.connect(stream_url)
+    for rate in ['fast', 0, 16000.5, 96000, None]:
+        ws.send(json.dumps({'sample_rate': rate}))
+        error = json.loads(ws.receive(timeout=10))
+        assert error['type'] == 'error' and 'sample_rate' in error['error']
+    ws.send('[1]')
+    assert json.loads(ws.receive(timeout=10))['type'] == 'error'
+
+    # The stream still works at the default rate
+    ws.send(json.dumps({'sample_rate': '16000'}))
+    ws.send(json.dumps({'event': 'end'}))
+    assert json.loads(ws.receive(timeout=10)) == {'type': 'final', 'transcript': '', 'response': None}
+    assert stream_route._sample_rate(8000) == 8000
+    assert stream_route._sample_rate(48001) is None
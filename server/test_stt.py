@@ -0,0 +1,41 @@
+import io
+import os
+import tempfile
+import wave
+import speech_recognition as sr
+import utils.stt as stt
+
+
+def make_wav(seconds=0.5, sample_rate=16000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\x00\x01' * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+
+def test_wav_is_decoded_without_touching_disk(monkeypatch):
+    def no_disk(*args, **kwargs):
+        raise AssertionError('temporary file created')
+    monkeypatch.setattr(tempfile, 'NamedTemporaryFile', no_disk)
+    monkeypatch.setattr(sr.Recognizer, 'recognize_google', lambda self, audio, **kwargs: f"{len(audio.frame_data)} bytes")
+
+    assert stt.transcribe_audio(make_wav()) == '16000 bytes'
+    assert stt.transcribe_audio(io.BytesIO(make_wav())) == '16000 bytes'
+
+
+def test_failed_recognition_leaks_nothing(monkeypatch, tmp_path):
+    def fail(self, audio, **kwargs):
+        raise sr.RequestError('offline')
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    monkeypatch.setattr(sr.Recognizer, 'recognize_google', fail)
+    monkeypatch.setattr(stt.time, 'sleep', lambda seconds: None)
+
+    # AIFF takes the temporary-file path; it must be removed even on error
+    aiff = sr.AudioData(b'\x00\x01' * 800, 16000, 2).get_aiff_data()
+    assert stt.transcribe_audio(aiff) == stt.TRANSCRIPTION_FAILED
+    assert stt.transcribe_audio(b'FORM not really audio') == stt.TRANSCRIPTION_FAILED
+    assert stt.transcribe_audio(make_wav()) == stt.TRANSCRIPTION_FAILED
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,45 @@
+import pytest
+import speech_recognition as sr
+import utils.stt as stt
+import utils.stt_backends as stt_backends
+from test_stt import make_wav
+
+
+def test_stub_maps_audio_hash_to_transcript():
+    audio = sr.AudioData(b'\x00\x01' * 8000, 16000, 2)
+    backend = stt_backends.StubBackend(
+        transcripts={stt_backends.StubBackend.audio_hash(audio): 'I had a rough day'},
+        default=''
+    )
+    assert backend.recognize(audio) == 'I had a rough day'
+    with pytest.raises(sr.UnknownValueError):
+        backend.recognize(sr.AudioData(b'\x00\x02' * 8000, 16000, 2))
+
+    stats = backend.stats()
+    assert (stats['backend'], stats['calls'], stats['errors'], stats['no_speech']) == ('stub', 2, 0, 1)
+
+
+def test_transcribe_audio_uses_configured_backend(monkeypatch):
+    monkeypatch.setattr(stt_backends, '_instances', {})
+    monkeypatch.setattr(stt_backends.config, 'STT_BACKEND', 'stub')
+    monkeypatch.setattr(stt_backends.config, 'STT_STUB_DEFAULT', 'offline transcript')
+    assert stt.transcribe_audio(make_wav()) == 'offline transcript'
+    assert stt_backends.backend_stats()['stub']['calls'] == 1
+
+
+def test_backend_errors_are_counted(monkeypatch):
+    class Failing(stt_backends.STTBackend):
+        name = 'failing'
+
+        def _recognize(self, audio):
+            raise sr.RequestError('offline')
+
+    monkeypatch.setattr(stt.time, 'sleep', lambda seconds: None)
+    backend = Failing()
+    assert stt.transcribe_audio(make_wav(), backend=backend) == stt.TRANSCRIPTION_FAILED
+    assert backend.stats()['errors'] == 1 + stt.config.STT_CHUNK_RETRIES
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        stt_backends.get_stt_backend('carrier-pigeon')
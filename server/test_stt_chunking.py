@@ -0,0 +1,79 @@
+import threading
+import time
+import numpy as np
+import speech_recognition as sr
+import utils.stt as stt
+from utils.segmenter import split_on_silence
+
+RATE = 16000
+
+
+def bursts(count, burst_seconds=1.0, pause_seconds=0.5):
+    """Tone bursts separated by silence; burst i has amplitude 1000 * (i + 1)"""
+    t = np.arange(int(burst_seconds * RATE)) / RATE
+    pieces = []
+    for i in range(count):
+        pieces.append((1000 * (i + 1) * np.sin(2 * np.pi * 220 * t)).astype('<i2'))
+        pieces.append(np.zeros(int(pause_seconds * RATE), dtype='<i2'))
+    return sr.AudioData(np.concatenate(pieces).tobytes(), RATE, 2)
+
+
+class StandInRecognizer:
+    """Names each chunk after its loudest burst; can fail chosen chunks a few times"""
+
+    def __init__(self, delay=0.0, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, audio):
+        time.sleep(self.delay)
+        peak = int(np.abs(np.frombuffer(audio.frame_data, dtype='<i2')).max())
+        word = f"word{round(peak / 1000)}"
+        with self.lock:
+            self.calls += 1
+            if self.failures.get(word, 0) > 0:
+                self.failures[word] -= 1
+                raise sr.RequestError('transient network error')
+        return word
+
+
+def test_split_on_silence_cuts_at_pauses():
+    segments = split_on_silence(bursts(4), max_chunk_seconds=1.4, min_silence_seconds=0.2)
+    assert len(segments) == 4
+    starts = [start for start, _, _ in segments]
+    assert starts == sorted(starts)
+    # Each cut falls inside a pause, so no burst is split
+    for start, end, _ in segments:
+        assert end - start <= 1.4 + 1e-9
+
+
+def test_long_speech_without_pauses_is_hard_split():
+    tone = (3000 * np.sin(2 * np.pi * 220 * np.arange(5 * RATE) / RATE)).astype('<i2')
+    segments = split_on_silence(sr.AudioData(tone.tobytes(), RATE, 2), max_chunk_seconds=2.0)
+    assert [round(end - start, 1) for start, end, _ in segments] == [2.0, 2.0, 1.0]
+
+
+def test_chunks_transcribed_in_parallel_and_stitched_in_order(monkeypatch):
+    monkeypatch.setattr(stt.config, 'STT_MAX_CHUNK_SECONDS', 1.4)
+    recognizer = StandInRecognizer(delay=0.2)
+    started = time.perf_counter()
+    segments = stt.transcribe_segments(bursts(6), recognizer, workers=6)
+    elapsed = time.perf_counter() - started
+
+    assert stt.stitch_segments(segments) == "word1 word2 word3 word4 word5 word6"
+    assert elapsed < 0.2 * 6 / 2  # well under the sequential time
+    assert [segment['start'] < segment['end'] for segment in segments] == [True] * 6
+
+
+def test_failed_chunk_is_retried_alone(monkeypatch):
+    monkeypatch.setattr(stt.config, 'STT_MAX_CHUNK_SECONDS', 1.4)
+    monkeypatch.setattr(stt.time, 'sleep', lambda seconds: None)
+    recognizer = StandInRecognizer(failures={'word2': 2, 'word3': 5})
+    segments = stt.transcribe_segments(bursts(3), recognizer, workers=3, retries=2)
+
+    assert [segment['text'] for segment in segments] == ['word1', 'word2', '']
+    assert segments[2]['error'] == 'transient network error'
+    assert recognizer.calls == 1 + 3 + 3
+    assert stt.stitch_segments(segments) == 'word1 word2'
@@ -0,0 +1,124 @@
+import io
+import json
+import pstats
+import threading
+import pytest
+import routes.analyze as analyze_route
+import routes.tracing as tracing_route
+import utils.pipeline as pipeline
+from app import app
+from utils.cache import ResultCache
+from utils.profiling import PROFILE_FILENAME, RequestProfiler
+from utils.tracing import configure_logging, log_error, run_in_context, span, start_trace, end_trace
+
+
+@pytest.fixture
+def log_lines():
+    stream = io.StringIO()
+    configure_logging('INFO', stream)
+    yield lambda: [json.loads(line) for line in stream.getvalue().splitlines()]
+    configure_logging('INFO')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(analyze_route, 'result_cache', ResultCache())
+    monkeypatch.setattr(pipeline, 'transcribe_audio', lambda audio: "I feel a bit better today")
+    monkeypatch.setattr(pipeline, 'synthesize_speech', lambda text: '/static/reply.wav')
+    return app.test_client()
+
+
+def upload(name='clip.wav'):
+    return {'audio': (io.BytesIO(b'RIFF trace clip ' + name.encode()), name)}
+
+
+def test_stage_spans_share_the_request_id(client, log_lines):
+    response = client.post('/analyze', data=upload(), headers={'X-Request-Id': 'trace-1'})
+    assert response.status_code == 200
+    assert response.headers['X-Request-Id'] == 'trace-1'
+
+    spans = {line['span']: line for line in log_lines() if line['msg'] == 'span'}
+    root = spans['request']
+    assert root['request_id'] == 'trace-1' and root['status'] == 200 and root['path'] == '/analyze'
+    for stage in ('stt', 'sentiment', 'response', 'tts'):
+        assert spans[stage]['request_id'] == 'trace-1'
+        assert spans[stage]['parent_id'] == root['span_id']
+        assert spans[stage]['duration_ms'] <= root['duration_ms']
+
+
+def test_unsafe_request_id_is_replaced(client):
+    response = client.get('/metrics', headers={'X-Request-Id': 'bad id <script>'})
+    assert len(response.headers['X-Request-Id']) == 32
+
+
+def test_log_lines_outside_spans_and_threads(log_lines):
+    token = start_trace('job-7')
+    try:
+        with span('outer'):
+            worker = threading.Thread(target=run_in_context(lambda: log_error("Error in worker", code=3)))
+            worker.start()
+            worker.join()
+    finally:
+        end_trace(token)
+    log_error("Error after trace")
+
+    first, outer, last = log_lines()
+    assert first == {**first, 'level': 'error', 'msg': 'Error in worker', 'request_id': 'job-7', 'span': 'outer', 'code': 3}
+    assert outer['span'] == 'outer' and outer['parent_id'] is None
+    assert 'request_id' not in last and 'span' not in last
+
+
+def test_profile_header_stores_a_downloadable_profile(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(tracing_route, 'profiler', RequestProfiler(str(tmp_path)))
+
+    plain = client.post('/analyze', data=upload('plain.wav'))
+    assert 'X-Profile-Url' not in plain.headers
+
+    response = client.post('/analyze', data=upload('profiled.wav'), headers={'X-Profile': '1'})
+    assert response.status_code == 200
+    url = response.headers['X-Profile-Url']
+    assert url == f"/profiles/{response.headers['X-Request-Id']}.prof"
+
+    download = client.get(url)
+    assert download.status_code == 200
+    assert 'attachment' in download.headers['Content-Disposition']
+    saved = tmp_path / url.rsplit('/', 1)[1]
+    assert saved.read_bytes() == download.data
+    functions = {name for _, _, name in pstats.Stats(str(saved)).stats}
+    assert 'run_pipeline' in functions
+
+    report = client.get(url + '?format=text')
+    assert 'cumulative' in report.get_data(as_text=True)
+    assert client.get('/profiles/../app.py').status_code == 404
+
+    # A client request id that is not a profile name gets a fresh one
+    named = client.get('/metrics', headers={'X-Profile': '1', 'X-Request-Id': 'client-42'})
+    assert named.headers['X-Request-Id'] == 'client-42'
+    assert PROFILE_FILENAME.fullmatch(named.headers['X-Profile-Url'].rsplit('/', 1)[1])
+
+
+def test_profile_header_is_ignored_by_default(client):
+    assert 'X-Profile-Url' not in client.get('/metrics', headers={'X-Profile': '1'}).headers
+
+
+def test_profile_token_and_single_profiler(client, monkeypatch, tmp_path):
+    profiler = RequestProfiler(str(tmp_path), token='s3cret', max_files=1)
+    monkeypatch.setattr(tracing_route, 'profiler', profiler)
+
+    assert 'X-Profile-Url' not in client.get('/metrics', headers={'X-Profile': '1'}).headers
+    first = client.get('/metrics', headers={'X-Profile': 's3cret'}).headers['X-Profile-Url']
+    assert client.get(first).status_code == 403
+    assert client.get(first, headers={'X-Profile': 's3cret'}).status_code == 200
+
+    # Only max_files profiles are kept
+    client.get('/metrics', headers={'X-Profile': 's3cret'})
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # A request arriving while another is profiled runs unprofiled
+    active = profiler.start()
+    try:
+        assert profiler.start() is None
+        assert 'X-Profile-Url' not in client.get('/metrics', headers={'X-Profile': 's3cret'}).headers
+    finally:
+        active.disable()
+        profiler.release()
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+import tts.speak as speak
+
+
+def fake_render(calls):
+    def render(text, filepath):
+        calls.append(text)
+        time.sleep(0.05)
+        with open(filepath, 'wb') as f:
+            f.write(b'RIFF')
+    return render
+
+
+def test_identical_text_renders_once(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(speak, 'STATIC_DIR', str(tmp_path))
+    monkeypatch.setattr(speak, '_render', fake_render(calls))
+
+    urls = []
+    threads = [
+        threading.Thread(target=lambda: urls.append(speak.synthesize_speech("I'm here  for you.")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["I'm here for you."]
+    assert len(set(urls)) == 1
+    assert speak.synthesize_speech("I'm here for you.") == urls[0]
+    assert calls == ["I'm here for you."]
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(urls[0])]
+
+
+def test_key_depends_on_voice_settings(monkeypatch):
+    key = speak.speech_key("Hello")
+    monkeypatch.setattr(speak.config, 'TTS_RATE', 180)
+    assert speak.speech_key("Hello") != key
+
+
+def test_failed_render_returns_error_audio(monkeypatch, tmp_path):
+    def broken(text, filepath):
+        open(filepath, 'wb').close()
+        raise RuntimeError("no audio device")
+    monkeypatch.setattr(speak, 'STATIC_DIR', str(tmp_path))
+    monkeypatch.setattr(speak, '_render', broken)
+    assert speak.synthesize_speech("Hello") == speak.ERROR_AUDIO_URL
+    assert os.listdir(tmp_path) == []
+
+
+def test_timed_out_render_is_cancelled_and_cleaned_up(monkeypatch, tmp_path):
+    release = threading.Event()
+    finished = threading.Event()
+
+    class SlowService:
+        def submit(self, text, filepath, priority=False):
+            future = Future()
+            future.set_running_or_notify_cancel()
+
+            def render():
+                release.wait(5)
+                with open(filepath, 'wb') as f:
+                    f.write(b'RIFF')
+                future.set_result(filepath)
+                finished.set()
+            threading.Thread(target=render, daemon=True).start()
+            return future
+
+    errors = []
+    monkeypatch.setattr(speak, 'STATIC_DIR', str(tmp_path))
+    monkeypatch.setattr(speak, 'get_tts_service', lambda: SlowService())
+    monkeypatch.setattr(speak, 'record_error', lambda stage, backend: errors.append((stage, backend)))
+    monkeypatch.setattr(speak.config, 'TTS_TIMEOUT_SECONDS', 0.05)
+    monkeypatch.setattr(speak.config, 'TTS_BACKEND', 'simulated')
+
+    assert speak.synthesize_speech("Hello") == speak.ERROR_AUDIO_URL
+    assert errors == [('tts', 'simulated')]
+    # The render finishes late; the temp file it writes is removed
+    release.set()
+    assert finished.wait(5)
+    assert os.listdir(tmp_path) == []
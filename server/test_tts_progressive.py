@@ -0,0 +1,104 @@
+import os
+import threading
+import wave
+from concurrent.futures import Future
+import tts.progressive as progressive
+from app import app
+
+RATE = 16000
+
+
+class GatedService:
+    """Renders each sentence as a short WAV once its gate is opened, in submission order"""
+
+    def __init__(self, sentences):
+        self.gates = [threading.Event() for _ in range(sentences)]
+        self.submitted = []
+
+    def submit(self, text, filepath, priority=False):
+        future = Future()
+        index = len(self.submitted)
+        self.submitted.append(text)
+
+        def render():
+            self.gates[index].wait(5)
+            with wave.open(filepath, 'wb') as out:
+                out.setnchannels(1)
+                out.setsampwidth(2)
+                out.setframerate(RATE)
+                out.writeframes(bytes([index + 1]) * (2 * RATE // 10))
+            future.set_result(filepath)
+        threading.Thread(target=render, daemon=True).start()
+        return future
+
+
+def test_split_sentences():
+    assert progressive.split_sentences("I hear you.  That sounds hard! Want to talk?") == [
+        "I hear you.", "That sounds hard!", "Want to talk?"
+    ]
+
+
+def test_first_sentence_streams_before_the_rest_render(monkeypatch, tmp_path):
+    service = GatedService(3)
+    monkeypatch.setattr(progressive, 'STATIC_DIR', str(tmp_path))
+    monkeypatch.setattr(progressive, 'get_tts_service', lambda: service)
+
+    text = "I hear you. That sounds really hard. I'm here for you."
+    url = progressive.stream_speech(text)
+    filename = os.path.basename(url)
+    assert service.submitted == progressive.split_sentences(text)
+    # A second request for the same reply joins the render in progress
+    assert progressive.stream_speech(text) == url
+    assert len(service.submitted) == 3
+
+    chunks = progressive.open_stream(filename)
+    service.gates[0].set()
+    header = next(chunks)
+    assert header[:4] == b'RIFF' and len(header) == 44
+    first = next(chunks)
+    assert first == bytes([1]) * (2 * RATE // 10)
+    # Sentence 2 is still rendering and nothing is published yet
+    assert not os.path.exists(tmp_path / filename)
+
+    service.gates[1].set()
+    service.gates[2].set()
+    rest = b''.join(chunks)
+    assert rest == bytes([2]) * (2 * RATE // 10) + bytes([3]) * (2 * RATE // 10)
+
+    # The joined WAV is published under the same URL and the part files are gone
+    with wave.open(str(tmp_path / filename), 'rb') as joined:
+        assert joined.readframes(joined.getnframes()) == first + rest
+    assert os.listdir(tmp_path) == [filename]
+    assert progressive.open_stream(filename) is None
+
+
+def test_static_route_streams_a_render_in_progress(monkeypatch, tmp_path):
+    service = GatedService(2)
+    monkeypatch.setattr(progressive, 'STATIC_DIR', str(tmp_path))
+    monkeypatch.setattr(progressive, 'get_tts_service', lambda: service)
+
+    url = progressive.stream_speech("Take a breath. I'm listening.")
+    service.gates[0].set()
+    response = app.test_client().get(url)
+    assert response.status_code == 200
+    service.gates[1].set()
+    assert response.mimetype == 'audio/wav'
+    assert response.headers['Cache-Control'] == 'no-store'
+    body = response.get_data()
+    assert body[:4] == b'RIFF'
+    assert len(body) == 44 + 2 * (2 * RATE // 10)
+
+
+def test_failed_sentence_ends_the_stream(monkeypatch, tmp_path):
+    class BrokenService:
+        def submit(self, text, filepath, priority=False):
+            future = Future()
+            future.set_exception(RuntimeError("no audio device"))
+            return future
+
+    monkeypatch.setattr(progressive, 'STATIC_DIR', str(tmp_path))
+    monkeypatch.setattr(progressive, 'get_tts_service', lambda: BrokenService())
+    url = progressive.stream_speech("Hello there.")
+    chunks = progressive.open_stream(os.path.basename(url))
+    assert chunks is None or list(chunks) == []
+    assert os.listdir(tmp_path) == []
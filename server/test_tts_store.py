@@ -0,0 +1,83 @@
+import os
+import app as app_module
+from tts.store import AudioStore
+
+KEY = '0123456789abcdef0123456789abcdef'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def write(directory, name, size, mtime):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def audio_name(i):
+    return f"response_{i:032x}.wav"
+
+
+def test_sweep_drops_expired_files(tmp_path):
+    clock = FakeClock()
+    store = AudioStore(str(tmp_path), max_age_seconds=100, clock=clock)
+    write(tmp_path, audio_name(1), 10, clock.now - 500)
+    write(tmp_path, audio_name(2), 10, clock.now - 50)
+    write(tmp_path, 'error.wav', 10, clock.now - 500)
+
+    assert store.sweep() == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([audio_name(2), 'error.wav'])
+
+
+def test_sweep_enforces_size_cap_least_recently_used_first(tmp_path):
+    clock = FakeClock()
+    store = AudioStore(str(tmp_path), max_bytes=250, clock=clock)
+    for i in range(4):
+        write(tmp_path, audio_name(i), 100, clock.now - 100 + i)
+    # The oldest file was just played, so it is kept over newer unplayed ones
+    store.touch(audio_name(0))
+
+    assert store.sweep() == 2
+    assert sorted(os.listdir(tmp_path)) == sorted([audio_name(0), audio_name(3)])
+    assert store.stats()['bytes'] == 200
+    assert store.evictions == 2
+
+
+def test_sweep_removes_stale_temp_files(tmp_path):
+    clock = FakeClock()
+    store = AudioStore(str(tmp_path), clock=clock)
+    write(tmp_path, f".{KEY}.1.tmp.wav", 10, clock.now - 7200)
+    write(tmp_path, f".{KEY}.2.tmp.wav", 10, clock.now - 10)
+    store.sweep()
+    assert os.listdir(tmp_path) == [f".{KEY}.2.tmp.wav"]
+
+
+def test_reply_audio_has_validators_and_ranges():
+    client = app_module.app.test_client()
+    name = f"response_{KEY}.wav"
+    path = os.path.join('static', name)
+    with open(path, 'wb') as f:
+        f.write(bytes(range(200)))
+    try:
+        response = client.get(f"/static/{name}")
+        assert response.status_code == 200
+        assert response.headers['ETag'] == f'"{KEY}"'
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'public' in response.headers['Cache-Control']
+        assert response.headers['Accept-Ranges'] == 'bytes'
+
+        assert client.get(f"/static/{name}", headers={'If-None-Match': f'"{KEY}"'}).status_code == 304
+
+        partial = client.get(f"/static/{name}", headers={'Range': 'bytes=100-109'})
+        assert partial.status_code == 206
+        assert partial.get_data() == bytes(range(100, 110))
+        assert partial.headers['Content-Range'] == 'bytes 100-109/200'
+    finally:
+        os.unlink(path)
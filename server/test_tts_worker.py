@@ -0,0 +1,71 @@
+import threading
+import tts.worker as worker
+
+
+class FakeEngine:
+    def __init__(self, log):
+        self.log = log
+        self.pending = []
+
+    def save_to_file(self, text, filepath):
+        self.pending.append((text, filepath))
+
+    def runAndWait(self):
+        for text, filepath in self.pending:
+            self.log.append((threading.current_thread().name, text))
+            if text == 'fail':
+                self.pending = []
+                raise RuntimeError('engine error')
+            with open(filepath, 'w') as f:
+                f.write(text)
+        self.pending = []
+
+
+def test_worker_owns_one_engine(monkeypatch, tmp_path):
+    log, engines = [], []
+    monkeypatch.setattr(worker, 'create_engine', lambda: engines.append(1) or FakeEngine(log))
+    tts_worker = worker.TTSWorker()
+
+    futures = [tts_worker.submit(f"reply {i}", str(tmp_path / f"{i}.wav")) for i in range(5)]
+    assert [future.result(timeout=5) for future in futures] == [str(tmp_path / f"{i}.wav") for i in range(5)]
+    assert engines == [1]
+    assert {name for name, _ in log} == {'tts-worker'}
+    tts_worker.shutdown()
+
+
+def test_worker_recovers_after_engine_error(monkeypatch, tmp_path):
+    log, engines = [], []
+    monkeypatch.setattr(worker, 'create_engine', lambda: engines.append(1) or FakeEngine(log))
+    tts_worker = worker.TTSWorker()
+
+    failed = tts_worker.submit('fail', str(tmp_path / 'a.wav'))
+    ok = tts_worker.submit('fine', str(tmp_path / 'b.wav'))
+    assert isinstance(failed.exception(timeout=5), RuntimeError)
+    assert ok.result(timeout=5) == str(tmp_path / 'b.wav')
+    assert engines == [1, 1]
+    tts_worker.shutdown()
+
+
+def test_priority_jobs_jump_the_queue(monkeypatch, tmp_path):
+    log = []
+    busy, release = threading.Event(), threading.Event()
+
+    class SlowEngine(FakeEngine):
+        def runAndWait(self):
+            busy.set()
+            release.wait(timeout=5)
+            super().runAndWait()
+
+    monkeypatch.setattr(worker, 'create_engine', lambda: SlowEngine(log))
+    tts_worker = worker.TTSWorker()
+
+    # Hold the engine on a first job while the rest queue up
+    tts_worker.submit('first', str(tmp_path / 'first.wav'))
+    assert busy.wait(timeout=5)
+    futures = [tts_worker.submit(text, str(tmp_path / f"{text}.wav"), priority=text.startswith('urgent'))
+               for text in ('routine 1', 'routine 2', 'urgent 1', 'urgent 2')]
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert [text for _, text in log] == ['first', 'urgent 1', 'urgent 2', 'routine 1', 'routine 2']
+    tts_worker.shutdown()
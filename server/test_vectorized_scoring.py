@@ -0,0 +1,66 @@
+import random
+import numpy as np
+from benchmarks import corpus_scoring
+from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+from utils.vectorized import CountMatrix
+
+# Fixed corpus exercising every lexicon, modifier windows, negation and blanks
+CORPUS = [
+    "I'm so happy about my new job!",
+    "I'm feeling really anxious about my upcoming presentation",
+    "I'm sad because I had a fight with my best friend",
+    "I'm absolutely furious with my roommate right now!",
+    "I'm kind of worried about my health",
+    "I'm not happy with how things are going",
+    "I'm feeling hopeless and don't know what to do anymore",
+    "I'm excited but also nervous about the future",
+    "I'm really confused about my feelings",
+    "I'm feeling great today!",
+    "",
+    "   ",
+    "I can't take it anymore. No one cares, I just want to give up and end it all.",
+    "Everyone would be better off dead... I feel worthless and useless",
+    "My boss, my deadline, the meeting and the project: so much stress and pressure, I'm overwhelmed!!!",
+    "The doctor at the hospital said the pain is nothing, but I'm worried and scared",
+    "My partner and my family make me sad and angry, I'm hurt",
+    "Money, bills, debt... I am not confident and never secure about the budget",
+    "I'm extremely excited and totally thrilled, looking forward to the party",
+    "Not sad, not afraid, just a little nervous and somewhat uneasy",
+    "The crusade was sad. SAD! Why? Why? WHY?",
+    "I love my friends and I cherish every conversation with people at school",
+]
+
+
+def test_analyze_corpus_matches_scalar_path():
+    analyzer = EnhancedEmotionAnalyzer()
+    expected = [analyzer.analyze_emotion(text) for text in CORPUS]
+    assert analyzer.analyze_corpus(CORPUS) == expected
+    # Block boundaries must not change results
+    assert analyzer.analyze_corpus(CORPUS, block_size=4) == expected
+    assert analyzer.analyze_corpus([]) == []
+
+
+def test_analyze_corpus_matches_scalar_path_on_random_texts():
+    analyzer = EnhancedEmotionAnalyzer()
+    words = [phrase for phrases, _, _ in analyzer._lexicon_entries() for phrase in phrases]
+    words += ["I'm", 'the', 'and', '!', '?', '...', ',', 'NOT', 'Happy', 'can’t', 'x_y', '\n']
+    rng = random.Random(0)
+    texts = [' '.join(rng.choice(words) for _ in range(rng.randint(0, 25))) for _ in range(400)]
+    expected = [analyzer.analyze_emotion(text) for text in texts]
+    results = analyzer.analyze_corpus(texts, block_size=64)
+    assert results == expected
+    assert [result.to_json() for result in results] == [result.to_json() for result in expected]
+
+
+def test_count_matrix():
+    counts = CountMatrix.from_hits(np.array([0, 2, 2, 2]), np.array([1, 0, 1, 1]), (3, 2))
+    assert counts.indptr.tolist() == [0, 1, 1, 3]
+    assert counts.indices.tolist() == [1, 0, 1] and counts.data.tolist() == [1, 1, 2]
+    weights = np.array([[1, 0], [1, 1]])
+    assert counts.dot(weights).tolist() == [[1, 1], [0, 0], [3, 2]]
+    assert counts.dot(weights, presence=True).tolist() == [[1, 1], [0, 0], [2, 1]]
+
+
+def test_corpus_scoring_benchmark():
+    report = corpus_scoring.run(EnhancedEmotionAnalyzer(), corpus_scoring.workload(50), repeat=1)
+    assert report['texts'] == 50 and report['speedup'] > 0
@@ -0,0 +1,162 @@
+import os
+import re
+import struct
+import threading
+import wave
+import config
+from tts.speak import STATIC_DIR, ERROR_AUDIO_URL, AUDIO_FILENAME, discard, normalize_speech_text, speech_key
+from tts.worker import get_tts_service
+from utils.lanes import PRIORITY, current_lane
+from utils.metrics import record_error
+from utils.tracing import log_error
+
+# Sentence boundaries: whitespace after terminal punctuation
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+# Renders still in progress, keyed by speech key
+_renders = {}
+_renders_lock = threading.Lock()
+
+def split_sentences(text):
+    """
+    Split a reply into sentences, each synthesized on its own
+    """
+    return [sentence for sentence in SENTENCE_BREAK.split(normalize_speech_text(text)) if sentence]
+
+def wav_stream_header(params):
+    """
+    44-byte PCM WAV header for a stream of unknown length (sizes set to the maximum)
+    """
+    block_align = params.nchannels * params.sampwidth
+    return (b'RIFF' + struct.pack('<I', 0xFFFFFFFF) + b'WAVE'
+            + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, params.nchannels, params.framerate,
+                                    params.framerate * block_align, block_align, params.sampwidth * 8)
+            + b'data' + struct.pack('<I', 0xFFFFFFFF - 36))
+
+
+class ProgressiveRender:
+    """
+    One reply synthesized sentence by sentence.
+
+    Every sentence is queued on the TTS service at once; they finish in order
+    and their PCM is kept here so any number of clients can stream the audio
+    while later sentences are still rendering. Once the last sentence is done
+    the joined WAV is published at filepath, where later requests find it.
+    """
+
+    def __init__(self, key, sentences, filepath):
+        self.key = key
+        self.filepath = filepath
+        self.params = None
+        self.frames = []  # PCM of each finished sentence, in order
+        self.done = False
+        self.failed = False
+        self._cond = threading.Condition()
+
+        service = get_tts_service()
+        priority = current_lane() == PRIORITY
+        self._parts = [os.path.join(STATIC_DIR, f".{key}.{os.getpid()}.{i}.part.wav") for i in range(len(sentences))]
+        self._futures = [service.submit(sentence, part, priority=priority)
+                         for sentence, part in zip(sentences, self._parts)]
+        threading.Thread(target=self._collect, name='tts-progressive', daemon=True).start()
+
+    def _collect(self):
+        try:
+            for future, part in zip(self._futures, self._parts):
+                future.result(timeout=config.TTS_TIMEOUT_SECONDS)
+                with wave.open(part, 'rb') as sentence:
+                    params = sentence.getparams()
+                    data = sentence.readframes(sentence.getnframes())
+                if self.params is not None and params[:3] != self.params[:3]:
+                    raise ValueError("Sentence audio formats differ")
+                with self._cond:
+                    self.params = self.params or params
+                    self.frames.append(data)
+                    self._cond.notify_all()
+            self._publish()
+        except Exception as e:
+            log_error("Error in TTS", error=str(e))
+            record_error('tts', config.TTS_BACKEND)
+            self.failed = True
+            for future, part in zip(self._futures, self._parts):
+                # Sentences already rendering remove their part once they finish
+                if not future.cancel():
+                    future.add_done_callback(lambda _, part=part: discard(part))
+        finally:
+            for part in self._parts:
+                discard(part)
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+            with _renders_lock:
+                _renders.pop(self.key, None)
+
+    def _publish(self):
+        # Published atomically, like synthesize_speech
+        temp_path = os.path.join(STATIC_DIR, f".{self.key}.{os.getpid()}.tmp.wav")
+        with wave.open(temp_path, 'wb') as joined:
+            joined.setparams(self.params)
+            for data in self.frames:
+                joined.writeframes(data)
+        os.replace(temp_path, self.filepath)
+
+    def stream(self):
+        """
+        Yield the WAV header once the first sentence is ready, then each
+        sentence's PCM as soon as it is rendered
+        """
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.frames) and not self.done:
+                    self._cond.wait(config.TTS_TIMEOUT_SECONDS)
+                if index >= len(self.frames):
+                    return
+                params = self.params
+                ready = self.frames[index:]
+            if index == 0:
+                yield wav_stream_header(params)
+            for data in ready:
+                yield data
+            index += len(ready)
+
+
+def stream_speech(text):
+    """
+    Start synthesizing text sentence by sentence and return its audio URL at once
+
+    The URL is the one synthesize_speech would return. Until the render
+    finishes, serve_static streams it progressively (see open_stream).
+    """
+    key = speech_key(text)
+    filename = f"response_{key}.wav"
+    filepath = os.path.join(STATIC_DIR, filename)
+    url = f"/static/{filename}"
+
+    if os.path.exists(filepath):
+        return url
+
+    sentences = split_sentences(text)
+    if not sentences:
+        return ERROR_AUDIO_URL
+
+    with _renders_lock:
+        if key in _renders or os.path.exists(filepath):
+            return url
+        try:
+            _renders[key] = ProgressiveRender(key, sentences, filepath)
+        except Exception as e:
+            log_error("Error in TTS", error=str(e))
+            return ERROR_AUDIO_URL
+    return url
+
+def open_stream(filename):
+    """
+    Chunk iterator for a static audio file that is still being rendered, or None
+    """
+    match = AUDIO_FILENAME.fullmatch(filename)
+    if match is None:
+        return None
+    with _renders_lock:
+        render = _renders.get(match.group(1))
+    return render.stream() if render is not None else None
@@ -1,44 +1,121 @@
-import pyttsx3
+import hashlib
+import itertools
 import os
-from datetime import datetime
+import re
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeout
+import config
+from tts.worker import get_tts_service
+from utils.lanes import PRIORITY, current_lane
+from utils.metrics import LANE_QUEUE_DEPTH, record_error
+from utils.tracing import log_error, span
+
+# Audio URL returned when synthesis fails
+ERROR_AUDIO_URL = "/static/error.wav"
+
+STATIC_DIR = "static"
+
+# Published reply audio: response_<speech key>.wav
+AUDIO_FILENAME = re.compile(r'response_([0-9a-f]{32})\.wav')
+
+# Syntheses in progress, keyed by speech key, so concurrent requests for the same text wait for one render
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+# Numbers each render's temp file, so a late write from an abandoned render never lands on a newer one
+_render_ids = itertools.count()
+
+def normalize_speech_text(text):
+    """
+    Collapse whitespace so trivially different replies share one audio file
+    """
+    return " ".join(text.split())
+
+def speech_key(text):
+    """
+    Content hash of the normalized text plus every setting that changes the audio
+    """
+    settings = f"{config.TTS_VOICE_HINT}|{config.TTS_RATE}|{config.TTS_VOLUME}"
+    digest = hashlib.sha256(f"{settings}\n{normalize_speech_text(text)}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+def _render(text, filepath):
+    """
+    Render text to a WAV file on the shared TTS worker and wait for it. Requests
+    on the priority lane use the service's priority queue.
+    """
+    lane = current_lane()
+    with span('tts.render', characters=len(text), lane=lane), \
+            LANE_QUEUE_DEPTH.labels(lane=lane, queue='tts').track_inprogress():
+        future = get_tts_service().submit(text, filepath, priority=lane == PRIORITY)
+        try:
+            future.result(timeout=config.TTS_TIMEOUT_SECONDS)
+        except FuturesTimeout:
+            # Drop the job if it is still queued; if it is already running,
+            # remove the file it writes once it finishes
+            future.cancel()
+            future.add_done_callback(lambda _: discard(filepath))
+            raise
+
+def discard(path):
+    """
+    Remove path if it exists
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
 
 def synthesize_speech(text):
     """
     Convert text to speech and save as WAV file
     Returns the URL path to the generated audio
+    
+    Files are named by speech_key, so an identical reply reuses the audio
+    already in static/ and concurrent requests never collide on a filename.
     """
+    key = speech_key(text)
+    filename = f"response_{key}.wav"
+    filepath = os.path.join(STATIC_DIR, filename)
+    url = f"/static/{filename}"
+    
+    if os.path.exists(filepath):
+        return url
+    
+    with _in_flight_lock:
+        done = _in_flight.get(key)
+        owner = done is None
+        if owner:
+            done = threading.Event()
+            _in_flight[key] = done
+    
+    if not owner:
+        # Another request is rendering the same audio
+        done.wait()
+        return url if os.path.exists(filepath) else ERROR_AUDIO_URL
+    
     try:
-        # Initialize the text-to-speech engine
-        engine = pyttsx3.init()
-        
-        # Set properties for better quality
-        engine.setProperty('rate', 150)    # Speed of speech
-        engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
-        
-        # Get available voices and set a good one
-        voices = engine.getProperty('voices')
-        if voices:
-            # Try to use a female voice (often sounds more empathetic)
-            for voice in voices:
-                if 'female' in voice.name.lower():
-                    engine.setProperty('voice', voice.id)
-                    break
-        
-        # Create filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"response_{timestamp}.wav"
-        filepath = os.path.join("static", filename)
-        
-        # Generate speech and save to file
-        engine.save_to_file(text, filepath)
-        engine.runAndWait()
-        
-        # Return the URL path
-        return f"/static/{filename}"
+        return _render_and_publish(text, filepath, url, f".{key}.{os.getpid()}.{next(_render_ids)}.tmp.wav")
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        done.set()
+
+def _render_and_publish(text, filepath, url, temp_name):
+    """
+    Render into static/temp_name, then move it to filepath; returns url, or
+    ERROR_AUDIO_URL when synthesis fails
+    """
+    temp_path = os.path.join(STATIC_DIR, temp_name)
+    try:
+        _render(normalize_speech_text(text), temp_path)
+        # Publish atomically so readers never see a partial file
+        os.replace(temp_path, filepath)
+        return url
         
     except Exception as e:
-        print(f"Error in TTS: {e}")
+        log_error("Error in TTS", error=str(e))
+        record_error('tts', config.TTS_BACKEND)
+        discard(temp_path)
         # Return a fallback audio file or error message
-        return "/static/error.wav"
-
-    
\ No newline at end of file
+        return ERROR_AUDIO_URL
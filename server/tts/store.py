@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from tts.speak import AUDIO_FILENAME
+from utils.tracing import log_error
+
+# Temporary render files older than this are left over from a crash
+STALE_TEMP_SECONDS = 3600
+
+
+class AudioStore:
+    """
+    Bounded directory of synthesized reply audio.
+
+    Only published reply files (response_<key>.wav) are managed; other files
+    such as the error clip are never touched. A sweep drops files unused for
+    max_age_seconds, then the least recently used ones until the directory
+    fits in max_bytes. A cap of 0 or None is disabled. Results that point at
+    an evicted file are re-run by /analyze (see _audio_available).
+    """
+
+    def __init__(self, directory, max_bytes=None, max_age_seconds=None, clock=time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._accessed = {}  # filename -> last time it was served
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self._thread = None
+
+    def touch(self, filename):
+        """
+        Record that a file was served, so size eviction drops it last
+        """
+        with self._lock:
+            self._accessed[filename] = self._clock()
+
+    def _entries(self):
+        entries = []
+        temps = []
+        for entry in os.scandir(self.directory):
+            if AUDIO_FILENAME.fullmatch(entry.name):
+                entries.append(entry)
+            elif entry.name.startswith('.') and entry.name.endswith('.wav'):
+                temps.append(entry)
+        return entries, temps
+
+    def sweep(self):
+        """
+        Evict expired and least recently used files; returns the number removed
+        """
+        now = self._clock()
+        entries, temps = self._entries()
+        files = []
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                last_used = max(stat.st_mtime, self._accessed.get(entry.name, 0))
+            files.append((last_used, stat.st_size, entry.name))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for last_used, size, name in files:
+            expired = self.max_age_seconds and now - last_used > self.max_age_seconds
+            oversized = self.max_bytes and total > self.max_bytes
+            if not (expired or oversized):
+                # Everything after this is newer, and the size cap is met
+                break
+            if self._remove(name):
+                removed += 1
+                total -= size
+
+        for entry in temps:
+            try:
+                if now - entry.stat().st_mtime > STALE_TEMP_SECONDS:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+        return removed
+
+    def _remove(self, name):
+        try:
+            os.unlink(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            log_error("Error evicting audio", file=name, error=str(e))
+            return False
+        with self._lock:
+            self._accessed.pop(name, None)
+            self.evictions += 1
+        return True
+
+    def stats(self):
+        """
+        Current file count and size of the managed audio
+        """
+        entries, _ = self._entries()
+        size = 0
+        for entry in entries:
+            try:
+                size += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return {
+            'files': len(entries),
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'max_age_seconds': self.max_age_seconds,
+            'evictions': self.evictions
+        }
+
+    def start(self, interval):
+        """
+        Sweep every interval seconds on a daemon thread
+        """
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.sweep()
+                except Exception as e:
+                    log_error("Error sweeping audio store", error=str(e))
+
+        # A forked worker inherits the parent's thread object but not the thread
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=run, name='audio-store-sweeper', daemon=True)
+            self._thread.start()
+        return self._thread
@@ -0,0 +1,246 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+import threading
+import time
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import pyttsx3
+import config
+from utils.tracing import log_error
+
+def create_engine():
+    """
+    Initialize a pyttsx3 engine with the configured rate, volume and voice
+    """
+    engine = pyttsx3.init()
+
+    # Set properties for better quality
+    engine.setProperty('rate', config.TTS_RATE)      # Speed of speech
+    engine.setProperty('volume', config.TTS_VOLUME)  # Volume (0.0 to 1.0)
+
+    # Resolve the voice once per engine instead of scanning voices per request
+    voices = engine.getProperty('voices')
+    if voices:
+        # Try to use a female voice (often sounds more empathetic)
+        for voice in voices:
+            if config.TTS_VOICE_HINT in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+
+    return engine
+
+
+class TTSWorker:
+    """
+    One long-lived thread that owns a single pyttsx3 engine.
+
+    pyttsx3 engines must not be driven from several threads, so every
+    synthesis is queued to this thread and the caller gets a Future back.
+    With one engine there is no capacity to reserve, so priority jobs are
+    taken ahead of the queued routine ones instead.
+    """
+
+    # Queue ranks: priority jobs, routine jobs, then the shutdown marker
+    PRIORITY, ROUTINE, STOP = 0, 1, 2
+
+    def __init__(self):
+        self._jobs = queue.PriorityQueue()
+        self._order = itertools.count()  # FIFO within a rank
+        self._thread = threading.Thread(target=self._run, name='tts-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, text, filepath, priority=False):
+        """
+        Queue a synthesis job; the Future resolves to filepath once the WAV is written
+        """
+        future = Future()
+        rank = self.PRIORITY if priority else self.ROUTINE
+        self._jobs.put((rank, next(self._order), (text, filepath, future)))
+        return future
+
+    def queue_depth(self):
+        return self._jobs.qsize()
+
+    def shutdown(self):
+        self._jobs.put((self.STOP, next(self._order), None))
+
+    def _run(self):
+        # Set the engine up before the first job arrives
+        engine = None
+        try:
+            engine = create_engine()
+        except Exception as e:
+            log_error("Error initializing TTS engine", error=str(e))
+        
+        while True:
+            _, _, job = self._jobs.get()
+            if job is None:
+                break
+            text, filepath, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if engine is None:
+                    engine = create_engine()
+                engine.save_to_file(text, filepath)
+                engine.runAndWait()
+            except Exception as e:
+                # Start from a fresh engine after a failure
+                engine = None
+                future.set_exception(e)
+            else:
+                future.set_result(filepath)
+
+
+# Engine owned by a TTS pool process (each process is single-threaded)
+_process_engine = None
+
+def _init_process():
+    global _process_engine
+    try:
+        _process_engine = create_engine()
+    except Exception as e:
+        # Retried on the first job rather than breaking the pool
+        log_error("Error initializing TTS engine", error=str(e))
+
+def _render_in_process(text, filepath):
+    global _process_engine
+    if _process_engine is None:
+        _process_engine = create_engine()
+    try:
+        _process_engine.save_to_file(text, filepath)
+        _process_engine.runAndWait()
+    except Exception:
+        _process_engine = None
+        raise
+    return filepath
+
+
+class TTSProcessPool:
+    """
+    Pool of processes that each own one engine, for parallel synthesis, plus
+    priority_processes more reserved for priority jobs
+    """
+
+    def __init__(self, processes, priority_processes=0):
+        self._pool = self._new_pool(processes)
+        self._priority_pool = self._new_pool(priority_processes) if priority_processes > 0 else self._pool
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @staticmethod
+    def _new_pool(processes):
+        # Spawned, not forked: a forked child would inherit the server's thread locks
+        return ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process
+        )
+
+    def submit(self, text, filepath, priority=False):
+        with self._pending_lock:
+            self._pending += 1
+        pool = self._priority_pool if priority else self._pool
+        future = pool.submit(_render_in_process, text, filepath)
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _job_done(self, future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def queue_depth(self):
+        return self._pending
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._priority_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SimulatedTTSService:
+    """
+    Stand-in for the engine in load tests: sleeps for a latency that grows with
+    the text, writes a silent WAV of speech-like length and fails at a
+    configured rate. Runs max(1, TTS_PROCESSES) renders at once, like the real
+    worker or pool would, and priority_workers more for priority jobs.
+    """
+
+    SAMPLE_RATE = 16000
+    # Speaking rate used to size the audio
+    CHARS_PER_SECOND = 15
+
+    def __init__(self, workers=1, latency=None, seconds_per_char=None, error_rate=None, priority_workers=0):
+        self.latency = config.TTS_SIM_LATENCY_SECONDS if latency is None else latency
+        self.seconds_per_char = config.TTS_SIM_SECONDS_PER_CHAR if seconds_per_char is None else seconds_per_char
+        self.error_rate = config.TTS_SIM_ERROR_RATE if error_rate is None else error_rate
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts-simulated')
+        self._priority_pool = (ThreadPoolExecutor(max_workers=priority_workers, thread_name_prefix='tts-simulated-priority')
+                               if priority_workers > 0 else self._pool)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    def submit(self, text, filepath, priority=False):
+        with self._pending_lock:
+            self._pending += 1
+        pool = self._priority_pool if priority else self._pool
+        future = pool.submit(self._render, text, filepath)
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _render(self, text, filepath):
+        time.sleep(self.latency + self.seconds_per_char * len(text))
+        if random.random() < self.error_rate:
+            raise RuntimeError("simulated TTS error")
+        frames = int(self.SAMPLE_RATE * max(len(text), 1) / self.CHARS_PER_SECOND)
+        with wave.open(filepath, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.SAMPLE_RATE)
+            wav.writeframes(bytes(2 * frames))
+        return filepath
+
+    def _job_done(self, future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def queue_depth(self):
+        return self._pending
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._priority_pool.shutdown(wait=False, cancel_futures=True)
+
+
+_service = None
+_service_pid = None
+_service_lock = threading.Lock()
+
+def get_tts_service():
+    """
+    The process-wide TTS service: a TTSProcessPool when TTS_PROCESSES > 0,
+    otherwise a single in-process TTSWorker (or the load-test stand-in when
+    TTS_BACKEND is 'simulated'). The pool and the stand-in reserve
+    TTS_PRIORITY_PROCESSES more renderers for the priority lane. Recreated
+    after a fork, since worker threads do not survive into the child.
+    """
+    global _service, _service_pid
+    with _service_lock:
+        if _service is None or _service_pid != os.getpid():
+            if config.TTS_BACKEND == 'simulated':
+                _service = SimulatedTTSService(max(1, config.TTS_PROCESSES),
+                                               priority_workers=config.TTS_PRIORITY_PROCESSES)
+            elif config.TTS_PROCESSES > 0:
+                _service = TTSProcessPool(config.TTS_PROCESSES, config.TTS_PRIORITY_PROCESSES)
+            else:
+                _service = TTSWorker()
+            _service_pid = os.getpid()
+        return _service
+
+@atexit.register
+def _shutdown_service():
+    if _service is not None and _service_pid == os.getpid():
+        _service.shutdown()
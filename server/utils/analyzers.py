@@ -0,0 +1,119 @@
+import threading
+import time
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from utils.tracing import log_error
+
+
+def _load_emotion_analyzer():
+    # Imported lazily so the NLTK import cost is paid during warm-up, not at import time
+    from utils.enhanced_sentiment import EnhancedEmotionAnalyzer
+    return EnhancedEmotionAnalyzer()
+
+
+# Every analyzer the process shares, keyed by registry name
+_FACTORIES = {
+    'vader': SentimentIntensityAnalyzer,
+    'emotion': _load_emotion_analyzer,
+}
+
+_instances = {}
+_status = {name: {'state': 'cold', 'load_seconds': None, 'error': None} for name in _FACTORIES}
+_locks = {name: threading.Lock() for name in _FACTORIES}
+
+
+def get_analyzer(name):
+    """
+    Return the shared analyzer instance, loading it on first use.
+
+    Analyzers are read-only after construction, so one instance is safely
+    shared by every request thread. Loading is guarded per analyzer so a slow
+    load does not block lookups of analyzers that are already warm.
+    """
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _locks[name]:
+        instance = _instances.get(name)
+        if instance is None:
+            _status[name].update(state='loading', error=None)
+            started = time.perf_counter()
+            try:
+                instance = _FACTORIES[name]()
+            except Exception as e:
+                _status[name].update(state='failed', error=str(e))
+                raise
+            _status[name].update(state='ready', load_seconds=round(time.perf_counter() - started, 3))
+            _instances[name] = instance
+    return instance
+
+
+def get_vader():
+    """
+    Shared vaderSentiment analyzer used by utils.sentiment
+    """
+    return get_analyzer('vader')
+
+
+def get_emotion_analyzer():
+    """
+    Shared EnhancedEmotionAnalyzer
+    """
+    return get_analyzer('emotion')
+
+
+def warm_up(names=None):
+    """
+    Load the given analyzers (all by default) so requests never pay the load cost.
+    Failures are recorded in the status rather than raised.
+    """
+    for name in names or _FACTORIES:
+        try:
+            get_analyzer(name)
+        except Exception as e:
+            log_error("Error loading analyzer", analyzer=name, error=str(e))
+    return is_ready()
+
+
+def preload(names=None):
+    """
+    Load the analyzers and run each once, so data they load lazily (lexicon
+    indexes, NLTK resources) is in memory too. Used by a pre-forking server
+    before it forks: the workers then share these pages copy-on-write.
+    """
+    ready = warm_up(names)
+    for name, instance in list(_instances.items()):
+        try:
+            if name == 'emotion':
+                instance.analyze_emotion("I'm not sure, but I feel very happy about work today!")
+            else:
+                instance.polarity_scores("I feel very happy today!")
+        except Exception as e:
+            log_error("Error exercising analyzer", analyzer=name, error=str(e))
+    return ready
+
+
+def warm_up_async(names=None):
+    """
+    Run warm_up on a daemon thread so the server can start accepting health checks
+    """
+    thread = threading.Thread(target=warm_up, args=(names,), name='analyzer-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready():
+    """
+    True once every registered analyzer has loaded
+    """
+    return all(status['state'] == 'ready' for status in _status.values())
+
+
+def readiness():
+    """
+    Snapshot of the registry state for the readiness endpoint
+    """
+    return {
+        'ready': is_ready(),
+        'analyzers': {name: dict(status) for name, status in _status.items()}
+    }
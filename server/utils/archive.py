@@ -0,0 +1,392 @@
+"""
+Streaming emotion analysis of transcript archives (see analyze_archive.py).
+
+Records are read lazily from JSONL or CSV, grouped into chunks and scored
+by a pool of worker processes with a bounded number of chunks in flight,
+so memory stays flat however large the input is. Results are written in
+input order as one flat row per record. A checkpoint next to the output
+records how many input records are done and how much of the output holds
+them; a rerun of the same command picks up from there.
+"""
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from utils.analyzers import get_emotion_analyzer, warm_up
+from utils.results import EMOTIONS
+
+# One output row per input record, in this column order
+COLUMNS = (
+    'id', 'error', 'compound', 'primary_emotion', 'intensity',
+    *(f'emotion_{emotion}' for emotion in EMOTIONS),
+    'crisis_level', 'risk_category', 'needs_immediate_attention', 'crisis_indicators',
+    'primary_topic', 'topics', 'stress_level', 'support_strategy', 'confidence'
+)
+
+INPUT_FORMATS = ('jsonl', 'csv')
+OUTPUT_FORMATS = ('jsonl', 'csv', 'parquet')
+
+CHECKPOINT_VERSION = 1
+
+
+def detect_format(path, formats):
+    """
+    File format from the extension (.jsonl/.json, .csv, .parquet; .gz is ignored)
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lstrip('.').lower()
+    fmt = 'jsonl' if extension == 'json' else extension
+    if fmt not in formats:
+        raise ValueError(f"Cannot tell the format of {path}; expected one of: {', '.join(formats)}")
+    return fmt
+
+
+def _open_binary(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def read_records(path, fmt, text_field='transcript', id_field='id', skip=0):
+    """
+    Yield (record id, text, error) for each input record, after the first skip.
+
+    A record without a usable text is yielded with an error message instead
+    of being dropped, so record positions (and ids defaulting to them) are
+    stable across runs. Skipped JSONL lines are not parsed.
+    """
+    if fmt == 'jsonl':
+        yield from _read_jsonl(path, text_field, id_field, skip)
+    elif fmt == 'csv':
+        yield from _read_csv(path, text_field, id_field, skip)
+    else:
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+
+def _read_jsonl(path, text_field, id_field, skip):
+    with _open_binary(path) as f:
+        lines = (line for line in f if line.strip())
+        for index, line in enumerate(islice(lines, skip, None), start=skip):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield index, None, 'invalid JSON'
+                continue
+            if isinstance(record, str):
+                # A bare JSON string is the transcript itself
+                yield index, record, None
+            elif not isinstance(record, dict):
+                yield index, None, 'record is not an object'
+            else:
+                record_id = record.get(id_field, index)
+                text = record.get(text_field)
+                if isinstance(text, str):
+                    yield record_id, text, None
+                else:
+                    yield record_id, None, f"missing text field '{text_field}'"
+
+
+def _read_csv(path, text_field, id_field, skip):
+    with _open_binary(path) as binary:
+        reader = csv.DictReader(io.TextIOWrapper(binary, encoding='utf-8', newline=''))
+        if reader.fieldnames is None:
+            return
+        if text_field not in reader.fieldnames:
+            raise ValueError(f"{path} has no '{text_field}' column")
+        has_id = id_field in reader.fieldnames
+        for index, record in enumerate(islice(reader, skip, None), start=skip):
+            text = record[text_field]
+            yield (record[id_field] if has_id else index), (text if text is not None else ''), None
+
+
+def _chunked(records, size):
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def analysis_row(record_id, analysis):
+    """
+    The output row (in COLUMNS order) for one EmotionAnalysis
+    """
+    return (
+        record_id, None, analysis.compound, analysis.primary_emotion, analysis.intensity,
+        *(analysis.emotion(emotion) for emotion in EMOTIONS),
+        analysis.crisis_level, analysis.risk_category, analysis.needs_immediate_attention,
+        list(analysis.crisis_indicators), analysis.primary_topic, dict(analysis.topics),
+        analysis.stress_level, analysis.support_strategy, analysis.confidence
+    )
+
+
+def _error_row(record_id, error):
+    return (record_id, error) + (None,) * (len(COLUMNS) - 2)
+
+
+def _init_worker():
+    warm_up(['emotion'])
+
+
+def _analyze_chunk(chunk):
+    """
+    Score one chunk of (record id, text, error) in a worker; returns its rows
+    """
+    analyzer = get_emotion_analyzer()
+    return [
+        analysis_row(record_id, analyzer.analyze_emotion(text)) if error is None else _error_row(record_id, error)
+        for record_id, text, error in chunk
+    ]
+
+
+def analyze_in_order(chunks, workers):
+    """
+    Yield each chunk's rows in input order. At most two chunks per worker
+    are queued at a time, so the input is only read as fast as it is scored.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield _analyze_chunk(chunk)
+        return
+
+    # Spawned rather than forked, as in utils.batch
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker)
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_analyze_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _FileWriter:
+    """
+    Rows appended to one file. The position is the file size, and resuming
+    truncates the file back to it, dropping rows written after the checkpoint.
+    """
+
+    def __init__(self, path, position):
+        mode = 'r+b' if position and os.path.exists(path) else 'wb'
+        self._binary = open(path, mode)
+        self._binary.truncate(position)
+        self._binary.seek(position)
+        self._file = io.TextIOWrapper(self._binary, encoding='utf-8', newline='')
+
+    def sync(self):
+        """
+        Make every row written so far durable; returns the position to resume at
+        """
+        self._file.flush()
+        os.fsync(self._binary.fileno())
+        return self._binary.tell()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlWriter(_FileWriter):
+    def write(self, row):
+        self._file.write(json.dumps(dict(zip(COLUMNS, row)), separators=(',', ':')) + '\n')
+
+
+class CsvWriter(_FileWriter):
+    def __init__(self, path, position):
+        super().__init__(path, position)
+        self._writer = csv.writer(self._file)
+        if not position:
+            self._writer.writerow(COLUMNS)
+
+    def write(self, row):
+        # Lists and dicts are written as JSON in their cells
+        self._writer.writerow([json.dumps(value) if isinstance(value, (list, dict)) else value for value in row])
+
+
+class ParquetWriter:
+    """
+    Rows buffered in memory and written as one part file per sync into a
+    directory (readable as one dataset). The position is the number of
+    parts; resuming deletes any part past it.
+    """
+
+    def __init__(self, path, position):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet output needs pyarrow (pip install pyarrow)")
+        self._pa, self._pq = pa, pq
+        self._schema = pa.schema(
+            [('id', pa.string()), ('error', pa.string()), ('compound', pa.float64()),
+             ('primary_emotion', pa.string()), ('intensity', pa.string())]
+            + [(f'emotion_{emotion}', pa.float64()) for emotion in EMOTIONS]
+            + [('crisis_level', pa.float64()), ('risk_category', pa.string()),
+               ('needs_immediate_attention', pa.bool_()), ('crisis_indicators', pa.list_(pa.string())),
+               ('primary_topic', pa.string()), ('topics', pa.string()), ('stress_level', pa.string()),
+               ('support_strategy', pa.string()), ('confidence', pa.float64())]
+        )
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith('part-') and name.endswith('.parquet') and int(name[5:10]) >= position:
+                os.remove(os.path.join(path, name))
+        self._parts = position
+        self._rows = []
+
+    def write(self, row):
+        self._rows.append(row)
+
+    def sync(self):
+        if self._rows:
+            columns = {name: [] for name in COLUMNS}
+            for row in self._rows:
+                for name, value in zip(COLUMNS, row):
+                    columns[name].append(value)
+            columns['id'] = [None if value is None else str(value) for value in columns['id']]
+            columns['topics'] = [None if value is None else json.dumps(value) for value in columns['topics']]
+            table = self._pa.Table.from_pydict(columns, schema=self._schema)
+            part = os.path.join(self.path, f'part-{self._parts:05d}.parquet')
+            self._pq.write_table(table, part + '.tmp')
+            os.replace(part + '.tmp', part)
+            self._parts += 1
+            self._rows = []
+        return self._parts
+
+    def close(self):
+        self.sync()
+
+
+WRITERS = {'jsonl': JsonlWriter, 'csv': CsvWriter, 'parquet': ParquetWriter}
+
+
+def checkpoint_path(output_path):
+    return output_path.rstrip('/') + '.checkpoint'
+
+
+def load_checkpoint(output_path):
+    try:
+        with open(checkpoint_path(output_path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(output_path, checkpoint):
+    path = checkpoint_path(output_path)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+
+
+def _resume_point(input_path, output_path, output_format, restart):
+    """
+    The checkpoint to continue from, or a fresh one
+    """
+    fresh = {
+        'version': CHECKPOINT_VERSION,
+        'input': os.path.abspath(input_path),
+        'input_bytes': os.path.getsize(input_path),
+        'output_format': output_format,
+        'records': 0,
+        'errors': 0,
+        'position': 0,
+        'elapsed_seconds': 0.0
+    }
+    if restart:
+        return fresh
+    checkpoint = load_checkpoint(output_path)
+    if checkpoint is None:
+        if os.path.exists(output_path):
+            raise ValueError(f"{output_path} exists and has no checkpoint; pass restart to overwrite it")
+        return fresh
+    if not os.path.exists(output_path):
+        raise ValueError(f"Checkpoint {checkpoint_path(output_path)} has no output {output_path}; "
+                         "pass restart to start over")
+    for key in ('version', 'input', 'input_bytes', 'output_format'):
+        if checkpoint.get(key) != fresh[key]:
+            raise ValueError(f"Checkpoint {checkpoint_path(output_path)} does not match this run ({key} differs); "
+                             "pass restart to start over")
+    return checkpoint
+
+
+def run_archive(input_path, output_path, input_format=None, output_format=None, text_field='transcript',
+                id_field='id', workers=1, chunk_size=512, checkpoint_every=10000, restart=False,
+                progress=None, progress_seconds=5.0, clock=time.monotonic):
+    """
+    Analyze every record of input_path into output_path, resuming from the
+    output's checkpoint when there is one.
+
+    Args:
+        workers (int): Worker processes; 1 scores in this process
+        chunk_size (int): Records per task sent to a worker
+        checkpoint_every (int): Records between checkpoints (for Parquet, also rows per part file)
+        restart (bool): Ignore any checkpoint and overwrite the output
+        progress (callable): Called with the run statistics every progress_seconds
+
+    Returns:
+        dict: Run statistics (records, errors, records_per_second, ...)
+    """
+    input_format = input_format or detect_format(input_path, INPUT_FORMATS)
+    output_format = output_format or detect_format(output_path, OUTPUT_FORMATS)
+    checkpoint = _resume_point(input_path, output_path, output_format, restart)
+    resumed_from = checkpoint['records']
+
+    writer = WRITERS[output_format](output_path, checkpoint['position'])
+    started = clock()
+    # Time spent by the runs before this one
+    elapsed_before = checkpoint['elapsed_seconds']
+    stats = {'resumed_from': resumed_from, 'records': resumed_from, 'errors': checkpoint['errors']}
+
+    def update_stats():
+        elapsed = clock() - started
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['records_per_second'] = round((stats['records'] - resumed_from) / elapsed, 1) if elapsed > 0 else 0.0
+        return stats
+
+    def commit():
+        checkpoint.update(records=stats['records'], errors=stats['errors'], position=writer.sync(),
+                          elapsed_seconds=round(elapsed_before + clock() - started, 3))
+        save_checkpoint(output_path, checkpoint)
+
+    records = read_records(input_path, input_format, text_field, id_field, skip=resumed_from)
+    last_commit = resumed_from
+    last_report = started
+    in_chunk = False
+    try:
+        for rows in analyze_in_order(_chunked(records, chunk_size), workers):
+            in_chunk = True
+            for row in rows:
+                writer.write(row)
+            in_chunk = False
+            stats['records'] += len(rows)
+            stats['errors'] += sum(1 for row in rows if row[1] is not None)
+            if stats['records'] - last_commit >= checkpoint_every:
+                commit()
+                last_commit = stats['records']
+            if progress is not None and clock() - last_report >= progress_seconds:
+                last_report = clock()
+                progress(update_stats())
+    except BaseException:
+        # Interrupted between chunks: everything written is whole, so keep it
+        if not in_chunk:
+            commit()
+        writer.close()
+        raise
+
+    writer.close()
+    # Finished: the output is complete and the checkpoint is no longer needed
+    try:
+        os.remove(checkpoint_path(output_path))
+    except FileNotFoundError:
+        pass
+    return update_stats()
@@ -0,0 +1,88 @@
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from utils.analyzers import get_emotion_analyzer, warm_up
+from utils.sentiment import analyze_sentiment
+
+# Process pools are expensive to start, so one pool per worker count is kept for the process lifetime
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _init_worker():
+    """
+    Load the analyzers once per worker process
+    """
+    warm_up()
+
+
+def _analyze_chunk(texts, enhanced):
+    """
+    Score one chunk of texts inside a worker
+    """
+    if enhanced:
+        analyzer = get_emotion_analyzer()
+        return [analyzer.analyze_emotion(text) for text in texts]
+    return [analyze_sentiment(text) for text in texts]
+
+
+def _get_pool(workers):
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # Spawned (not forked) workers: the server has live threads, e.g. the
+            # warm-up thread, whose locks would be inherited held by a forked child
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+            _pools[workers] = pool
+        return pool
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def analyze_batch(texts, workers=None, chunksize=None, enhanced=False):
+    """
+    Analyze many texts, fanning chunks out over a process pool
+
+    Args:
+        texts (iterable of str): The texts to analyze
+        workers (int): Number of worker processes (defaults to the CPU count);
+            1 runs everything in the calling process
+        chunksize (int): Texts per task (defaults to about four tasks per worker)
+        enhanced (bool): Return EnhancedEmotionAnalyzer results instead of the
+            VADER summary produced by analyze_sentiment
+
+    Returns:
+        list: One result per input text, in input order
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    if chunksize is None:
+        chunksize = math.ceil(len(texts) / (workers * 4))
+    chunksize = max(1, chunksize)
+
+    if workers == 1 or len(texts) <= chunksize:
+        return _analyze_chunk(texts, enhanced)
+
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    results = []
+    # map() yields chunk results in submission order, so input order is preserved
+    for chunk_results in _get_pool(workers).map(_analyze_chunk, chunks, repeat(enhanced)):
+        results.extend(chunk_results)
+    return results
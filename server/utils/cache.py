@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from utils.tracing import log_error
+
+# Temporary entry files older than this are left over from a crash
+STALE_TEMP_SECONDS = 3600
+
+
+def content_key(data):
+    """
+    Content address for a payload: the SHA-256 hex digest of its bytes
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for JSON-serializable results.
+
+    The memory tier is an LRU bounded by entry count and TTL. The optional disk
+    tier keeps one JSON file per key in ``disk_dir`` so entries survive a
+    restart; disk hits are promoted back into memory. A sweep (sweep_disk, or
+    every interval seconds after start) drops expired entry files, then the
+    oldest ones until the directory fits in disk_max_bytes (0 or None for no cap).
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=3600, disk_dir=None, disk_max_bytes=None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._thread = None
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _expired(self, stored_at):
+        return self.ttl_seconds is not None and self._clock() - stored_at > self.ttl_seconds
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, entry)
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Store a value in memory and, when configured, on disk
+        """
+        stored_at = self._clock()
+        with self._lock:
+            self._store(key, (stored_at, value))
+        self._write_disk(key, stored_at, value)
+
+    def discard(self, key):
+        """
+        Drop a key from both tiers
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.unlink(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        """
+        Hit/miss counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'disk': bool(self.disk_dir),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_evictions': self.disk_evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+
+    def _store(self, key, entry):
+        # Caller holds the lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(record['stored_at']):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return record['stored_at'], record['value']
+
+    def _write_disk(self, key, stored_at, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({'stored_at': stored_at, 'value': value}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            log_error("Error writing cache entry", error=str(e))
+
+    def sweep_disk(self):
+        """
+        Remove expired entry files, then the oldest until the disk tier fits in
+        disk_max_bytes; returns the number removed
+        """
+        if not self.disk_dir:
+            return 0
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith('.json'):
+                # Entries are written once, so the mtime is their stored_at
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+            elif entry.name.endswith('.tmp') and now - stat.st_mtime > STALE_TEMP_SECONDS:
+                # Left over from a write that crashed
+                self._remove_file(entry.path)
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for stored_at, size, path in files:
+            if not (self._expired(stored_at) or (self.disk_max_bytes and total > self.disk_max_bytes)):
+                # Everything after this is newer, and the size cap is met
+                break
+            if self._remove_file(path):
+                removed += 1
+                total -= size
+        with self._lock:
+            self.disk_evictions += removed
+        return removed
+
+    def _remove_file(self, path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            log_error("Error evicting cache entry", file=os.path.basename(path), error=str(e))
+            return False
+        return True
+
+    def start(self, interval):
+        """
+        Sweep the disk tier every interval seconds on a daemon thread
+        """
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.sweep_disk()
+                except Exception as e:
+                    log_error("Error sweeping result cache", error=str(e))
+
+        # A forked worker inherits the parent's thread object but not the thread
+        if self.disk_dir and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=run, name='result-cache-sweeper', daemon=True)
+            self._thread.start()
+        return self._thread
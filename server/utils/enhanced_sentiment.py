@@ -1,11 +1,17 @@
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.tag import pos_tag
 import re
-from collections import Counter
+from collections import Counter, namedtuple
 import os
+from utils.lexicon import LexiconMatcher, group_matches, tokenize
+from utils.results import EmotionAnalysis
+from utils.tracing import log_info
+
+# Everything derived from one tokenization of the input text: the tokens, the
+# raw lexicon hits (with positions) and the hits grouped by category/label
+TextScan = namedtuple('TextScan', ['doc', 'hits', 'matches'])
 
 class EnhancedEmotionAnalyzer:
     def __init__(self):
@@ -15,6 +21,14 @@ class EnhancedEmotionAnalyzer:
         self.emotion_keywords = self._load_emotion_keywords()
         self.crisis_keywords = self._load_crisis_keywords()
         self.intensity_modifiers = self._load_intensity_modifiers()
+        self.negation_words = self._load_negation_words()
+        self.keyword_emotions = self._build_keyword_index()
+        self.max_keyword_words = max(len(keyword.split()) for keyword in self.keyword_emotions)
+        self.crisis_patterns = self._load_crisis_patterns()
+        self.topic_keywords = self._load_topic_keywords()
+        self.context_keywords = self._load_context_keywords()
+        self.matcher = self._build_matcher()
+        self._corpus_scorer = None
     
     def _download_nltk_data(self):
         """Download required NLTK data packages"""
@@ -22,28 +36,28 @@ class EnhancedEmotionAnalyzer:
             # Download punkt tokenizer
             nltk.data.find('tokenizers/punkt')
         except LookupError:
-            print("Downloading NLTK punkt tokenizer...")
+            log_info("Downloading NLTK punkt tokenizer")
             nltk.download('punkt')
         
         try:
             # Download stopwords
             nltk.data.find('corpora/stopwords')
         except LookupError:
-            print("Downloading NLTK stopwords...")
+            log_info("Downloading NLTK stopwords")
             nltk.download('stopwords')
         
         try:
             # Download averaged_perceptron_tagger for POS tagging
             nltk.data.find('taggers/averaged_perceptron_tagger')
         except LookupError:
-            print("Downloading NLTK POS tagger...")
+            log_info("Downloading NLTK POS tagger")
             nltk.download('averaged_perceptron_tagger')
         
         try:
             # Download VADER lexicon (this was missing!)
             nltk.data.find('sentiment/vader_lexicon')
         except LookupError:
-            print("Downloading NLTK VADER lexicon...")
+            log_info("Downloading NLTK VADER lexicon")
             nltk.download('vader_lexicon')
     
     def analyze_emotion(self, text):
@@ -54,7 +68,8 @@ class EnhancedEmotionAnalyzer:
             text (str): The text to analyze
             
         Returns:
-            dict: Comprehensive emotional analysis results
+            EmotionAnalysis: Comprehensive emotional analysis results (reads
+            like the original nested dict; see utils.results)
         """
         if not text or not text.strip():
             return self._empty_analysis()
@@ -62,39 +77,101 @@ class EnhancedEmotionAnalyzer:
         # Basic VADER sentiment
         vader_scores = self.vader.polarity_scores(text)
         
+        # Tokenize once and run every lexicon over the tokens in a single pass
+        scan = self._scan(text)
+        
         # Enhanced emotion detection
-        emotion_scores = self._detect_emotions(text)
+        emotion_scores = self._detect_emotions(text, scan)
         
         # Crisis detection
-        crisis_level = self._detect_crisis(text)
+        crisis_level = self._detect_crisis(text, scan)
         
         # Context analysis
-        context_info = self._analyze_context(text)
+        context_info = self._analyze_context(text, scan)
         
         # Linguistic pattern analysis
-        linguistic_patterns = self._analyze_linguistic_patterns(text)
+        linguistic_patterns = self._analyze_linguistic_patterns(text, scan)
+        
+        return self._assemble_analysis(vader_scores, emotion_scores, crisis_level, context_info, linguistic_patterns)
+    
+    def analyze_corpus(self, texts, block_size=1024):
+        """
+        Vectorized analyze_emotion for many texts at once
+        
+        Each block of texts is matched against every lexicon with array
+        operations into one sparse document x phrase count matrix; the
+        emotion, topic, crisis and stress counts are products of it, and
+        modifiers and negation are corrections to the emotion score matrix
+        (see utils.vectorized). Results are identical to analyze_emotion.
+        
+        Args:
+            texts (iterable of str): The texts to analyze
+            block_size (int): Texts scored per matrix block (bounds memory)
+            
+        Returns:
+            list: One EmotionAnalysis per text, in input order
+        """
+        if self._corpus_scorer is None:
+            # NumPy is only needed for corpus-scale scoring
+            from utils.vectorized import CorpusScorer
+            self._corpus_scorer = CorpusScorer(self)
+        
+        texts = list(texts)
+        results = []
+        for block_start in range(0, len(texts), block_size):
+            block = texts[block_start:block_start + block_size]
+            scored = iter(self._corpus_scorer.analyze([text for text in block if text and text.strip()]))
+            for text in block:
+                results.append(next(scored) if text and text.strip() else self._empty_analysis())
+        return results
+    
+    def needs_immediate_attention(self, text):
+        """
+        Crisis pre-screen: whether the text needs immediate attention
+        
+        Only the lexicon scan and crisis scoring run (no VADER, no full
+        analysis), so it is cheap enough for every transcript as soon as it
+        exists. Agrees with analyze_emotion's crisis_level.
         
+        Args:
+            text (str): The text to screen
+            
+        Returns:
+            bool: crisis_level['needs_immediate_attention'] of the text
+        """
+        if not text or not text.strip():
+            return False
+        return self._detect_crisis(text)['needs_immediate_attention']
+    
+    def _assemble_analysis(self, vader_scores, emotion_scores, crisis_level, context_info, linguistic_patterns):
+        """
+        Combine the stage outputs into the analyze_emotion result
+        """
         # Combine all analyses
         overall_analysis = self._combine_analysis(
             vader_scores, emotion_scores, crisis_level, context_info, linguistic_patterns
         )
         
-        return {
-            'basic_sentiment': vader_scores,
-            'emotions': emotion_scores,
-            'crisis_level': crisis_level,
-            'context': context_info,
-            'linguistic_patterns': linguistic_patterns,
-            'overall_analysis': overall_analysis,
-            'confidence': self._calculate_confidence(vader_scores, emotion_scores, linguistic_patterns)
-        }
+        return EmotionAnalysis.from_stages(
+            vader_scores, emotion_scores, crisis_level, context_info, linguistic_patterns, overall_analysis,
+            self._calculate_confidence(vader_scores, emotion_scores, linguistic_patterns)
+        )
     
-    def _detect_emotions(self, text):
+    def _scan(self, text):
+        """
+        Tokenize the text once and run the compiled matcher over the tokens
+        """
+        doc = tokenize(text)
+        hits = self.matcher.find(doc)
+        return TextScan(doc, hits, group_matches(hits))
+    
+    def _detect_emotions(self, text, scan=None):
         """
         Detect specific emotions using keyword analysis and linguistic patterns
         """
-        text_lower = text.lower()
-        tokens = word_tokenize(text_lower)
+        if scan is None:
+            scan = self._scan(text)
+        matches = scan.matches
         
         # Initialize emotion scores
         emotion_scores = {
@@ -104,84 +181,83 @@ class EnhancedEmotionAnalyzer:
         }
         
         # Count emotion keywords
-        for emotion, keywords in self.emotion_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    emotion_scores[emotion] += 1
+        for emotion, keywords in matches.get('emotion', {}).items():
+            emotion_scores[emotion] += len(keywords)
         
         # Analyze emotional intensity modifiers
-        emotion_scores = self._apply_intensity_modifiers(text_lower, emotion_scores)
+        emotion_scores = self._apply_intensity_modifiers(scan, emotion_scores)
         
         # Analyze negation (e.g., "not happy" should decrease joy)
-        emotion_scores = self._analyze_negation(text_lower, emotion_scores)
+        emotion_scores = self._analyze_negation(scan, emotion_scores)
         
         return emotion_scores
     
-    def _apply_intensity_modifiers(self, text_lower, emotion_scores):
+    def _emotions_after(self, scan, hit):
+        """
+        Look up the emotions of the keyword directly following a modifier hit
+        """
+        words = scan.doc.words
+        start = hit.last
+        for length in range(min(self.max_keyword_words, len(words) - start), 0, -1):
+            emotions = self.keyword_emotions.get(' '.join(words[start:start + length]))
+            if emotions:
+                return emotions
+        return ()
+    
+    def _apply_intensity_modifiers(self, scan, emotion_scores):
         """
         Apply intensity modifiers to emotion scores
         """
         # Very, really, extremely, etc. increase intensity
-        intensifiers = ['very', 'really', 'extremely', 'incredibly', 'absolutely', 'totally']
-        for intensifier in intensifiers:
-            if intensifier in text_lower:
-                # Find the emotion word that follows
-                words = text_lower.split()
-                for i, word in enumerate(words):
-                    if word == intensifier and i + 1 < len(words):
-                        next_word = words[i + 1]
-                        for emotion, keywords in self.emotion_keywords.items():
-                            if next_word in keywords:
-                                emotion_scores[emotion] += 0.5
+        for hit in scan.hits:
+            if hit.category == 'intensifier':
+                for emotion in self._emotions_after(scan, hit):
+                    emotion_scores[emotion] += 0.5
         
         # Slightly, kind of, etc. decrease intensity
-        deintensifiers = ['slightly', 'kind of', 'sort of', 'a little', 'somewhat']
-        for deintensifier in deintensifiers:
-            if deintensifier in text_lower:
-                words = text_lower.split()
-                for i, word in enumerate(words):
-                    if word in deintensifiers and i + 1 < len(words):
-                        next_word = words[i + 1]
-                        for emotion, keywords in self.emotion_keywords.items():
-                            if next_word in keywords:
-                                emotion_scores[emotion] = max(0, emotion_scores[emotion] - 0.3)
+        for hit in scan.hits:
+            if hit.category == 'deintensifier':
+                for emotion in self._emotions_after(scan, hit):
+                    emotion_scores[emotion] = max(0, emotion_scores[emotion] - 0.3)
         
         return emotion_scores
     
-    def _analyze_negation(self, text_lower, emotion_scores):
+    def _analyze_negation(self, scan, emotion_scores):
         """
         Analyze negation to adjust emotion scores
         """
-        negations = ['not', 'no', 'never', 'none', 'neither', 'nor']
-        
-        for negation in negations:
-            if negation in text_lower:
-                words = text_lower.split()
-                for i, word in enumerate(words):
-                    if word in negations and i + 1 < len(words):
-                        next_word = words[i + 1]
-                        for emotion, keywords in self.emotion_keywords.items():
-                            if next_word in keywords:
-                                # Reduce the positive emotion or increase the opposite
-                                if emotion in ['joy', 'trust', 'anticipation']:
-                                    emotion_scores[emotion] = max(0, emotion_scores[emotion] - 1)
-                                    if emotion == 'joy':
-                                        emotion_scores['sadness'] += 0.5
-                                    elif emotion == 'trust':
-                                        emotion_scores['fear'] += 0.5
-                                elif emotion in ['fear', 'sadness']:
-                                    emotion_scores[emotion] = max(0, emotion_scores[emotion] - 1)
-                                    if emotion == 'fear':
-                                        emotion_scores['trust'] += 0.5
-                                    elif emotion == 'sadness':
-                                        emotion_scores['joy'] += 0.5
+        for hit in scan.hits:
+            if hit.category != 'negation':
+                continue
+            for emotion in self._emotions_after(scan, hit):
+                # Reduce the positive emotion or increase the opposite
+                if emotion in ['joy', 'trust', 'anticipation']:
+                    emotion_scores[emotion] = max(0, emotion_scores[emotion] - 1)
+                    if emotion == 'joy':
+                        emotion_scores['sadness'] += 0.5
+                    elif emotion == 'trust':
+                        emotion_scores['fear'] += 0.5
+                elif emotion in ['fear', 'sadness']:
+                    emotion_scores[emotion] = max(0, emotion_scores[emotion] - 1)
+                    if emotion == 'fear':
+                        emotion_scores['trust'] += 0.5
+                    elif emotion == 'sadness':
+                        emotion_scores['joy'] += 0.5
         
         return emotion_scores
     
-    def _analyze_linguistic_patterns(self, text):
+    def _analyze_linguistic_patterns(self, text, scan=None):
         """
         Analyze linguistic patterns that indicate emotions
         """
+        doc = scan.doc if scan is not None else tokenize(text)
+        word_freq = Counter(doc.words)
+        return self._linguistic_patterns(text, sum(1 for word, count in word_freq.items() if count > 1))
+    
+    def _linguistic_patterns(self, text, repeated_words):
+        """
+        Linguistic patterns from the text and its number of distinct repeated words
+        """
         patterns = {}
         
         # Exclamation marks (excitement, anger, surprise)
@@ -196,15 +272,12 @@ class EnhancedEmotionAnalyzer:
             patterns['curiosity'] = min(question_count * 0.15, 1.0)
         
         # Capitalization (emphasis, strong emotion)
-        caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+        caps_ratio = sum(map(str.isupper, text)) / len(text) if text else 0
         if caps_ratio > 0.3:
             patterns['intensity'] = min(caps_ratio, 1.0)
             patterns['emphasis'] = min(caps_ratio * 0.8, 1.0)
         
         # Repeated words (emphasis, strong feeling)
-        tokens = word_tokenize(text.lower())
-        word_freq = Counter(tokens)
-        repeated_words = sum(1 for word, count in word_freq.items() if count > 1)
         if repeated_words > 0:
             patterns['emphasis'] = min(repeated_words * 0.1, 1.0)
         
@@ -216,38 +289,44 @@ class EnhancedEmotionAnalyzer:
         
         return patterns
     
-    def _detect_crisis(self, text):
+    def _detect_crisis(self, text, scan=None):
         """
         Detect crisis situations that need immediate attention
         """
-        text_lower = text.lower()
-        crisis_score = 0
-        crisis_indicators = []
-        
-        # Check for crisis keywords
-        for keyword in self.crisis_keywords:
-            if keyword in text_lower:
-                crisis_score += 0.3
-                crisis_indicators.append(keyword)
-        
-        # Check for extreme language
-        extreme_words = ['never', 'always', 'hate', 'despise', 'terrible', 'horrible', 'awful']
-        for word in extreme_words:
-            if word in text_lower:
-                crisis_score += 0.1
-        
-        # Check for hopelessness
-        hopeless_phrases = ['give up', 'no point', 'nothing matters', 'end it all', 'can\'t take it']
-        for phrase in hopeless_phrases:
-            if phrase in text_lower:
-                crisis_score += 0.4
-        
-        # Check for isolation
-        isolation_phrases = ['no one cares', 'alone', 'nobody understands', 'no one gets it']
-        for phrase in isolation_phrases:
-            if phrase in text_lower:
-                crisis_score += 0.2
+        if scan is None:
+            scan = self._scan(text)
+        matches = scan.matches
+        crisis_indicators = list(matches.get('crisis', {}).get(None, []))
+        crisis_score = self._score_crisis(
+            len(crisis_indicators),
+            len(matches.get('extreme', {}).get(None, [])),
+            len(matches.get('hopeless', {}).get(None, [])),
+            len(matches.get('isolation', {}).get(None, []))
+        )
+        return self._crisis_result(crisis_score, crisis_indicators)
+    
+    def _score_crisis(self, crisis_count, extreme_count, hopeless_count, isolation_count):
+        """
+        Weight crisis signal counts into a score (also applied to count arrays by analyze_corpus)
+        """
+        # Crisis keywords
+        crisis_score = 0.3 * crisis_count
+        
+        # Extreme language
+        crisis_score += 0.1 * extreme_count
         
+        # Hopelessness
+        crisis_score += 0.4 * hopeless_count
+        
+        # Isolation
+        crisis_score += 0.2 * isolation_count
+        
+        return crisis_score
+    
+    def _crisis_result(self, crisis_score, crisis_indicators):
+        """
+        Build the crisis assessment from a score and the matched indicators
+        """
         return {
             'level': min(crisis_score, 1.0),
             'indicators': crisis_indicators,
@@ -270,26 +349,26 @@ class EnhancedEmotionAnalyzer:
         else:
             return 'none'
     
-    def _analyze_context(self, text):
+    def _analyze_context(self, text, scan=None):
         """
         Analyze the context and topics being discussed
         """
-        text_lower = text.lower()
-        
-        # Topic detection with weighted scoring
-        topics = {
-            'work': ['work', 'job', 'career', 'boss', 'colleague', 'presentation', 'deadline', 'meeting', 'project'],
-            'relationships': ['family', 'friend', 'partner', 'relationship', 'love', 'breakup', 'marriage', 'dating'],
-            'health': ['health', 'sick', 'pain', 'doctor', 'hospital', 'medication', 'symptoms', 'treatment'],
-            'education': ['school', 'college', 'exam', 'study', 'homework', 'grade', 'class', 'assignment'],
-            'personal': ['goal', 'dream', 'future', 'past', 'memory', 'achievement', 'hobby', 'interest'],
-            'financial': ['money', 'bills', 'debt', 'salary', 'expenses', 'budget', 'financial'],
-            'social': ['party', 'social', 'group', 'crowd', 'people', 'conversation', 'interaction']
-        }
-        
+        if scan is None:
+            scan = self._scan(text)
+        topic_hits = scan.matches.get('topic', {})
+        context_hits = scan.matches.get('context', {})
+        return self._summarize_context(
+            [len(topic_hits.get(topic, [])) for topic in self.topic_keywords],
+            {label: len(context_hits.get(label, [])) for label in self.context_keywords}
+        )
+    
+    def _summarize_context(self, topic_counts, context_counts):
+        """
+        Build the context analysis from per-topic and per-context-cue keyword counts
+        """
+        # Topic detection with weighted scoring (kept in lexicon order)
         detected_topics = {}
-        for topic, keywords in topics.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
+        for topic, score in zip(self.topic_keywords, topic_counts):
             if score > 0:
                 detected_topics[topic] = score
         
@@ -297,7 +376,7 @@ class EnhancedEmotionAnalyzer:
         primary_topic = max(detected_topics.items(), key=lambda x: x[1])[0] if detected_topics else 'general'
         
         # Analyze emotional context (how the topic relates to emotions)
-        emotional_context = self._analyze_emotional_context(text_lower, primary_topic)
+        emotional_context = self._analyze_emotional_context(context_counts, primary_topic)
         
         return {
             'topics': detected_topics,
@@ -305,7 +384,7 @@ class EnhancedEmotionAnalyzer:
             'emotional_context': emotional_context
         }
     
-    def _analyze_emotional_context(self, text_lower, primary_topic):
+    def _analyze_emotional_context(self, context_counts, primary_topic):
         """
         Analyze how the primary topic relates to emotions
         """
@@ -316,8 +395,7 @@ class EnhancedEmotionAnalyzer:
         }
         
         # Analyze stress indicators
-        stress_words = ['stress', 'overwhelmed', 'pressure', 'anxious', 'worried', 'concerned']
-        stress_count = sum(1 for word in stress_words if word in text_lower)
+        stress_count = context_counts['stress']
         
         if stress_count > 2:
             context_analysis['stress_level'] = 'high'
@@ -328,10 +406,10 @@ class EnhancedEmotionAnalyzer:
         if primary_topic == 'work' and stress_count > 0:
             context_analysis['topic_emotion_relationship'] = 'stressful'
             context_analysis['support_needed'] = 'stress_management'
-        elif primary_topic == 'relationships' and any(word in text_lower for word in ['sad', 'angry', 'hurt']):
+        elif primary_topic == 'relationships' and context_counts['conflict'] > 0:
             context_analysis['topic_emotion_relationship'] = 'conflict'
             context_analysis['support_needed'] = 'relationship_support'
-        elif primary_topic == 'health' and any(word in text_lower for word in ['worried', 'scared', 'anxious']):
+        elif primary_topic == 'health' and context_counts['health_worry'] > 0:
             context_analysis['topic_emotion_relationship'] = 'health_anxiety'
             context_analysis['support_needed'] = 'health_support'
         
@@ -495,16 +573,86 @@ class EnhancedEmotionAnalyzer:
             'deintensifiers': ['slightly', 'kind of', 'sort of', 'a little', 'somewhat', 'moderately', 'reasonably']
         }
     
+    def _load_negation_words(self):
+        """
+        Load words that negate the emotion keyword following them
+        """
+        return ['not', 'no', 'never', 'none', 'neither', 'nor']
+    
+    def _build_keyword_index(self):
+        """
+        Build the inverted keyword -> emotions index used by modifier windows
+        """
+        index = {}
+        for emotion, keywords in self.emotion_keywords.items():
+            for keyword in keywords:
+                emotions = index.setdefault(keyword, [])
+                if emotion not in emotions:
+                    emotions.append(emotion)
+        return {keyword: tuple(emotions) for keyword, emotions in index.items()}
+    
+    def _load_crisis_patterns(self):
+        """
+        Load secondary crisis signals weighted separately from crisis keywords
+        """
+        return {
+            'extreme': ['never', 'always', 'hate', 'despise', 'terrible', 'horrible', 'awful'],
+            'hopeless': ['give up', 'no point', 'nothing matters', 'end it all', 'can\'t take it'],
+            'isolation': ['no one cares', 'alone', 'nobody understands', 'no one gets it']
+        }
+    
+    def _load_topic_keywords(self):
+        """
+        Load topic keywords used for context analysis
+        """
+        return {
+            'work': ['work', 'job', 'career', 'boss', 'colleague', 'presentation', 'deadline', 'meeting', 'project'],
+            'relationships': ['family', 'friend', 'partner', 'relationship', 'love', 'breakup', 'marriage', 'dating'],
+            'health': ['health', 'sick', 'pain', 'doctor', 'hospital', 'medication', 'symptoms', 'treatment'],
+            'education': ['school', 'college', 'exam', 'study', 'homework', 'grade', 'class', 'assignment'],
+            'personal': ['goal', 'dream', 'future', 'past', 'memory', 'achievement', 'hobby', 'interest'],
+            'financial': ['money', 'bills', 'debt', 'salary', 'expenses', 'budget', 'financial'],
+            'social': ['party', 'social', 'group', 'crowd', 'people', 'conversation', 'interaction']
+        }
+    
+    def _load_context_keywords(self):
+        """
+        Load words linking a topic to an emotional context
+        """
+        return {
+            'stress': ['stress', 'overwhelmed', 'pressure', 'anxious', 'worried', 'concerned'],
+            'conflict': ['sad', 'angry', 'hurt'],
+            'health_worry': ['worried', 'scared', 'anxious']
+        }
+    
+    def _lexicon_entries(self):
+        """
+        Every lexicon as (phrases, category, label), for the matcher and the corpus scorer
+        """
+        for emotion, keywords in self.emotion_keywords.items():
+            yield keywords, 'emotion', emotion
+        yield self.intensity_modifiers['intensifiers'], 'intensifier', None
+        yield self.intensity_modifiers['deintensifiers'], 'deintensifier', None
+        yield self.negation_words, 'negation', None
+        yield self.crisis_keywords, 'crisis', None
+        for category, phrases in self.crisis_patterns.items():
+            yield phrases, category, None
+        for topic, keywords in self.topic_keywords.items():
+            yield keywords, 'topic', topic
+        for label, words in self.context_keywords.items():
+            yield words, 'context', label
+    
+    def _build_matcher(self):
+        """
+        Compile every lexicon into one matcher so each text is scanned once
+        """
+        matcher = LexiconMatcher()
+        for phrases, category, label in self._lexicon_entries():
+            matcher.add_many(phrases, category, label)
+        return matcher
+    
     def _empty_analysis(self):
         """
         Return empty analysis structure for invalid input
         """
-        return {
-            'basic_sentiment': {'pos': 0, 'neg': 0, 'neu': 1, 'compound': 0},
-            'emotions': {},
-            'crisis_level': {'level': 0, 'indicators': [], 'needs_immediate_attention': False, 'risk_category': 'none'},
-            'context': {'topics': {}, 'primary_topic': 'general', 'emotional_context': {}},
-            'linguistic_patterns': {},
-            'overall_analysis': {'primary_emotion': 'neutral', 'intensity': 'low', 'support_strategy': 'exploration', 'emotional_complexity': 'simple', 'emotional_state': 'neutral emotional state'},
-            'confidence': {'overall': 0, 'vader': 0, 'emotion_detection': 0, 'linguistic_patterns': 0}
-        } 
\ No newline at end of file
+        return EmotionAnalysis.empty()
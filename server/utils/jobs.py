@@ -0,0 +1,173 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.lanes import submit_in_lane
+from utils.tracing import log_error, run_in_context
+
+
+class JobQueueFull(Exception):
+    """
+    Raised by JobManager.submit when max_active jobs are already queued or running
+    """
+
+
+class Handoff:
+    """
+    Returned by a job function to finish the job in a lane (see utils.lanes):
+    fn(*args) runs there and its result completes the job, while the job
+    thread moves on to the next queued job
+    """
+
+    def __init__(self, lane, fn, *args):
+        self.lane = lane
+        self.fn = fn
+        self.args = args
+
+
+class Job:
+    """
+    One background pipeline run with per-stage progress and an event log for SSE
+    """
+
+    def __init__(self, stages):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.stages = {stage: {'status': 'pending', 'seconds': None} for stage in stages}
+        self.events = []
+        self._stage_started = None
+        self._changed = threading.Condition()
+
+    def _publish(self, event, data):
+        # Caller holds the condition
+        self.events.append((event, data))
+        self._changed.notify_all()
+
+    def start(self):
+        with self._changed:
+            self.status = 'running'
+            self._stage_started = time.perf_counter()
+            self._publish('status', {'status': 'running'})
+
+    def stage_done(self, stage, result):
+        """
+        Record a finished stage and publish its result
+        """
+        with self._changed:
+            now = time.perf_counter()
+            self.stages[stage] = {'status': 'done', 'seconds': round(now - self._stage_started, 3)}
+            self._stage_started = now
+            self._publish('stage', {'stage': stage, 'result': result})
+
+    def complete(self, result):
+        with self._changed:
+            self.status = 'done'
+            self.result = result
+            self.finished_at = time.time()
+            self._publish('done', result)
+
+    def fail(self, error):
+        with self._changed:
+            self.status = 'failed'
+            self.error = error
+            self.finished_at = time.time()
+            self._publish('failed', {'error': error})
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def wait_for_events(self, index, timeout):
+        """
+        Return events from index onwards, blocking up to timeout for new ones
+        """
+        with self._changed:
+            if index >= len(self.events) and not self.finished:
+                self._changed.wait(timeout)
+            return self.events[index:]
+
+    def snapshot(self):
+        with self._changed:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'stages': {stage: dict(progress) for stage, progress in self.stages.items()},
+                'result': self.result,
+                'error': self.error
+            }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool, turns new ones away once max_active
+    are queued or running, and keeps finished jobs for a retention window.
+
+    A job that returns a Handoff releases its thread: the rest runs on the
+    priority lane's reserved threads or, in the normal lane, on a second pool
+    of as many threads, so a flagged job never waits behind the routine jobs
+    still finishing.
+    """
+
+    def __init__(self, workers, retention_seconds, max_jobs, max_active):
+        self.retention_seconds = retention_seconds
+        self.max_jobs = max_jobs
+        self.max_active = max_active
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analyze-job')
+        self._finisher = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analyze-job-finish')
+        self._jobs = OrderedDict()
+        self._active = 0  # queued or running
+        self._lock = threading.Lock()
+
+    def submit(self, stages, fn, *args):
+        """
+        Queue fn(job, *args) and return the Job tracking it; raises
+        JobQueueFull when max_active jobs are already queued or running
+        """
+        job = Job(stages)
+        with self._lock:
+            if self._active >= self.max_active:
+                raise JobQueueFull(f"{self._active} jobs queued or running")
+            self._active += 1
+            self._prune()
+            self._jobs[job.id] = job
+        # The job keeps the submitting request's id in its log lines
+        self._executor.submit(run_in_context(self._run), job, fn, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args):
+        job.start()
+        self._settle(job, lambda: fn(job, *args))
+
+    def _settle(self, job, step):
+        # Complete or fail the job with step's outcome, or hand it off to its lane
+        try:
+            outcome = step()
+            if isinstance(outcome, Handoff):
+                future = submit_in_lane(outcome.lane, self._finisher, outcome.fn, *outcome.args)
+                future.add_done_callback(run_in_context(lambda done: self._settle(job, done.result)))
+                return
+            job.complete(outcome)
+        except Exception as e:
+            log_error("Error in analyze job", job_id=job.id, error=str(e))
+            job.fail(str(e))
+        with self._lock:
+            self._active -= 1
+
+    def _prune(self):
+        # Caller holds the lock; drop finished jobs past retention, oldest
+        # first, and the oldest finished jobs when over the size cap
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if not job.finished:
+                continue
+            if job.finished_at < cutoff or len(self._jobs) >= self.max_jobs:
+                del self._jobs[job_id]
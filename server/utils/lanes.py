@@ -0,0 +1,115 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import config
+from utils.analyzers import get_emotion_analyzer
+from utils.metrics import LANE_QUEUE_DEPTH, LANE_REQUESTS, LANE_SECONDS, record_stage
+from utils.tracing import run_in_context
+
+NORMAL = 'normal'
+PRIORITY = 'priority'
+
+# Lane of the pipeline run in progress; the TTS stage reads it to pick its queue
+_lane = contextvars.ContextVar('pipeline_lane', default=NORMAL)
+
+
+def current_lane():
+    return _lane.get()
+
+
+def crisis_prescreen(transcript):
+    """
+    True when the transcript needs immediate attention (see
+    EnhancedEmotionAnalyzer.needs_immediate_attention)
+    """
+    return get_emotion_analyzer().needs_immediate_attention(transcript)
+
+
+class PriorityLane:
+    """
+    Threads reserved for crisis-flagged requests.
+
+    The rest of a flagged request's pipeline is handed to these threads, so it
+    never waits behind routine traffic for a request or job thread, and its TTS
+    renders go to the TTS service's priority queue.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._waiting = LANE_QUEUE_DEPTH.labels(lane=PRIORITY, queue='executor')
+
+    def _get_executor(self):
+        # Created on first use: a pre-forking parent never starts the threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='priority-lane')
+            return self._executor
+
+    def submit(self, fn, *args):
+        """
+        Queue fn(*args) on a reserved thread; returns its Future
+        """
+        self._waiting.inc()
+        return self._get_executor().submit(run_in_context(self._run), time.perf_counter(), fn, args)
+
+    def run(self, fn, *args):
+        """
+        Run fn(*args) on a reserved thread and wait for its result
+        """
+        return self.submit(fn, *args).result()
+
+    def _run(self, submitted, fn, args):
+        self._waiting.dec()
+        # The handoff wait shows up in Server-Timing, which also marks the request as prioritized
+        record_stage('priority_queue', time.perf_counter() - submitted)
+        _lane.set(PRIORITY)
+        return fn(*args)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+priority_lane = PriorityLane(config.PRIORITY_LANE_WORKERS)
+
+
+def _effective_lane(lane):
+    return NORMAL if lane == PRIORITY and not config.PRIORITY_LANE else lane
+
+
+def run_in_lane(lane, fn, *args):
+    """
+    Finish a pipeline run in lane: PRIORITY hands fn to the reserved threads
+    (when PRIORITY_LANE is on), NORMAL runs it in the calling thread
+    """
+    lane = _effective_lane(lane)
+    LANE_REQUESTS.labels(lane=lane).inc()
+    with LANE_SECONDS.labels(lane=lane).time():
+        if lane == PRIORITY:
+            return priority_lane.run(fn, *args)
+        return fn(*args)
+
+
+def submit_in_lane(lane, executor, fn, *args):
+    """
+    run_in_lane without waiting, for background jobs: PRIORITY queues fn on
+    the reserved threads, NORMAL on executor; returns a Future of its result
+    """
+    lane = _effective_lane(lane)
+    LANE_REQUESTS.labels(lane=lane).inc()
+    submitted = time.perf_counter()
+
+    def timed(*args):
+        try:
+            return fn(*args)
+        finally:
+            LANE_SECONDS.labels(lane=lane).observe(time.perf_counter() - submitted)
+
+    if lane == PRIORITY:
+        return priority_lane.submit(timed, *args)
+    return executor.submit(run_in_context(timed), *args)
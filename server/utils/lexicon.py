@@ -0,0 +1,131 @@
+import re
+from collections import namedtuple
+
+# Words are runs of letters/digits with optional inner apostrophes ("can't", "i'm");
+# every other non-space character (or an ellipsis) is a punctuation token
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)*|\.\.\.|[^\w\s]|_")
+
+# One token of the lowercased text with its character offsets
+Token = namedtuple('Token', ['text', 'start', 'end'])
+
+# One hit of a lexicon phrase: character offsets refer to the lowercased text,
+# token offsets index into TokenizedText.tokens (end exclusive)
+LexiconMatch = namedtuple('LexiconMatch', ['phrase', 'category', 'label', 'start', 'end', 'first', 'last'])
+
+# Key under which a trie node stores the tags of the phrase ending there
+_END = None
+
+
+def normalize_text(text):
+    """
+    Lowercase text and fold typographic apostrophes so "can’t" matches "can't"
+    """
+    return text.lower().replace('’', "'")
+
+
+class TokenizedText:
+    """
+    A text tokenized once and shared by every analysis stage
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = normalize_text(text)
+        self.tokens = [Token(m.group(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(self.lower)]
+        self.words = [token.text for token in self.tokens]
+
+    @classmethod
+    def from_tokens(cls, text, lower, tokens):
+        """
+        Build from already computed tokens (used to extend a text incrementally)
+        """
+        doc = cls.__new__(cls)
+        doc.text = text
+        doc.lower = lower
+        doc.tokens = list(tokens)
+        doc.words = [token.text for token in doc.tokens]
+        return doc
+
+    def __len__(self):
+        return len(self.tokens)
+
+
+def tokenize(text):
+    """
+    Tokenize text into a reusable TokenizedText (no-op if it already is one)
+    """
+    if isinstance(text, TokenizedText):
+        return text
+    return TokenizedText(text)
+
+
+class LexiconMatcher:
+    """
+    Word-level trie over every lexicon phrase.
+
+    All phrases are compiled once; ``find`` walks the text a single time and
+    reports every hit, including overlapping ones such as "better off dead"
+    inside "everyone would be better off dead". Matching is on whole words,
+    so "sad" no longer fires inside "crusade".
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.max_phrase_words = 0
+        self.size = 0
+
+    def add(self, phrase, category, label=None):
+        """
+        Register a phrase under a category (e.g. 'emotion') and optional label (e.g. 'joy')
+        """
+        words = tokenize(phrase).words
+        if not words:
+            return
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        node.setdefault(_END, []).append((phrase, category, label))
+        self.max_phrase_words = max(self.max_phrase_words, len(words))
+        self.size += 1
+
+    def add_many(self, phrases, category, label=None):
+        """
+        Register several phrases under the same category and label
+        """
+        for phrase in phrases:
+            self.add(phrase, category, label)
+
+    def find(self, text):
+        """
+        Return every lexicon hit in the text (a string or TokenizedText),
+        ordered by start position
+        """
+        tokens = tokenize(text).tokens
+        root = self._root
+        matches = []
+        for i, token in enumerate(tokens):
+            node = root.get(token.text)
+            j = i
+            while node is not None:
+                tags = node.get(_END)
+                if tags:
+                    end = tokens[j].end
+                    for phrase, category, label in tags:
+                        matches.append(LexiconMatch(phrase, category, label, token.start, end, i, j + 1))
+                j += 1
+                if j >= len(tokens):
+                    break
+                node = node.get(tokens[j].text)
+        return matches
+
+
+def group_matches(matches):
+    """
+    Group hits as {category: {label: [distinct phrases in order of first appearance]}}
+    """
+    grouped = {}
+    for match in matches:
+        phrases = grouped.setdefault(match.category, {}).setdefault(match.label, [])
+        if match.phrase not in phrases:
+            phrases.append(match.phrase)
+    return grouped
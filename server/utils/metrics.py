@@ -0,0 +1,282 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from a cache hit to a slow recognizer round trip
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Upload sizes in bytes, 1 KB to 32 MB
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+# Audio durations in seconds
+DURATION_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    A named metric family; each distinct set of label values is one child series.
+
+    labels() caches its children, so the hot path is a dict lookup plus a
+    locked arithmetic update.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _series(self):
+        if not self.labelnames:
+            return [((), self._default)]
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def render(self, name, labelnames, values):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = _format_labels(labelnames, values, [('le', _format_value(float(bound)))])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        plain = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{plain} {_format_value(total)}")
+        lines.append(f"{name}_count{plain} {cumulative}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set(self, value):
+        self._default.set(value)
+
+    def track_inprogress(self):
+        return self._default.track_inprogress()
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+
+class Registry:
+    """
+    The metrics one process exposes on GET /metrics
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        """
+        Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Pipeline instrumentation
+STAGE_SECONDS = Histogram('speech_stage_duration_seconds', 'Latency of each /analyze pipeline stage', ['stage'])
+STAGE_IN_FLIGHT = Gauge('speech_stage_in_flight', 'Pipeline stages currently running', ['stage'])
+STAGE_ERRORS = Counter('speech_stage_errors_total', 'Errors raised inside a pipeline stage', ['stage', 'backend'])
+STAGE_FALLBACKS = Counter('speech_stage_fallbacks_total', 'Stage results replaced by their fallback value', ['stage'])
+RECOGNIZER_SECONDS = Histogram('speech_recognizer_duration_seconds', 'Latency of one recognizer call', ['backend'])
+UPLOAD_BYTES = Histogram('speech_upload_bytes', 'Size of uploaded audio', buckets=SIZE_BUCKETS)
+AUDIO_SECONDS = Histogram('speech_audio_duration_seconds', 'Duration of uploaded audio before and after preprocessing',
+                          ['phase'], buckets=DURATION_BUCKETS)
+
+# Pipeline lanes: crisis-flagged requests finish on a reserved priority lane
+LANE_REQUESTS = Counter('speech_lane_requests_total', 'Requests handed to each pipeline lane after the crisis pre-screen', ['lane'])
+LANE_SECONDS = Histogram('speech_lane_duration_seconds', 'Time from the crisis pre-screen to the end of the pipeline', ['lane'])
+LANE_QUEUE_DEPTH = Gauge('speech_lane_queue_depth', 'Work waiting in each lane: handoffs to the lane executor not yet '
+                         'started, and TTS renders not yet finished', ['lane', 'queue'])
+
+# HTTP instrumentation
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Latency of HTTP requests', ['endpoint', 'method', 'status'])
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'HTTP requests currently being handled')
+
+
+# Stage durations of the request being handled, reported in its Server-Timing header
+_stage_timings = contextvars.ContextVar('stage_timings', default=None)
+
+
+def start_stage_timings():
+    """
+    Collect track_stage durations in the current context; returns (timings dict, token)
+    """
+    timings = {}
+    return timings, _stage_timings.set(timings)
+
+def stop_stage_timings(token):
+    _stage_timings.reset(token)
+
+def server_timing(timings):
+    """
+    Server-Timing header value for stage durations in seconds
+    """
+    return ', '.join(f"{stage};dur={1000 * seconds:.1f}" for stage, seconds in timings.items())
+
+
+@contextmanager
+def track_stage(stage):
+    """
+    Time a pipeline stage and count it as in flight while it runs
+    """
+    in_flight = STAGE_IN_FLIGHT.labels(stage=stage)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        in_flight.dec()
+        record_stage(stage, time.perf_counter() - started)
+
+def record_stage(stage, seconds):
+    """
+    Count a stage duration measured elsewhere, e.g. a wait that starts and ends on different threads
+    """
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+def record_error(stage, backend):
+    STAGE_ERRORS.labels(stage=stage, backend=backend).inc()
+
+def record_fallback(stage):
+    STAGE_FALLBACKS.labels(stage=stage).inc()
@@ -0,0 +1,116 @@
+from utils.stt import transcribe_audio, TRANSCRIPTION_FAILED
+from utils.sentiment import analyze_sentiment
+from utils.response import generate_response
+from utils.analyzers import get_emotion_analyzer
+from utils.lanes import NORMAL, PRIORITY, crisis_prescreen, run_in_lane
+from utils.metrics import track_stage, record_fallback
+from utils.tracing import log_error, span
+from tts.speak import synthesize_speech, ERROR_AUDIO_URL
+from tts.progressive import stream_speech
+
+# Pipeline stages in the order their results become available
+STAGES = ('transcript', 'sentiment', 'response', 'audio_url')
+
+def run_pipeline(audio, on_stage=None, sessions=None, session_id=None, stream_audio=False):
+    """
+    Run STT -> sentiment -> response generation -> TTS on uploaded audio.
+    A crisis pre-screen runs on the transcript, and flagged requests finish
+    the later stages on the reserved priority lane (see utils.lanes).
+
+    Args:
+        audio: Raw bytes or a file object (see utils.stt.transcribe_audio)
+        on_stage (callable): Called as on_stage(stage, result) as soon as each
+            stage finishes, so callers can stream partial results
+        sessions (SessionStore): With session_id, the response sees the
+            session's history and the turn is added to it
+        stream_audio (bool): Return the audio URL as soon as synthesis starts;
+            the reply is rendered sentence by sentence and streamed from it
+
+    Returns:
+        dict: The /analyze result (transcript, sentiment, response, audio_url)
+    """
+    result, lane = screen_audio(audio, on_stage)
+    return run_in_lane(lane, finish_pipeline, result, on_stage, sessions, session_id, stream_audio)
+
+def _finish_stage(result, on_stage, stage, value):
+    result[stage] = value
+    if on_stage is not None:
+        on_stage(stage, value)
+    return value
+
+def screen_audio(audio, on_stage=None):
+    """
+    The first half of run_pipeline: STT, then the crisis pre-screen
+
+    Returns:
+        tuple: The result so far (the transcript) and the lane the remaining
+            stages should run in; pass both on to finish_pipeline
+    """
+    result = {}
+
+    # STT
+    with track_stage('stt'), span('stt'):
+        transcript = _finish_stage(result, on_stage, 'transcript', transcribe_audio(audio))
+    if transcript == TRANSCRIPTION_FAILED:
+        record_fallback('stt')
+    
+    # Crisis pre-screen: decides the lane the remaining stages run in
+    with track_stage('prescreen'), span('prescreen') as prescreen:
+        lane = NORMAL
+        if transcript != TRANSCRIPTION_FAILED:
+            try:
+                if crisis_prescreen(transcript):
+                    lane = PRIORITY
+            except Exception as e:
+                # An unavailable analyzer must not hold up the reply
+                log_error("Error in crisis pre-screen", error=str(e))
+        prescreen.attributes['lane'] = lane
+    return result, lane
+
+def finish_pipeline(result, on_stage=None, sessions=None, session_id=None, stream_audio=False):
+    """
+    The second half of run_pipeline: sentiment, response and TTS for the
+    transcript screen_audio produced; completes and returns its result
+    """
+    transcript = result['transcript']
+
+    # Sentiment
+    with track_stage('sentiment'), span('sentiment'):
+        sentiment = _finish_stage(result, on_stage, 'sentiment', analyze_sentiment(transcript))
+
+    # Generate response
+    with track_stage('response'), span('response'):
+        if sessions is not None and session_id:
+            reply = _session_response(sessions, session_id, sentiment, transcript)
+        else:
+            reply = generate_response(sentiment, transcript)
+        _finish_stage(result, on_stage, 'response', reply)
+
+    # TTS
+    with track_stage('tts'), span('tts', streamed=stream_audio):
+        audio_url = _finish_stage(result, on_stage, 'audio_url',
+                                  stream_speech(reply) if stream_audio else synthesize_speech(reply))
+    if audio_url == ERROR_AUDIO_URL:
+        record_fallback('tts')
+    return result
+
+def _session_response(sessions, session_id, sentiment, transcript):
+    """
+    Respond with the session's history in view, then fold this turn into it
+    """
+    history = sessions.summary(session_id)
+    reply = generate_response(sentiment, transcript, history)
+    if transcript != TRANSCRIPTION_FAILED:
+        try:
+            with span('session.record', session_id=session_id):
+                analysis = get_emotion_analyzer().analyze_emotion(transcript)
+                sessions.record(session_id, transcript, analysis, reply)
+        except Exception as e:
+            log_error("Error updating session", session_id=session_id, error=str(e))
+    return reply
+
+def is_fallback_result(result):
+    """
+    True when a stage fell back to its error value (such results are not cached)
+    """
+    return result['transcript'] == TRANSCRIPTION_FAILED or result['audio_url'] == ERROR_AUDIO_URL
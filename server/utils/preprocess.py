@@ -0,0 +1,103 @@
+import numpy as np
+from utils.segmenter import FRAME_SECONDS, frame_energy
+
+# Recognizers are trained on 16 kHz speech; more bandwidth only costs upload time
+TARGET_SAMPLE_RATE = 16000
+
+def pcm_to_float(raw, sample_width, channels=1):
+    """
+    Interleaved little-endian PCM bytes -> mono float32 samples in [-1, 1]
+
+    Channels are downmixed by averaging. 8-bit PCM is unsigned, wider
+    widths are signed (the WAV conventions).
+    """
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 3:
+        # Sign-extend 24-bit samples into the top of 32-bit integers
+        triples = np.frombuffer(raw[:len(raw) // 3 * 3], dtype=np.uint8).reshape(-1, 3)
+        widened = np.zeros((len(triples), 4), dtype=np.uint8)
+        widened[:, 1:] = triples
+        samples = widened.view('<i4').ravel().astype(np.float32) / 2 ** 31
+    elif sample_width in (2, 4):
+        dtype = '<i2' if sample_width == 2 else '<i4'
+        usable = len(raw) // sample_width * sample_width
+        samples = np.frombuffer(raw[:usable], dtype=dtype).astype(np.float32) / 2 ** (8 * sample_width - 1)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return samples
+
+def float_to_pcm16(samples):
+    """
+    Float samples in [-1, 1] -> 16-bit little-endian PCM bytes
+    """
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+def lowpass_kernel(cutoff, taps=63):
+    """
+    Hamming-windowed sinc low-pass filter; cutoff is a fraction of the sample rate
+    """
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return kernel / kernel.sum()
+
+def resample(samples, sample_rate, target_rate=TARGET_SAMPLE_RATE):
+    """
+    Resample by linear interpolation, low-pass filtering first when downsampling
+    """
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+    if target_rate < sample_rate:
+        # Remove content above the new Nyquist frequency so it does not alias
+        samples = np.convolve(samples, lowpass_kernel(0.5 * target_rate / sample_rate), mode='same')
+    count = int(round(len(samples) * target_rate / sample_rate))
+    positions = np.arange(count) * (sample_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def trim_silence(samples, sample_rate, silence_ratio=0.1, pad_seconds=0.1):
+    """
+    Drop leading and trailing frames quieter than silence_ratio times the loud
+    (95th percentile) frame energy, keeping pad_seconds of margin
+    """
+    if len(samples) == 0:
+        return samples
+    frame_length = max(1, int(sample_rate * FRAME_SECONDS))
+    energy = frame_energy(samples, frame_length)
+    loud = np.percentile(energy, 95)
+    if loud == 0:
+        return samples[:0]
+    voiced = np.flatnonzero(energy >= loud * silence_ratio)
+    pad = int(pad_seconds * sample_rate)
+    start = max(0, voiced[0] * frame_length - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame_length + pad)
+    return samples[start:end]
+
+def peak_normalize(samples, peak=0.9):
+    """
+    Scale so the loudest sample reaches peak (silence is left alone)
+    """
+    loudest = np.abs(samples).max() if len(samples) else 0
+    if loudest == 0:
+        return samples
+    return samples * (peak / loudest)
+
+def preprocess(samples, sample_rate, target_rate=TARGET_SAMPLE_RATE, silence_ratio=0.1, pad_seconds=0.1, peak=0.9):
+    """
+    Mono float samples -> 16 kHz, silence-trimmed, peak-normalized 16-bit PCM
+
+    Returns:
+        tuple: (pcm bytes, sample rate, stats dict with the durations before and after)
+    """
+    original_seconds = len(samples) / sample_rate if sample_rate else 0.0
+    samples = resample(samples, sample_rate, target_rate)
+    samples = trim_silence(samples, target_rate, silence_ratio, pad_seconds)
+    samples = peak_normalize(samples, peak)
+    processed_seconds = len(samples) / target_rate
+    return float_to_pcm16(samples), target_rate, {
+        'original_seconds': round(original_seconds, 3),
+        'processed_seconds': round(processed_seconds, 3),
+        'saved_seconds': round(original_seconds - processed_seconds, 3)
+    }
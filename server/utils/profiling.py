@@ -0,0 +1,98 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import re
+import threading
+
+# Names of stored profiles: <request id>.prof
+PROFILE_FILENAME = re.compile(r'[0-9a-f]{32}\.prof')
+
+
+class RequestProfiler:
+    """
+    Deterministic (cProfile) profiling of selected requests.
+
+    A request is profiled when it asks for it with the X-Profile header (and
+    the token, if one is configured) or is picked by the sample rate. Only one
+    request is profiled at a time, since Python allows a single active
+    profiler per process on newer versions; other requests run unprofiled.
+
+    cProfile follows the request thread, so work handed to helper threads (the
+    TTS worker, chunked recognition) shows up as time spent waiting on them.
+    """
+
+    def __init__(self, directory, sample_rate=0.0, allow_header=True, token=None, max_files=100):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.allow_header = allow_header
+        self.token = token
+        self.max_files = max_files
+        self._busy = threading.Lock()
+
+    def wanted(self, header_value):
+        """
+        Whether a request with this X-Profile header value should be profiled
+        """
+        if header_value and self.allow_header:
+            if self.token is None:
+                return header_value == '1'
+            return header_value == self.token
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self):
+        """
+        Begin profiling the calling thread; None if another request holds the profiler
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool is active
+            self._busy.release()
+            return None
+        return profiler
+
+    def finish(self, profiler, request_id):
+        """
+        Stop profiling and store the profile; returns its filename
+        """
+        try:
+            profiler.disable()
+        finally:
+            self.release()
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{request_id}.prof"
+        profiler.dump_stats(os.path.join(self.directory, filename))
+        self._prune()
+        return filename
+
+    def release(self):
+        """
+        Free the profiler for the next request (finish does this itself)
+        """
+        self._busy.release()
+
+    def summary(self, filename, limit=40):
+        """
+        pstats text report of a stored profile, by cumulative time
+        """
+        output = io.StringIO()
+        stats = pstats.Stats(os.path.join(self.directory, filename), stream=output)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+    def _prune(self):
+        # Keep the newest max_files profiles
+        entries = [entry for entry in os.scandir(self.directory) if PROFILE_FILENAME.fullmatch(entry.name)]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
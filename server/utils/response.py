@@ -1,2 +1,7 @@
-def generate_response(sentiment, transcript):
-    return "I'm sorry to hear that. Would you like to talk more about it?"
\ No newline at end of file
+def generate_response(sentiment, transcript, history=None):
+    """
+    Reply to a transcript; history is the session summary before this turn (None without a session)
+    """
+    if history and history['turns'] and sentiment['compound'] - history['sentiment_trend'] > 0.3:
+        return "It sounds like things feel a little lighter than earlier. Would you like to talk more about it?"
+    return "I'm sorry to hear that. Would you like to talk more about it?"
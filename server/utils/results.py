@@ -0,0 +1,264 @@
+from array import array
+from collections.abc import Mapping
+from json import dumps
+from json.encoder import encode_basestring_ascii as _quote
+
+# Fixed order of the scores in EmotionAnalysis.emotions (the lexicon's order)
+EMOTIONS = (
+    'joy', 'sadness', 'anger', 'fear', 'surprise', 'disgust',
+    'trust', 'anticipation', 'love', 'confusion', 'excitement', 'worry'
+)
+
+_EMOTION_INDEX = {emotion: index for index, emotion in enumerate(EMOTIONS)}
+
+# Quoted keys of the emotion object, shared by every to_json call
+_EMOTION_KEYS = tuple(_quote(emotion) + ':' for emotion in EMOTIONS)
+
+
+def _score(value):
+    """
+    Emotion scores are counts adjusted by modifier steps; whole ones are
+    reported as ints, as the keyword counts always were
+    """
+    return int(value) if value.is_integer() else value
+
+
+class _ScoreText(dict):
+    """
+    JSON text by score value. Scores take few distinct values (counts and
+    half steps), so their text is formatted once and then looked up.
+    """
+    MAX_ENTRIES = 4096
+
+    def __missing__(self, value):
+        text = repr(_score(value))
+        if len(self) < self.MAX_ENTRIES:
+            self[value] = text
+        return text
+
+
+_score_text = _ScoreText()
+
+
+def _object(pairs):
+    return '{' + ','.join(_quote(key) + ':' + repr(value) for key, value in pairs) + '}'
+
+
+class EmotionAnalysis(Mapping):
+    """
+    One analyze_emotion result, held in slots instead of nested dicts.
+
+    The twelve emotion scores live in a float array in EMOTIONS order, the
+    other stage outputs in flat fields. Reading it like the old result dict
+    (analysis['emotions']['joy']) builds that dict once, on first access;
+    to_json encodes straight from the fields without building it at all.
+    """
+
+    __slots__ = (
+        'neg', 'neu', 'pos', 'compound',
+        'emotions',
+        'crisis_level', 'crisis_indicators', 'needs_immediate_attention', 'risk_category',
+        'topics', 'primary_topic', 'topic_emotion_relationship', 'stress_level', 'support_needed',
+        'patterns',
+        'primary_emotion', 'intensity', 'support_strategy', 'emotional_complexity', 'emotional_state',
+        'confidence', 'vader_confidence', 'emotion_confidence', 'pattern_confidence',
+        '_dict'
+    )
+
+    # Constructor arguments, in order (every slot but the cached dict)
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, neg, neu, pos, compound, emotions,
+                 crisis_level, crisis_indicators, needs_immediate_attention, risk_category,
+                 topics, primary_topic, topic_emotion_relationship, stress_level, support_needed,
+                 patterns,
+                 primary_emotion, intensity, support_strategy, emotional_complexity, emotional_state,
+                 confidence, vader_confidence, emotion_confidence, pattern_confidence):
+        self.neg = neg
+        self.neu = neu
+        self.pos = pos
+        self.compound = compound
+        self.emotions = emotions
+        self.crisis_level = crisis_level
+        self.crisis_indicators = crisis_indicators
+        self.needs_immediate_attention = needs_immediate_attention
+        self.risk_category = risk_category
+        self.topics = topics
+        self.primary_topic = primary_topic
+        self.topic_emotion_relationship = topic_emotion_relationship
+        self.stress_level = stress_level
+        self.support_needed = support_needed
+        self.patterns = patterns
+        self.primary_emotion = primary_emotion
+        self.intensity = intensity
+        self.support_strategy = support_strategy
+        self.emotional_complexity = emotional_complexity
+        self.emotional_state = emotional_state
+        self.confidence = confidence
+        self.vader_confidence = vader_confidence
+        self.emotion_confidence = emotion_confidence
+        self.pattern_confidence = pattern_confidence
+        self._dict = None
+
+    @classmethod
+    def from_stages(cls, vader_scores, emotion_scores, crisis_level, context_info,
+                    linguistic_patterns, overall_analysis, confidence):
+        """
+        Build the result from the analyzer's per-stage dicts
+        """
+        emotional_context = context_info['emotional_context']
+        return cls(
+            vader_scores['neg'], vader_scores['neu'], vader_scores['pos'], vader_scores['compound'],
+            array('d', [emotion_scores[emotion] for emotion in EMOTIONS]),
+            crisis_level['level'], crisis_level['indicators'],
+            crisis_level['needs_immediate_attention'], crisis_level['risk_category'],
+            tuple(context_info['topics'].items()), context_info['primary_topic'],
+            emotional_context['topic_emotion_relationship'], emotional_context['stress_level'],
+            emotional_context['support_needed'],
+            linguistic_patterns,
+            overall_analysis['primary_emotion'], overall_analysis['intensity'],
+            overall_analysis['support_strategy'], overall_analysis['emotional_complexity'],
+            overall_analysis['emotional_state'],
+            confidence['overall'], confidence['vader'],
+            confidence['emotion_detection'], confidence['linguistic_patterns']
+        )
+
+    @classmethod
+    def empty(cls):
+        """
+        The result for empty or blank input (no emotion scores at all)
+        """
+        return cls(0, 1, 0, 0, None, 0, [], False, 'none', (), 'general', None, None, None, {},
+                   'neutral', 'low', 'exploration', 'simple', 'neutral emotional state', 0, 0, 0, 0)
+
+    @property
+    def is_empty(self):
+        return self.emotions is None
+
+    def emotion(self, name):
+        """
+        One emotion's score (0 when the input was empty)
+        """
+        return 0 if self.emotions is None else _score(self.emotions[_EMOTION_INDEX[name]])
+
+    def emotion_items(self):
+        """
+        (emotion, score) pairs in EMOTIONS order; none for an empty result
+        """
+        if self.emotions is None:
+            return ()
+        return zip(EMOTIONS, map(_score, self.emotions))
+
+    def to_dict(self):
+        """
+        The result in the original nested-dict layout, built on first use and
+        then kept; treat it as read-only
+        """
+        if self._dict is None:
+            self._dict = self._build_dict()
+        return self._dict
+
+    def _build_dict(self):
+        if self.emotions is None:
+            # The layout empty input has always had: no scores, no emotional context
+            basic_sentiment = {'pos': self.pos, 'neg': self.neg, 'neu': self.neu, 'compound': self.compound}
+            emotional_context = {}
+        else:
+            basic_sentiment = {'neg': self.neg, 'neu': self.neu, 'pos': self.pos, 'compound': self.compound}
+            emotional_context = {
+                'topic_emotion_relationship': self.topic_emotion_relationship,
+                'stress_level': self.stress_level,
+                'support_needed': self.support_needed
+            }
+        return {
+            'basic_sentiment': basic_sentiment,
+            'emotions': dict(self.emotion_items()),
+            'crisis_level': {
+                'level': self.crisis_level,
+                'indicators': list(self.crisis_indicators),
+                'needs_immediate_attention': self.needs_immediate_attention,
+                'risk_category': self.risk_category
+            },
+            'context': {
+                'topics': dict(self.topics),
+                'primary_topic': self.primary_topic,
+                'emotional_context': emotional_context
+            },
+            'linguistic_patterns': dict(self.patterns),
+            'overall_analysis': {
+                'primary_emotion': self.primary_emotion,
+                'intensity': self.intensity,
+                'support_strategy': self.support_strategy,
+                'emotional_complexity': self.emotional_complexity,
+                'emotional_state': self.emotional_state
+            },
+            'confidence': {
+                'overall': self.confidence,
+                'vader': self.vader_confidence,
+                'emotion_detection': self.emotion_confidence,
+                'linguistic_patterns': self.pattern_confidence
+            }
+        }
+
+    def to_json(self):
+        """
+        Compact JSON of to_dict(), encoded directly from the fields: the same
+        text as json.dumps(self.to_dict(), separators=(',', ':'))
+        """
+        if self.emotions is None:
+            return dumps(self._build_dict(), separators=(',', ':'))
+        return ''.join((
+            '{"basic_sentiment":{"neg":', repr(self.neg),
+            ',"neu":', repr(self.neu),
+            ',"pos":', repr(self.pos),
+            ',"compound":', repr(self.compound),
+            '},"emotions":{', ','.join(map(str.__add__, _EMOTION_KEYS, map(_score_text.__getitem__, self.emotions))),
+            '},"crisis_level":{"level":', repr(self.crisis_level),
+            ',"indicators":[', ','.join(map(_quote, self.crisis_indicators)),
+            '],"needs_immediate_attention":', 'true' if self.needs_immediate_attention else 'false',
+            ',"risk_category":', _quote(self.risk_category),
+            '},"context":{"topics":', _object(self.topics),
+            ',"primary_topic":', _quote(self.primary_topic),
+            ',"emotional_context":{"topic_emotion_relationship":', _quote(self.topic_emotion_relationship),
+            ',"stress_level":', _quote(self.stress_level),
+            ',"support_needed":', _quote(self.support_needed),
+            '}},"linguistic_patterns":', _object(self.patterns.items()),
+            ',"overall_analysis":{"primary_emotion":', _quote(self.primary_emotion),
+            ',"intensity":', _quote(self.intensity),
+            ',"support_strategy":', _quote(self.support_strategy),
+            ',"emotional_complexity":', _quote(self.emotional_complexity),
+            ',"emotional_state":', _quote(self.emotional_state),
+            '},"confidence":{"overall":', repr(self.confidence),
+            ',"vader":', repr(self.vader_confidence),
+            ',"emotion_detection":', repr(self.emotion_confidence),
+            ',"linguistic_patterns":', repr(self.pattern_confidence),
+            '}}'
+        ))
+
+    # Mapping interface: read like the original result dict
+
+    def __getitem__(self, key):
+        return self.to_dict()[key]
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self):
+        return len(self.to_dict())
+
+    def __eq__(self, other):
+        if isinstance(other, EmotionAnalysis):
+            return self._fields() == other._fields()
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def _fields(self):
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __reduce__(self):
+        # Pickled (e.g. back from a batch worker) as the fields alone, without the cached dict
+        return (EmotionAnalysis, self._fields())
+
+    def __repr__(self):
+        return f"EmotionAnalysis(primary_emotion={self.primary_emotion!r}, compound={self.compound!r}, crisis_level={self.crisis_level!r})"
@@ -0,0 +1,80 @@
+import numpy as np
+import speech_recognition as sr
+
+# Analysis frame for the energy detector
+FRAME_SECONDS = 0.03
+
+def frame_energy(samples, frame_length):
+    """
+    RMS energy of consecutive, non-overlapping frames (the tail is zero-padded)
+    """
+    frame_count = -(-len(samples) // frame_length)
+    padded = np.zeros(frame_count * frame_length, dtype=np.float64)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(frame_count, frame_length)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+def find_cut_points(energy, min_silence_frames, threshold):
+    """
+    Frame indexes at the middle of every pause of at least min_silence_frames
+    """
+    silent = energy < threshold
+    # Run boundaries of the silent mask: +1 where a pause starts, -1 after it ends
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    long_pauses = (ends - starts) >= min_silence_frames
+    return ((starts[long_pauses] + ends[long_pauses]) // 2).tolist()
+
+def split_on_silence(audio, max_chunk_seconds=15.0, min_silence_seconds=0.3, silence_ratio=0.1):
+    """
+    Split sr.AudioData at pauses into chunks of at most max_chunk_seconds
+
+    Frames whose RMS energy is below silence_ratio times the loud (95th
+    percentile) frame energy count as silence. The recording is cut in the
+    middle of every pause of at least min_silence_seconds, neighbouring pieces
+    are merged back while they fit in max_chunk_seconds, and stretches with no
+    pause are hard-split at the limit. Chunks with no voiced frame are dropped.
+
+    Returns:
+        list: (start_seconds, end_seconds, sr.AudioData) tuples in time order
+    """
+    raw = audio.get_raw_data(convert_width=2)
+    samples = np.frombuffer(raw, dtype='<i2')
+    if len(samples) == 0:
+        return []
+
+    rate = audio.sample_rate
+    frame_length = max(1, int(rate * FRAME_SECONDS))
+    energy = frame_energy(samples, frame_length)
+    loud = np.percentile(energy, 95)
+    if loud == 0:
+        return []
+    threshold = loud * silence_ratio
+    max_frames = max(1, int(max_chunk_seconds / FRAME_SECONDS))
+    min_silence_frames = max(1, int(min_silence_seconds / FRAME_SECONDS))
+
+    # Pieces between pause midpoints, merged greedily up to the chunk limit
+    boundaries = [0] + find_cut_points(energy, min_silence_frames, threshold) + [len(energy)]
+    chunks = []
+    chunk_start = 0
+    for previous, boundary in zip(boundaries, boundaries[1:]):
+        if boundary - chunk_start > max_frames and previous > chunk_start:
+            chunks.append((chunk_start, previous))
+            chunk_start = previous
+        while boundary - chunk_start > max_frames:
+            chunks.append((chunk_start, chunk_start + max_frames))
+            chunk_start += max_frames
+    if chunk_start < len(energy):
+        chunks.append((chunk_start, len(energy)))
+
+    voiced = energy >= threshold
+    segments = []
+    for first_frame, end_frame in chunks:
+        if not voiced[first_frame:end_frame].any():
+            continue
+        first_sample = first_frame * frame_length
+        end_sample = min(end_frame * frame_length, len(samples))
+        chunk_audio = sr.AudioData(samples[first_sample:end_sample].tobytes(), rate, 2)
+        segments.append((first_sample / rate, end_sample / rate, chunk_audio))
+    return segments
@@ -1,4 +1,6 @@
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from utils.analyzers import get_vader
+from utils.metrics import record_error, record_fallback
+from utils.tracing import log_error
 
 def analyze_sentiment(text):
     """
@@ -6,8 +8,8 @@ def analyze_sentiment(text):
     Returns a dictionary with sentiment scores
     """
     try:
-        # Initialize VADER sentiment analyzer
-        analyzer = SentimentIntensityAnalyzer()
+        # Shared VADER analyzer (loaded once per process)
+        analyzer = get_vader()
         
         # Get sentiment scores for the actual text
         sentiment_scores = analyzer.polarity_scores(text)
@@ -31,7 +33,9 @@ def analyze_sentiment(text):
         }
         
     except Exception as e:
-        print(f"Error in sentiment analysis: {e}")
+        log_error("Error in sentiment analysis", error=str(e))
+        record_error('sentiment', 'vader')
+        record_fallback('sentiment')
         # Return neutral as fallback
         return {
             'sentiment': 'neutral',
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class ConversationSession:
+    """
+    Rolling state of one client conversation.
+
+    Only the last max_turns turns are kept. The trends (emotion and sentiment
+    EWMAs, crisis maximum, topic counts) are folded in once per turn, so a
+    summary never revisits earlier turns.
+    """
+
+    def __init__(self, session_id, max_turns=20, alpha=0.3, clock=time.time):
+        self.session_id = session_id
+        self.alpha = alpha
+        self.turns = deque(maxlen=max_turns)
+        self.turn_count = 0
+        self.started_at = clock()
+        self.last_seen = self.started_at
+        self.emotion_trend = {}
+        self.sentiment_trend = 0.0
+        self.crisis_max = 0.0
+        self.crisis_turns = 0
+        self.topic_counts = {}
+
+    def _ewma(self, previous, value):
+        if self.turn_count == 0:
+            return value
+        return self.alpha * value + (1 - self.alpha) * previous
+
+    def record(self, transcript, analysis, response, now):
+        """
+        Fold one analyze_emotion result into the trends and keep the turn
+        """
+        # Read straight from the EmotionAnalysis fields, not its dict view
+        emotions = dict(analysis.emotion_items())
+        for emotion in emotions.keys() | self.emotion_trend.keys():
+            self.emotion_trend[emotion] = self._ewma(self.emotion_trend.get(emotion, 0.0), emotions.get(emotion, 0))
+        compound = analysis.compound
+        self.sentiment_trend = self._ewma(self.sentiment_trend, compound)
+
+        self.crisis_max = max(self.crisis_max, analysis.crisis_level)
+        if analysis.needs_immediate_attention:
+            self.crisis_turns += 1
+
+        topic = analysis.primary_topic
+        self.topic_counts[topic] = self.topic_counts.get(topic, 0) + 1
+
+        self.turns.append({
+            'at': now,
+            'transcript': transcript,
+            'compound': compound,
+            'primary_emotion': analysis.primary_emotion,
+            'crisis_level': analysis.crisis_level,
+            'primary_topic': topic,
+            'response': response
+        })
+        self.turn_count += 1
+        self.last_seen = now
+
+    def summary(self):
+        """
+        Trends and recent turns for the summary endpoint and generate_response
+        """
+        dominant = max(self.emotion_trend, key=self.emotion_trend.get) if any(self.emotion_trend.values()) else 'neutral'
+        return {
+            'session_id': self.session_id,
+            'turns': self.turn_count,
+            'started_at': self.started_at,
+            'last_seen': self.last_seen,
+            'emotion_trend': {emotion: round(score, 4) for emotion, score in self.emotion_trend.items()},
+            'dominant_emotion': dominant,
+            'sentiment_trend': round(self.sentiment_trend, 4),
+            'crisis': {'max_level': self.crisis_max, 'turns_needing_attention': self.crisis_turns},
+            'topic_counts': dict(self.topic_counts),
+            'recent_turns': list(self.turns)
+        }
+
+
+class SessionStore:
+    """
+    Sessions keyed by client session id, bounded by count and idle time.
+
+    Sessions are kept in least-recently-used order, so idle ones are always at
+    the front and are dropped there as new requests arrive.
+    """
+
+    def __init__(self, max_sessions=1000, max_turns=20, idle_seconds=1800, alpha=0.3, clock=time.time):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.idle_seconds = idle_seconds
+        self.alpha = alpha
+        self._clock = clock
+        self._sessions = OrderedDict()  # session id -> ConversationSession
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, session_id):
+        """
+        Return the live session, or None if it is unknown or has gone idle
+        """
+        with self._lock:
+            self._evict_idle(self._clock())
+            return self._sessions.get(session_id)
+
+    def summary(self, session_id):
+        """
+        Summary of a live session, or None
+        """
+        with self._lock:
+            self._evict_idle(self._clock())
+            session = self._sessions.get(session_id)
+            return session.summary() if session is not None else None
+
+    def record(self, session_id, transcript, analysis, response):
+        """
+        Add a turn, creating the session on its first turn
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = ConversationSession(session_id, self.max_turns, self.alpha, clock=self._clock)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+            session.record(transcript, analysis, response, now)
+            self._sessions.move_to_end(session_id)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict_idle(self, now):
+        # Caller holds the lock
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_seen <= self.idle_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,228 @@
+import numpy as np
+import speech_recognition as sr
+import config
+from utils.enhanced_sentiment import TextScan
+from utils.lexicon import Token, TokenizedText, tokenize
+from utils.segmenter import FRAME_SECONDS, frame_energy, find_cut_points
+from utils.sentiment import analyze_sentiment
+from utils.stt import _recognize_with_retry
+from utils.tracing import log_error
+
+
+class IncrementalAnalysis:
+    """
+    Lexicon analysis of a transcript that grows one fragment at a time.
+
+    Each new fragment is tokenized on its own and matched together with the
+    last few words already seen (enough for a phrase to straddle the join), so
+    the text is never rescanned from the start. Emotion, crisis and context
+    results are then rebuilt from the accumulated hits and equal a full
+    analysis of the joined transcript.
+
+    VADER has no incremental form, so the running sentiment is the word-count
+    weighted average of the per-fragment scores.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.doc = TokenizedText.from_tokens('', '', [])
+        self.hits = []
+        self.matches = {}
+        self._sentiment_sums = {'compound': 0.0, 'positive': 0.0, 'negative': 0.0, 'neutral': 0.0}
+        self._sentiment_words = 0
+
+    @property
+    def transcript(self):
+        return self.doc.text
+
+    def extend(self, fragment):
+        """
+        Append a transcript fragment and return the lexicon hits it added
+        """
+        fragment_doc = tokenize(fragment)
+        if not fragment_doc.tokens:
+            return []
+
+        doc = self.doc
+        offset = len(doc.lower) + 1 if doc.text else 0
+        overlap = min(len(doc.tokens), self.analyzer.matcher.max_phrase_words - 1)
+        window_start = len(doc.tokens) - overlap
+
+        new_tokens = [Token(token.text, token.start + offset, token.end + offset) for token in fragment_doc.tokens]
+        doc.text = f"{doc.text} {fragment}" if doc.text else fragment
+        doc.lower = f"{doc.lower} {fragment_doc.lower}" if offset else fragment_doc.lower
+        doc.tokens.extend(new_tokens)
+        doc.words.extend(fragment_doc.words)
+
+        # Hits ending inside the overlap were already found by an earlier call
+        window = TokenizedText.from_tokens(doc.text, doc.lower, doc.tokens[window_start:])
+        new_hits = [
+            hit._replace(first=hit.first + window_start, last=hit.last + window_start)
+            for hit in self.analyzer.matcher.find(window)
+            if hit.last > overlap
+        ]
+        self.hits.extend(new_hits)
+        self.hits.sort(key=lambda hit: (hit.first, hit.last))
+        for hit in new_hits:
+            phrases = self.matches.setdefault(hit.category, {}).setdefault(hit.label, [])
+            if hit.phrase not in phrases:
+                phrases.append(hit.phrase)
+
+        scores = analyze_sentiment(fragment)
+        words = len(fragment_doc.words)
+        for field in self._sentiment_sums:
+            self._sentiment_sums[field] += scores[field] * words
+        self._sentiment_words += words
+        return new_hits
+
+    def sentiment(self):
+        """
+        Running sentiment in the analyze_sentiment format
+        """
+        words = self._sentiment_words or 1
+        scores = {field: round(total / words, 4) for field, total in self._sentiment_sums.items()}
+        if scores['compound'] >= 0.05:
+            label = 'positive'
+        elif scores['compound'] <= -0.05:
+            label = 'negative'
+        else:
+            label = 'neutral'
+        return {'sentiment': label, **scores}
+
+    def snapshot(self):
+        """
+        Current sentiment, emotion, crisis and context results for the transcript so far
+        """
+        scan = TextScan(self.doc, self.hits, self.matches)
+        text = self.doc.text
+        emotions = self.analyzer._detect_emotions(text, scan)
+        return {
+            'sentiment': self.sentiment(),
+            'emotions': emotions,
+            'primary_emotion': max(emotions, key=emotions.get) if any(emotions.values()) else 'neutral',
+            'crisis': self.analyzer._detect_crisis(text, scan),
+            'context': self.analyzer._analyze_context(text, scan)
+        }
+
+
+class StreamingTranscriber:
+    """
+    Recognize a live stream of 16-bit mono PCM in rolling windows.
+
+    Audio is buffered until it holds window_seconds, then everything up to the
+    last pause in the buffer is recognized and dropped; the tail may still be
+    mid-word and waits for more audio. A buffer with no pause is recognized
+    whole once it reaches max_window_seconds.
+    """
+
+    def __init__(self, recognize, sample_rate=16000, window_seconds=None, max_window_seconds=None,
+                 min_silence_seconds=None, silence_ratio=0.1, retries=None):
+        self.recognize = recognize
+        self.sample_rate = sample_rate
+        self.window_seconds = window_seconds or config.STREAM_WINDOW_SECONDS
+        self.max_window_seconds = max(max_window_seconds or config.STREAM_MAX_WINDOW_SECONDS, self.window_seconds)
+        self.min_silence_seconds = min_silence_seconds or config.STT_MIN_SILENCE_SECONDS
+        self.silence_ratio = silence_ratio
+        self.retries = config.STT_CHUNK_RETRIES if retries is None else retries
+        self._buffer = bytearray()
+        self._buffer_start = 0.0  # stream time of the first buffered sample
+
+    def buffered_seconds(self):
+        return len(self._buffer) / 2 / self.sample_rate
+
+    def feed(self, pcm):
+        """
+        Add audio and return the segments recognized from it so far (often none)
+        """
+        self._buffer.extend(pcm)
+        if self.buffered_seconds() < self.window_seconds:
+            return []
+
+        samples = np.frombuffer(bytes(self._buffer[:len(self._buffer) // 2 * 2]), dtype='<i2')
+        cut = self._last_pause(samples)
+        if cut is None:
+            if self.buffered_seconds() < self.max_window_seconds:
+                return []
+            cut = len(samples)
+        return self._commit(samples[:cut])
+
+    def flush(self):
+        """
+        Recognize whatever is still buffered at the end of the stream
+        """
+        samples = np.frombuffer(bytes(self._buffer[:len(self._buffer) // 2 * 2]), dtype='<i2')
+        return self._commit(samples)
+
+    def _last_pause(self, samples):
+        """
+        Sample index of the middle of the last pause in the buffer, or None
+        """
+        frame_length = max(1, int(self.sample_rate * FRAME_SECONDS))
+        energy = frame_energy(samples, frame_length)
+        loud = np.percentile(energy, 95)
+        if loud == 0:
+            # Nothing but silence so far: drop it
+            return len(samples)
+        min_silence_frames = max(1, int(self.min_silence_seconds / FRAME_SECONDS))
+        cuts = find_cut_points(energy, min_silence_frames, loud * self.silence_ratio)
+        # A pause running into the end of the buffer may be the start of a longer one
+        cuts = [cut for cut in cuts if 0 < cut < len(energy) - min_silence_frames]
+        if not cuts:
+            return None
+        return cuts[-1] * frame_length
+
+    def _commit(self, samples):
+        start = self._buffer_start
+        end = start + len(samples) / self.sample_rate
+        del self._buffer[:len(samples) * 2]
+        self._buffer_start = end
+        if len(samples) == 0 or not samples.any():
+            return []
+
+        audio = sr.AudioData(samples.tobytes(), self.sample_rate, 2)
+        text, error = _recognize_with_retry(self.recognize, audio, self.retries)
+        if error:
+            log_error("Error in speech recognition", start=round(start, 3), end=round(end, 3), error=error)
+        return [{'start': round(start, 3), 'end': round(end, 3), 'text': text, 'error': error}]
+
+
+class StreamSession:
+    """
+    One /stream connection: PCM in, partial transcript and analysis updates out
+    """
+
+    def __init__(self, recognize, analyzer, sample_rate=16000, **transcriber_options):
+        self.transcriber = StreamingTranscriber(recognize, sample_rate=sample_rate, **transcriber_options)
+        self.analysis = IncrementalAnalysis(analyzer)
+        self._alerted = set()
+        self._alert_sent = False
+
+    def feed(self, pcm):
+        """
+        Process an audio frame; returns the partial updates it produced
+        """
+        return [self._update(segment) for segment in self.transcriber.feed(pcm)]
+
+    def finish(self):
+        """
+        Flush the stream; returns the remaining partial updates
+        """
+        return [self._update(segment) for segment in self.transcriber.flush()]
+
+    def _update(self, segment):
+        if segment['text']:
+            self.analysis.extend(segment['text'])
+        update = {
+            'type': 'partial',
+            'segment': segment,
+            'transcript': self.analysis.transcript,
+            **self.analysis.snapshot()
+        }
+        # Alert when the stream first needs attention and again for each new crisis indicator
+        crisis = update['crisis']
+        new_indicators = [phrase for phrase in crisis['indicators'] if phrase not in self._alerted]
+        update['alert'] = crisis['needs_immediate_attention'] and (not self._alert_sent or bool(new_indicators))
+        if update['alert']:
+            self._alert_sent = True
+            self._alerted.update(crisis['indicators'])
+        return update
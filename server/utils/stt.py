@@ -1,32 +1,275 @@
 import speech_recognition as sr
-import tempfile
+import io
 import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+import config
+from utils.metrics import AUDIO_SECONDS, record_error
+from utils.preprocess import pcm_to_float, preprocess
+from utils.segmenter import split_on_silence
+from utils.tracing import log_error, run_in_context, span
+from utils.stt_backends import get_stt_backend
+
+# Transcript returned when recognition fails
+TRANSCRIPTION_FAILED = "Could not transcribe audio"
+
+def open_audio_stream(audio):
+    """
+    Return a seekable stream over the uploaded audio without copying it to disk
+
+    Accepts raw bytes, a Flask/Werkzeug FileStorage or any file object. Upload
+    streams are already spooled in memory by the app (see UPLOAD_SPOOL_MAX_BYTES)
+    and are used as-is; non-seekable streams are copied into a spooled buffer.
+    """
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return io.BytesIO(audio)
+    
+    stream = getattr(audio, 'stream', audio)
+    if stream.seekable():
+        stream.seek(0)
+        return stream
+    
+    spool = tempfile.SpooledTemporaryFile(max_size=config.UPLOAD_SPOOL_MAX_BYTES)
+    shutil.copyfileobj(stream, spool)
+    spool.seek(0)
+    return spool
+
+def load_audio_data(recognizer, stream):
+    """
+    Decode an audio stream into sr.AudioData
+    """
+    header = stream.read(4)
+    stream.seek(0)
+    if header == b'RIFF':
+        # WAV (what the browser recorder sends) is decoded straight from memory
+        with sr.AudioFile(stream) as source:
+            return recognizer.record(source)
+    
+    # sr.AudioFile only falls back from WAV to AIFF/FLAC reliably when given a
+    # path, so those formats go through a temporary file that is always removed
+    temp_file = tempfile.NamedTemporaryFile(delete=False)
+    try:
+        with temp_file:
+            shutil.copyfileobj(stream, temp_file)
+        with sr.AudioFile(temp_file.name) as source:
+            return recognizer.record(source)
+    finally:
+        os.unlink(temp_file.name)
+
+def _parse_wav_bytes(data):
+    """
+    (raw PCM, sample width, channels, sample rate) from WAV bytes written to a
+    pipe, whose size fields are placeholders, so the data runs to the end
+    """
+    position = 12
+    fmt = None
+    while position + 8 <= len(data):
+        chunk_id, size = struct.unpack('<4sI', data[position:position + 8])
+        if chunk_id == b'fmt ':
+            _, channels, rate, _, _, bits = struct.unpack('<HHIIHH', data[position + 8:position + 24])
+            fmt = (bits // 8, channels, rate)
+        elif chunk_id == b'data' and fmt is not None:
+            return (data[position + 8:],) + fmt
+        position += 8 + size + (size & 1)
+    raise ValueError("ffmpeg produced no audio")
+
+def decode_with_ffmpeg(stream):
+    """
+    Decode formats sr.AudioFile cannot read (MP3, M4A, WebM, Ogg...) with ffmpeg
+
+    The input goes through a temporary file because MP4 containers may keep
+    their index at the end, which ffmpeg cannot reach on a pipe.
+    """
+    if shutil.which(config.FFMPEG_BINARY) is None:
+        raise RuntimeError(f"{config.FFMPEG_BINARY} is required to decode this audio format")
+    temp_file = tempfile.NamedTemporaryFile(delete=False)
+    try:
+        with temp_file:
+            shutil.copyfileobj(stream, temp_file)
+        result = subprocess.run(
+            [config.FFMPEG_BINARY, '-nostdin', '-hide_banner', '-loglevel', 'error',
+             '-i', temp_file.name, '-f', 'wav', '-acodec', 'pcm_s16le', 'pipe:1'],
+            capture_output=True, timeout=config.FFMPEG_TIMEOUT_SECONDS
+        )
+    finally:
+        os.unlink(temp_file.name)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+    return _parse_wav_bytes(result.stdout)
+
+def decode_audio(stream):
+    """
+    Decode an audio stream to mono float samples
+
+    WAV is read straight from memory with every channel kept, AIFF/FLAC go
+    through sr.AudioFile and anything else through ffmpeg.
+
+    Returns:
+        tuple: (samples, sample_rate, channels)
+    """
+    header = stream.read(4)
+    stream.seek(0)
+    if header == b'RIFF':
+        try:
+            with wave.open(stream, 'rb') as wav:
+                params = wav.getparams()
+                raw = wav.readframes(params.nframes)
+            return pcm_to_float(raw, params.sampwidth, params.nchannels), params.framerate, params.nchannels
+        except (wave.Error, EOFError):
+            # e.g. float or extensible WAV: leave it to speech_recognition
+            stream.seek(0)
+    if header in (b'RIFF', b'FORM', b'fLaC'):
+        audio = load_audio_data(sr.Recognizer(), stream)
+        return pcm_to_float(audio.frame_data, audio.sample_width), audio.sample_rate, 1
+    raw, sample_width, channels, sample_rate = decode_with_ffmpeg(stream)
+    return pcm_to_float(raw, sample_width, channels), sample_rate, channels
+
+# Running totals of what preprocessing removed, for GET /analyze/stt
+_preprocess_totals = {'recordings': 0, 'original_seconds': 0.0, 'processed_seconds': 0.0, 'saved_seconds': 0.0}
+_preprocess_lock = threading.Lock()
 
-def transcribe_audio(audio_file):
+def preprocess_audio(stream):
+    """
+    Decode, downmix, resample to 16 kHz, trim silence and peak-normalize an upload
+
+    Returns:
+        tuple: (sr.AudioData, stats dict with original/processed/saved seconds)
+    """
+    with span('stt.decode'):
+        samples, sample_rate, channels = decode_audio(stream)
+    with span('stt.preprocess'):
+        pcm, rate, stats = preprocess(samples, sample_rate)
+    stats['channels'] = channels
+    stats['sample_rate'] = sample_rate
+    AUDIO_SECONDS.labels(phase='original').observe(stats['original_seconds'])
+    AUDIO_SECONDS.labels(phase='processed').observe(stats['processed_seconds'])
+    with _preprocess_lock:
+        _preprocess_totals['recordings'] += 1
+        for field in ('original_seconds', 'processed_seconds', 'saved_seconds'):
+            _preprocess_totals[field] += stats[field]
+    return sr.AudioData(pcm, rate, 2), stats
+
+def preprocess_stats():
+    """
+    Totals of audio duration before and after preprocessing
+    """
+    with _preprocess_lock:
+        totals = dict(_preprocess_totals)
+    for field in ('original_seconds', 'processed_seconds', 'saved_seconds'):
+        totals[field] = round(totals[field], 3)
+    return totals
+
+def audio_duration(audio):
+    """
+    Length of sr.AudioData in seconds
+    """
+    return len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+def _recognize_with_retry(recognize, audio, retries):
+    """
+    Recognize one chunk, retrying transient failures on their own
+    """
+    for attempt in range(retries + 1):
+        try:
+            return recognize(audio), None
+        except sr.UnknownValueError:
+            # No intelligible speech in this chunk: nothing to retry
+            return "", None
+        except Exception as e:
+            error = e
+            if attempt < retries:
+                time.sleep(0.2 * (attempt + 1))
+    return "", str(error)
+
+def transcribe_segments(audio, recognize, workers=None, retries=None):
+    """
+    Split audio at pauses and transcribe the chunks concurrently
+
+    Args:
+        audio (sr.AudioData): The decoded recording
+        recognize (callable): Maps one sr.AudioData chunk to text
+        workers (int): Thread pool size (defaults to STT_CHUNK_WORKERS)
+        retries (int): Extra attempts per failed chunk (defaults to STT_CHUNK_RETRIES)
+
+    Returns:
+        list: {'start', 'end', 'text', 'error'} dicts in time order
+    """
+    workers = workers or config.STT_CHUNK_WORKERS
+    retries = config.STT_CHUNK_RETRIES if retries is None else retries
+    chunks = split_on_silence(
+        audio,
+        max_chunk_seconds=config.STT_MAX_CHUNK_SECONDS,
+        min_silence_seconds=config.STT_MIN_SILENCE_SECONDS
+    )
+    if not chunks:
+        return []
+
+    def run(chunk):
+        return _recognize_with_retry(recognize, chunk[2], retries)
+
+    if len(chunks) == 1 or workers <= 1:
+        outcomes = [run(chunk) for chunk in chunks]
+    else:
+        # One context copy per chunk, so each thread's spans join this request
+        runners = [run_in_context(run) for _ in chunks]
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks)), thread_name_prefix='stt-chunk') as pool:
+            outcomes = list(pool.map(lambda runner, chunk: runner(chunk), runners, chunks))
+
+    return [
+        {'start': round(start, 3), 'end': round(end, 3), 'text': text, 'error': error}
+        for (start, end, _), (text, error) in zip(chunks, outcomes)
+    ]
+
+def stitch_segments(segments):
+    """
+    Join chunk transcripts in order; None if every chunk failed
+    """
+    if segments and all(segment['error'] for segment in segments):
+        return None
+    return " ".join(segment['text'] for segment in segments if segment['text'])
+
+def transcribe_audio(audio_file, backend=None):
     """
     Convert uploaded audio file to text using speech recognition
+    
+    The recognizer is the configured STT backend (see utils.stt_backends)
+    unless one is passed in.
     """
     try:
-        # Create a recognizer instance
-        recognizer = sr.Recognizer()
-        
-        # Save the uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            audio_file.save(temp_file.name)
-            temp_path = temp_file.name
+        backend = backend or get_stt_backend()
         
-        # Read the audio file
-        with sr.AudioFile(temp_path) as source:
-            audio = recognizer.record(source)
+        # Read the audio straight from the upload buffer, trimmed and resampled for the recognizer
+        stream = open_audio_stream(audio_file)
+        if config.STT_PREPROCESS:
+            audio, _ = preprocess_audio(stream)
+        else:
+            audio = load_audio_data(sr.Recognizer(), stream)
+            AUDIO_SECONDS.labels(phase='original').observe(audio_duration(audio))
         
-        # Perform speech recognition
-        transcript = recognizer.recognize_google(audio)
+        # Perform speech recognition, chunk by chunk split at pauses when the backend supports it
+        if backend.chunked:
+            segments = transcribe_segments(audio, backend.recognize)
+        else:
+            text, error = _recognize_with_retry(backend.recognize, audio, config.STT_CHUNK_RETRIES)
+            segments = [{'start': 0.0, 'end': round(audio_duration(audio), 3), 'text': text, 'error': error}]
+        for segment in segments:
+            if segment['error']:
+                log_error("Error in speech recognition", start=segment['start'], end=segment['end'], error=segment['error'])
         
-        # Clean up temporary file
-        os.unlink(temp_path)
+        transcript = stitch_segments(segments)
+        if not transcript:
+            return TRANSCRIPTION_FAILED
         
         return transcript
         
     except Exception as e:
-        print(f"Error in speech recognition: {e}")
-        return "Could not transcribe audio"
+        log_error("Error in speech recognition", error=str(e))
+        # Recognizer errors are counted by the backend; this is decoding or setup
+        record_error('stt', 'decoder')
+        return TRANSCRIPTION_FAILED
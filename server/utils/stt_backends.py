@@ -0,0 +1,227 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import speech_recognition as sr
+import config
+from utils.metrics import RECOGNIZER_SECONDS, record_error
+from utils.tracing import span
+
+
+class STTBackend:
+    """
+    A speech-to-text engine behind a common interface with its own counters.
+
+    Subclasses implement _recognize(audio) and raise sr.UnknownValueError when
+    the audio holds no intelligible speech.
+    """
+
+    name = 'base'
+    # Whether long recordings should be split at pauses before recognition
+    chunked = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.no_speech = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def recognize(self, audio):
+        """
+        Transcribe one sr.AudioData, recording latency and outcome
+        """
+        started = time.perf_counter()
+        outcome = None
+        try:
+            with span('stt.recognize', backend=self.name):
+                return self._recognize(audio)
+        except sr.UnknownValueError:
+            outcome = 'no_speech'
+            raise
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            RECOGNIZER_SECONDS.labels(backend=self.name).observe(elapsed)
+            if outcome == 'error':
+                record_error('stt', self.name)
+            with self._lock:
+                self.calls += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+                if outcome == 'error':
+                    self.errors += 1
+                elif outcome == 'no_speech':
+                    self.no_speech += 1
+
+    def _recognize(self, audio):
+        raise NotImplementedError
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'calls': self.calls,
+                'errors': self.errors,
+                'no_speech': self.no_speech,
+                'avg_latency_ms': round(1000 * self.total_seconds / self.calls, 2) if self.calls else 0.0,
+                'max_latency_ms': round(1000 * self.max_seconds, 2)
+            }
+
+
+class GoogleBackend(STTBackend):
+    """
+    Google Web Speech API (network round trip per call)
+    """
+
+    name = 'google'
+
+    def __init__(self, language=None):
+        super().__init__()
+        self.language = language or config.STT_LANGUAGE
+        self._recognizer = sr.Recognizer()
+
+    def _recognize(self, audio):
+        return self._recognizer.recognize_google(audio, language=self.language)
+
+
+class SphinxBackend(STTBackend):
+    """
+    Offline CMU Sphinx recognition through pocketsphinx (no network)
+    """
+
+    name = 'sphinx'
+
+    def __init__(self, language=None):
+        super().__init__()
+        try:
+            import pocketsphinx  # noqa: F401
+        except ImportError:
+            raise RuntimeError("The 'sphinx' STT backend needs the pocketsphinx package (pip install pocketsphinx)")
+        self.language = language or config.STT_LANGUAGE
+        self._recognizer = sr.Recognizer()
+
+    def _recognize(self, audio):
+        return self._recognizer.recognize_sphinx(audio, language=self.language)
+
+
+class StubBackend(STTBackend):
+    """
+    Deterministic stand-in: maps the SHA-256 of the audio frames to a fixed
+    transcript, for offline tests and load tests of the rest of the pipeline
+    """
+
+    name = 'stub'
+    # The whole recording is hashed, so it is never split
+    chunked = False
+
+    def __init__(self, transcripts=None, default=None):
+        super().__init__()
+        if transcripts is None and config.STT_STUB_TRANSCRIPTS:
+            with open(config.STT_STUB_TRANSCRIPTS, 'r') as f:
+                transcripts = json.load(f)
+        self.transcripts = transcripts or {}
+        self.default = config.STT_STUB_DEFAULT if default is None else default
+
+    @staticmethod
+    def audio_hash(audio):
+        return hashlib.sha256(audio.get_raw_data()).hexdigest()
+
+    def _recognize(self, audio):
+        transcript = self.transcripts.get(self.audio_hash(audio), self.default)
+        if not transcript:
+            raise sr.UnknownValueError()
+        return transcript
+
+
+class SimulatedBackend(STTBackend):
+    """
+    Stand-in for a network recognizer in load tests: sleeps for a latency that
+    grows with the audio length, fails at a configured rate and returns a
+    transcript of realistic length chosen by the audio hash (opening with a
+    crisis statement for a configured fraction of recordings)
+    """
+
+    name = 'simulated'
+
+    PHRASES = [
+        "I've been feeling really anxious about work lately",
+        "my boss keeps moving the deadline and I'm overwhelmed",
+        "honestly today was a good day and I feel happy",
+        "I had a fight with my friend and I'm sad about it",
+        "I'm worried about my health and the doctor's appointment",
+        "things with my family have been great this week",
+        "I don't know what to do anymore",
+        "I'm excited about the trip but also a little nervous",
+    ]
+    CRISIS_PHRASE = "I can't take it anymore, I want to end it all"
+    # Speaking rate used to size the transcript
+    WORDS_PER_SECOND = 2.5
+
+    def __init__(self, latency=None, seconds_per_audio_second=None, jitter=None, error_rate=None, crisis_rate=None,
+                 sleep=time.sleep):
+        super().__init__()
+        self.latency = config.STT_SIM_LATENCY_SECONDS if latency is None else latency
+        self.seconds_per_audio_second = (config.STT_SIM_SECONDS_PER_AUDIO_SECOND
+                                         if seconds_per_audio_second is None else seconds_per_audio_second)
+        self.jitter = config.STT_SIM_JITTER if jitter is None else jitter
+        self.error_rate = config.STT_SIM_ERROR_RATE if error_rate is None else error_rate
+        self.crisis_rate = config.STT_SIM_CRISIS_RATE if crisis_rate is None else crisis_rate
+        self._sleep = sleep
+
+    def _recognize(self, audio):
+        seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        delay = self.latency + self.seconds_per_audio_second * seconds
+        self._sleep(delay * (1 + self.jitter * (2 * random.random() - 1)))
+        if random.random() < self.error_rate:
+            raise sr.RequestError("simulated recognizer error")
+
+        words = max(1, round(seconds * self.WORDS_PER_SECOND))
+        digest = StubBackend.audio_hash(audio)
+        start = int(digest[:8], 16)
+        phrases = self.PHRASES
+        if int(digest[8:16], 16) / 2 ** 32 < self.crisis_rate:
+            # Lead with the crisis statement so short clips still carry it
+            phrases = [self.CRISIS_PHRASE] + self.PHRASES
+            words = max(words, len(self.CRISIS_PHRASE.split()))
+            start = 0
+        transcript = []
+        while len(transcript) < words:
+            transcript.extend(phrases[(start + len(transcript)) % len(phrases)].split())
+        return " ".join(transcript[:words])
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    SphinxBackend.name: SphinxBackend,
+    StubBackend.name: StubBackend,
+    SimulatedBackend.name: SimulatedBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+def get_stt_backend(name=None):
+    """
+    The shared backend instance for name (defaults to the STT_BACKEND setting)
+    """
+    name = name or config.STT_BACKEND
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown STT backend '{name}' (expected one of {', '.join(BACKENDS)})")
+            backend = BACKENDS[name]()
+            _instances[name] = backend
+        return backend
+
+def backend_stats():
+    """
+    Counters of every backend used by this process
+    """
+    with _instances_lock:
+        return {name: backend.stats() for name, backend in _instances.items()}
@@ -0,0 +1,124 @@
+import contextvars
+import json
+import logging
+import sys
+import time
+import uuid
+
+# All server log lines go through this logger, one JSON object per line
+logger = logging.getLogger('speech')
+
+# Trace of the request being handled: its id and the innermost open span
+_request_id = contextvars.ContextVar('request_id', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+def current_request_id():
+    return _request_id.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Render a record as a JSON line carrying the request id and current span
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname.lower(),
+            'msg': record.getMessage(),
+        }
+        request_id = _request_id.get()
+        if request_id is not None:
+            entry['request_id'] = request_id
+        span = _current_span.get()
+        if span is not None and 'span' not in getattr(record, 'fields', {}):
+            entry['span'] = span.name
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level='INFO', stream=None):
+    """
+    Send the 'speech' logger to stdout as JSON lines (called once by the app)
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    logger.handlers[:] = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+
+def log_info(message, **fields):
+    logger.info(message, extra={'fields': fields})
+
+def log_error(message, **fields):
+    logger.error(message, extra={'fields': fields})
+
+
+class Span:
+    """
+    A timed section of a request. On exit one 'span' log line records its name,
+    parent, duration and any error, so a request id ties the STT, sentiment,
+    response and TTS stages of one request together.
+    """
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = None
+        self._token = None
+        self._started = None
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = round(1000 * (time.perf_counter() - self._started), 3)
+        _current_span.reset(self._token)
+        fields = {
+            'span': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent.span_id if self.parent is not None else None,
+            'duration_ms': duration_ms,
+            **self.attributes
+        }
+        if exc is not None:
+            fields['error'] = str(exc)
+        log_info('span', **fields)
+        return False
+
+def span(name, **attributes):
+    """
+    Context manager timing one section of the current request
+    """
+    return Span(name, **attributes)
+
+
+def start_trace(request_id=None):
+    """
+    Bind a request id to the current context; returns a token for end_trace
+    """
+    return _request_id.set(request_id or new_request_id())
+
+def end_trace(token):
+    _request_id.reset(token)
+
+def run_in_context(fn):
+    """
+    Wrap fn so it runs in a copy of the caller's context (request id and span)
+    when called on another thread
+    """
+    context = contextvars.copy_context()
+
+    def call(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return call
@@ -0,0 +1,331 @@
+from array import array
+from itertools import chain, count, repeat
+import numpy as np
+from utils.lexicon import TOKEN_PATTERN, normalize_text, tokenize
+from utils.results import EMOTIONS, EmotionAnalysis
+
+# Score changes a negation makes to each emotion of the keyword after it,
+# applied in EMOTIONS order: (emotion, opposite emotion that gains 0.5 or None)
+_NEGATED = sorted(
+    [('joy', 'sadness'), ('sadness', 'joy'), ('fear', 'trust'), ('trust', 'fear'), ('anticipation', None)],
+    key=lambda pair: EMOTIONS.index(pair[0])
+)
+
+INTENSITY = ('low', 'medium', 'high')
+COMPLEXITY = ('simple', 'moderate', 'complex')
+
+
+class CountMatrix:
+    """
+    Compressed sparse row (CSR) document x phrase count matrix
+    """
+
+    def __init__(self, indptr, indices, data, shape):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    @classmethod
+    def from_hits(cls, rows, cols, shape):
+        """
+        Count matrix of (row, column) hit coordinates, one entry per hit
+        """
+        keys, counts = np.unique(rows * shape[1] + cols, return_counts=True)
+        entry_rows = keys // shape[1]
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(entry_rows, minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, keys % shape[1], counts, shape)
+
+    def dot(self, dense, presence=False):
+        """
+        self @ dense; with presence=True every stored count is taken as 1
+        """
+        out = np.zeros((self.shape[0], dense.shape[1]), dtype=dense.dtype)
+        if not len(self.indices):
+            return out
+        products = dense[self.indices] if presence else dense[self.indices] * self.data[:, None]
+        starts = self.indptr[:-1]
+        filled = starts < self.indptr[1:]
+        # Segments of empty rows have no entries, so each sum runs to the next filled row
+        out[filled] = np.add.reduceat(products, starts[filled], axis=0)
+        return out
+
+
+class CorpusScorer:
+    """
+    Vectorized EnhancedEmotionAnalyzer.analyze_emotion for blocks of texts.
+
+    Every lexicon phrase is a column, and every word that occurs in a phrase
+    gets a small integer id. A block of texts becomes one array of token ids
+    (0 for any other word and between texts), and the n-gram codes of that
+    array are looked up against the phrase codes, one array operation per
+    phrase length. The hits make a sparse document x phrase count matrix, and
+    emotion, topic, crisis and context counts are products of it with 0/1
+    weight matrices. Modifiers and negation are corrections applied to the
+    emotion score matrix, in the order the scalar path applies them.
+
+    No per-document match dicts are built. What is left per document is
+    tokenizing, VADER, the linguistic pattern counts and building the result.
+    Scores are bit-identical to analyze_emotion.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.topics = list(analyzer.topic_keywords)
+        self.context_labels = list(analyzer.context_keywords)
+
+        self.columns = {}
+        entries = []
+        for phrases, category, label in analyzer._lexicon_entries():
+            for phrase in phrases:
+                self.columns.setdefault(phrase, len(self.columns))
+                entries.append((self.columns[phrase], category, label))
+        self.phrases = list(self.columns)
+
+        # Word ids start at 1: 0 is every other word and the separator between texts
+        self.vocab = {}
+        phrase_words = [tokenize(phrase).words for phrase in self.phrases]
+        for words in phrase_words:
+            for word in words:
+                self.vocab.setdefault(word, len(self.vocab) + 1)
+        self.base = len(self.vocab) + 1
+        self.max_words = max(map(len, phrase_words))
+        if self.base ** self.max_words >= 2 ** 63:
+            raise ValueError("lexicon too large for 64-bit phrase codes")
+        self.phrase_length = np.array([len(words) for words in phrase_words], dtype=np.int64)
+
+        # Sorted phrase codes per length, for searchsorted lookups
+        self.codes = {}
+        for length in range(1, self.max_words + 1):
+            codes = {}
+            for column, words in enumerate(phrase_words):
+                if len(words) == length:
+                    code = 0
+                    for word in words:
+                        code = code * self.base + self.vocab[word]
+                    if code in codes:
+                        raise ValueError(f"phrases {self.phrases[codes[code]]!r} and "
+                                         f"{self.phrases[column]!r} tokenize the same")
+                    codes[code] = column
+            if codes:
+                ordered = sorted(codes)
+                self.codes[length] = (np.array(ordered, dtype=np.int64),
+                                      np.array([codes[code] for code in ordered], dtype=np.int64))
+
+        size = len(self.phrases)
+        emotion_index = {emotion: i for i, emotion in enumerate(EMOTIONS)}
+        crisis_index = {'crisis': 0, 'extreme': 1, 'hopeless': 2, 'isolation': 3}
+        self.emotion_weights = np.zeros((size, len(EMOTIONS)))
+        self.topic_weights = np.zeros((size, len(self.topics)), dtype=np.int64)
+        self.context_weights = np.zeros((size, len(self.context_labels)), dtype=np.int64)
+        self.crisis_weights = np.zeros((size, len(crisis_index)), dtype=np.int64)
+        self.modifier = {kind: np.zeros(size, dtype=bool) for kind in ('intensifier', 'deintensifier', 'negation')}
+        for column, category, label in entries:
+            if category == 'emotion':
+                self.emotion_weights[column, emotion_index[label]] = 1
+            elif category == 'topic':
+                self.topic_weights[column, self.topics.index(label)] = 1
+            elif category == 'context':
+                self.context_weights[column, self.context_labels.index(label)] = 1
+            elif category in crisis_index:
+                self.crisis_weights[column, crisis_index[category]] = 1
+            else:
+                self.modifier[category][column] = True
+        self.is_emotion = self.emotion_weights.any(axis=1)
+        self.keyword_emotions = self.emotion_weights.astype(bool)
+        self.is_indicator = self.crisis_weights[:, 0] > 0
+        self.negated = [(emotion_index[emotion], None if opposite is None else emotion_index[opposite])
+                        for emotion, opposite in _NEGATED]
+
+        # Lookup tables of the analyzer's own decisions, so labels and texts come from one place
+        self.emotional_states = [
+            [analyzer._summarize_emotional_state(emotion, intensity, {'needs_immediate_attention': False})
+             for intensity in INTENSITY]
+            for emotion in EMOTIONS
+        ]
+        self.crisis_state = analyzer._summarize_emotional_state(None, None, {'needs_immediate_attention': True})
+
+    def analyze(self, texts):
+        """
+        One EmotionAnalysis per text; every text must be non-blank
+        """
+        analyzer = self.analyzer
+        n = len(texts)
+        tokens = [TOKEN_PATTERN.findall(normalize_text(text)) for text in texts]
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+        flat = list(chain.from_iterable(tokens))
+        doc_of_token = np.repeat(np.arange(n), lengths)
+
+        # Token ids laid out with a 0 after each text, then padding for the longest phrase
+        size = len(flat) + n
+        ids = np.zeros(size + self.max_words, dtype=np.int64)
+        ids[np.arange(len(flat)) + doc_of_token] = np.fromiter(map(self.vocab.get, flat, repeat(0)),
+                                                               dtype=np.int64, count=len(flat))
+        doc_of_position = np.repeat(np.arange(n), lengths + 1)
+
+        positions, columns = [], []
+        code = np.zeros(size, dtype=np.int64)
+        for length in range(1, self.max_words + 1):
+            code = code * self.base + ids[length - 1:length - 1 + size]
+            if length not in self.codes:
+                continue
+            codes, code_columns = self.codes[length]
+            found = np.minimum(np.searchsorted(codes, code), len(codes) - 1)
+            matched = np.flatnonzero(codes[found] == code)
+            positions.append(matched)
+            columns.append(code_columns[found[matched]])
+        positions = np.concatenate(positions)
+        columns = np.concatenate(columns)
+        # Hits in the scalar matcher's order: by start, shorter phrase first
+        order = np.lexsort((self.phrase_length[columns], positions))
+        positions, columns = positions[order], columns[order]
+        docs = doc_of_position[positions]
+
+        counts = CountMatrix.from_hits(docs, columns, (n, len(self.phrases)))
+        scores = counts.dot(self.emotion_weights, presence=True)
+        self._apply_modifiers(scores, ids, positions, columns, docs)
+        topic_counts = counts.dot(self.topic_weights, presence=True)
+        context_counts = counts.dot(self.context_weights, presence=True)
+        crisis_counts = counts.dot(self.crisis_weights, presence=True)
+        crisis_score = analyzer._score_crisis(*crisis_counts.T)
+        indicators = self._indicators(docs, columns)
+
+        # Repeated words (any token seen twice in a text), counted on per-block token ids
+        word_ids = np.fromiter(map({}.setdefault, flat, count()), dtype=np.int64, count=len(flat))
+        keys, occurrences = np.unique(doc_of_token * max(len(flat), 1) + word_ids, return_counts=True)
+        repeated = np.bincount(keys[occurrences > 1] // max(len(flat), 1), minlength=n)
+
+        vader = [analyzer.vader.polarity_scores(text) for text in texts]
+        patterns = list(map(analyzer._linguistic_patterns, texts, repeated.tolist()))
+        compound = np.array([polarity['compound'] for polarity in vader])
+        pattern_intensity = np.array([found.get('intensity', 0) for found in patterns], dtype=float)
+        pattern_confidence = [sum(found.values()) / len(found) if found else 0 for found in patterns]
+
+        # Overall analysis and confidence, as in _combine_analysis and _calculate_confidence
+        primary_emotion = scores.argmax(axis=1)
+        emotion_intensity = np.minimum(scores.max(axis=1) / 3, 1.0)
+        vader_intensity = np.abs(compound)
+        combined = (vader_intensity + emotion_intensity + pattern_intensity) / 3
+        intensity = np.where(combined > 0.7, 2, np.where(combined > 0.4, 1, 0))
+        significant = (scores > 0.5).sum(axis=1)
+        mixed = ((scores > 0.1) & (scores < 2)).sum(axis=1)
+        complexity = np.where((significant > 3) | (mixed > 4), 2, np.where((significant > 1) | (mixed > 2), 1, 0))
+        confidence = (vader_intensity + emotion_intensity + np.array(pattern_confidence, dtype=float)) / 3
+
+        has_topic = topic_counts.any(axis=1)
+        primary_topic = np.where(has_topic, topic_counts.argmax(axis=1), -1)
+        needs_attention = crisis_score > 0.7
+        crisis_score = crisis_score.tolist()
+        risk = _memoized(analyzer._categorize_crisis_risk, zip(crisis_score))
+        # Context analyses (without the topics, which are per document) by (primary topic, cue counts)
+        context_keys = list(zip(primary_topic.tolist(), *context_counts.T.tolist()))
+        contexts = {key: self._context(*key) for key in set(context_keys)}
+        emotional_context = [contexts[key]['emotional_context'] for key in context_keys]
+        support = _memoized(
+            lambda needs, emotion, level, context_key: analyzer._determine_support_strategy(
+                EMOTIONS[emotion], INTENSITY[level], {'needs_immediate_attention': needs}, contexts[context_key]),
+            zip(needs_attention.tolist(), primary_emotion.tolist(), intensity.tolist(), context_keys)
+        )
+
+        topic_rows = topic_counts.tolist()
+        results = []
+        for i, (text_vader, emotion, level, attention, topic, complex_level) in enumerate(zip(
+                vader, primary_emotion.tolist(), intensity.tolist(), needs_attention.tolist(),
+                primary_topic.tolist(), complexity.tolist())):
+            context = emotional_context[i]
+            results.append(EmotionAnalysis(
+                text_vader['neg'], text_vader['neu'], text_vader['pos'], text_vader['compound'],
+                array('d', scores[i].tobytes()),
+                min(crisis_score[i], 1.0), indicators.get(i, []), attention, risk[i],
+                tuple((name, hits) for name, hits in zip(self.topics, topic_rows[i]) if hits) if topic >= 0 else (),
+                self.topics[topic] if topic >= 0 else 'general',
+                context['topic_emotion_relationship'], context['stress_level'], context['support_needed'],
+                patterns[i],
+                EMOTIONS[emotion], INTENSITY[level], support[i], COMPLEXITY[complex_level],
+                self.crisis_state if attention else self.emotional_states[emotion][level],
+                float(confidence[i]), float(vader_intensity[i]), float(emotion_intensity[i]), pattern_confidence[i]
+            ))
+        return results
+
+    def _apply_modifiers(self, scores, ids, positions, columns, docs):
+        """
+        Intensifier, de-intensifier and negation corrections to the emotion scores
+        """
+        # The longest emotion keyword starting at each position (-1 for none)
+        keywords = np.full(len(ids), -1, dtype=np.int64)
+        emotion_hits = self.is_emotion[columns]
+        # Hits are ordered shorter first within a position, so the longest is assigned last
+        starts, keyword_columns = positions[emotion_hits], columns[emotion_hits]
+        last = np.r_[starts[1:] != starts[:-1], True] if len(starts) else np.zeros(0, dtype=bool)
+        keywords[starts[last]] = keyword_columns[last]
+
+        def applied(kind):
+            """(document, keyword column) of each hit of a modifier kind followed by an emotion keyword"""
+            hits = self.modifier[kind][columns]
+            following = keywords[positions[hits] + self.phrase_length[columns[hits]]]
+            found = following >= 0
+            return docs[hits][found], following[found]
+
+        hit_docs, hit_keywords = applied('intensifier')
+        np.add.at(scores, hit_docs, 0.5 * self.emotion_weights[hit_keywords])
+
+        hit_docs, hit_keywords = applied('deintensifier')
+        for rows, keyword in _rounds(hit_docs, hit_keywords):
+            current = scores[rows]
+            scores[rows] = np.where(self.keyword_emotions[keyword], np.maximum(current - 0.3, 0), current)
+
+        hit_docs, hit_keywords = applied('negation')
+        for rows, keyword in _rounds(hit_docs, hit_keywords):
+            emotions = self.keyword_emotions[keyword]
+            for emotion, opposite in self.negated:
+                affected = rows[emotions[:, emotion]]
+                scores[affected, emotion] = np.maximum(scores[affected, emotion] - 1, 0)
+                if opposite is not None:
+                    scores[affected, opposite] += 0.5
+
+    def _context(self, topic, *cues):
+        """
+        _summarize_context's result, less the topics, for a primary topic index and context cue counts
+        """
+        primary_topic = self.topics[topic] if topic >= 0 else 'general'
+        return {
+            'primary_topic': primary_topic,
+            'emotional_context': self.analyzer._analyze_emotional_context(
+                dict(zip(self.context_labels, cues)), primary_topic)
+        }
+
+    def _indicators(self, docs, columns):
+        """
+        Distinct crisis phrases per document, in order of first appearance
+        """
+        hits = self.is_indicator[columns]
+        docs, columns = docs[hits], columns[hits]
+        _, first = np.unique(docs * len(self.phrases) + columns, return_index=True)
+        indicators = {}
+        for doc, column in zip(docs[np.sort(first)].tolist(), columns[np.sort(first)].tolist()):
+            indicators.setdefault(doc, []).append(self.phrases[column])
+        return indicators
+
+
+def _rounds(docs, values):
+    """
+    Split per-document hit lists (docs ascending, each in hit order) into
+    rounds holding at most one hit per document: the first hits, the second...
+    """
+    if not len(docs):
+        return
+    index = np.arange(len(docs))
+    first = np.r_[True, docs[1:] != docs[:-1]]
+    rank = index - np.maximum.accumulate(np.where(first, index, 0))
+    for step in range(rank.max() + 1):
+        selected = rank == step
+        yield docs[selected], values[selected]
+
+
+def _memoized(fn, rows):
+    """
+    fn(*row) for each row (a tuple), called once per distinct row
+    """
+    values = {}
+    return [values[row] if row in values else values.setdefault(row, fn(*row)) for row in rows]